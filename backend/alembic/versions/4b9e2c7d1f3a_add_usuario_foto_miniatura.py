@@ -0,0 +1,29 @@
+"""add usuario.foto_miniatura
+
+Revision ID: 4b9e2c7d1f3a
+Revises: 207195d3db35
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b9e2c7d1f3a'
+down_revision: Union[str, Sequence[str], None] = '207195d3db35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Variante reduzida da foto; a coluna foto passa a guardar a versão média
+    op.add_column('usuario', sa.Column('foto_miniatura', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('usuario', 'foto_miniatura')
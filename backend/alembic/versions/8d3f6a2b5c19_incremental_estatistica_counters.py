@@ -0,0 +1,94 @@
+"""incremental estatistica counters
+
+Revision ID: 8d3f6a2b5c19
+Revises: 4b9e2c7d1f3a
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6a2b5c19'
+down_revision: Union[str, Sequence[str], None] = '4b9e2c7d1f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Contadores por competição (media_tempo e taxa_acerto passam a ser derivados)
+    op.add_column('estatistica', sa.Column('total_submissoes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('estatistica', sa.Column('total_aceitos', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('estatistica', sa.Column('soma_timestamps', sa.BigInteger(), server_default='0', nullable=False))
+    op.drop_column('estatistica', 'media_tempo')
+    op.drop_column('estatistica', 'taxa_acerto')
+
+    # Contadores por problema (para problema_mais_dificil)
+    op.create_table('estatistica_problema',
+        sa.Column('id_problema', sa.Integer(), sa.ForeignKey('problema.id_problema'), primary_key=True),
+        sa.Column('id_competicao', sa.Integer(), sa.ForeignKey('competicao.id_competicao'), nullable=False),
+        sa.Column('total_submissoes', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_aceitos', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.create_index('ix_estatistica_problema_id_competicao', 'estatistica_problema', ['id_competicao'])
+
+    # Carga inicial a partir das submissões existentes
+    op.execute("""
+        INSERT INTO estatistica_problema (id_problema, id_competicao, total_submissoes, total_aceitos)
+        SELECT p.id_problema, p.id_competicao,
+               COUNT(s.id_submissao),
+               COUNT(*) FILTER (WHERE s.status = 'aceito')
+        FROM problema p
+        LEFT JOIN submissao s ON s.id_problema = p.id_problema
+        GROUP BY p.id_problema, p.id_competicao
+    """)
+    op.execute("""
+        INSERT INTO estatistica (id_competicao)
+        SELECT c.id_competicao FROM competicao c
+        WHERE NOT EXISTS (SELECT 1 FROM estatistica e WHERE e.id_competicao = c.id_competicao)
+    """)
+    op.execute("""
+        UPDATE estatistica e
+        SET total_submissoes = t.total,
+            total_aceitos = t.aceitos,
+            soma_timestamps = t.soma
+        FROM (
+            SELECT p.id_competicao,
+                   COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE s.status = 'aceito') AS aceitos,
+                   COALESCE(SUM(EXTRACT(EPOCH FROM s.timestamp)), 0)::bigint AS soma
+            FROM submissao s
+            JOIN problema p ON p.id_problema = s.id_problema
+            GROUP BY p.id_competicao
+        ) t
+        WHERE t.id_competicao = e.id_competicao
+    """)
+    op.execute("""
+        UPDATE estatistica e
+        SET problema_mais_dificil = (
+            SELECT p.titulo
+            FROM problema p
+            JOIN estatistica_problema ep ON ep.id_problema = p.id_problema
+            WHERE ep.id_competicao = e.id_competicao AND ep.total_submissoes > 0
+            ORDER BY ep.total_aceitos, p.id_problema
+            LIMIT 1
+        )
+    """)
+
+    # Substituída pelos contadores incrementais
+    op.execute("DROP PROCEDURE IF EXISTS public.sp_gerar_estatistica(integer)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_estatistica_problema_id_competicao', table_name='estatistica_problema')
+    op.drop_table('estatistica_problema')
+    op.add_column('estatistica', sa.Column('taxa_acerto', sa.DECIMAL(5, 2), nullable=True))
+    op.add_column('estatistica', sa.Column('media_tempo', sa.DECIMAL(10, 2), nullable=True))
+    op.drop_column('estatistica', 'soma_timestamps')
+    op.drop_column('estatistica', 'total_aceitos')
+    op.drop_column('estatistica', 'total_submissoes')
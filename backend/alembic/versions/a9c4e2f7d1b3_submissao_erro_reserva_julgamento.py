@@ -0,0 +1,44 @@
+"""submissao erro status and judging lease
+
+Revision ID: a9c4e2f7d1b3
+Revises: f5a2c8d0b7e1
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e2f7d1b3'
+down_revision: Union[str, Sequence[str], None] = 'f5a2c8d0b7e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Submissões que o juiz não consegue julgar saem de ix_submissao_pendente
+    # com o status erro. O nome do tipo enum depende de quem criou a tabela
+    # (esta cadeia de migrações ou o create_all da API): lê da própria coluna.
+    with op.get_context().autocommit_block():
+        op.execute("""
+            DO $$
+            DECLARE tipo text;
+            BEGIN
+                SELECT format_type(atttypid, NULL) INTO tipo FROM pg_attribute
+                 WHERE attrelid = 'submissao'::regclass AND attname = 'status';
+                EXECUTE format('ALTER TYPE %s ADD VALUE IF NOT EXISTS %L', tipo, 'erro');
+            END $$
+        """)
+    # Reserva curta da fila de julgamento (coluna anulável: sem reescrever a tabela)
+    op.add_column('submissao', sa.Column('reservada_ate', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # O Postgres não remove valores de enum: as submissões com erro voltam à fila
+    op.drop_column('submissao', 'reservada_ate')
+    op.execute("UPDATE submissao SET status = 'pendente', tentativas = 0 WHERE status = 'erro'")
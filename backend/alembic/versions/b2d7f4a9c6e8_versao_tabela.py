@@ -0,0 +1,36 @@
+"""versao_tabela for shared HTTP validators
+
+Revision ID: b2d7f4a9c6e8
+Revises: a9c4e2f7d1b3
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d7f4a9c6e8'
+down_revision: Union[str, Sequence[str], None] = 'a9c4e2f7d1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Gerações por tabela dos ETags (app/cache.py), iguais em todos os workers;
+    # as linhas nascem na primeira escrita
+    op.create_table(
+        'versao_tabela',
+        sa.Column('tabela', sa.String(length=64), nullable=False),
+        sa.Column('geracao', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('alterada_em', sa.DECIMAL(precision=16, scale=3), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('tabela'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('versao_tabela')
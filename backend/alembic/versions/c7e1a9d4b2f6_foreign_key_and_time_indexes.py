@@ -0,0 +1,52 @@
+"""foreign key and time indexes
+
+Revision ID: c7e1a9d4b2f6
+Revises: 8d3f6a2b5c19
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e1a9d4b2f6'
+down_revision: Union[str, Sequence[str], None] = '8d3f6a2b5c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, tabela, colunas, WHERE do índice parcial)
+INDICES = [
+    ('ix_problema_id_competicao', 'problema', ['id_competicao'], None),
+    ('ix_inscricao_id_competicao', 'inscricao', ['id_competicao'], None),
+    ('ix_submissao_problema_timestamp', 'submissao', ['id_problema', 'timestamp', 'id_submissao'], None),
+    ('ix_submissao_usuario_problema', 'submissao', ['id_usuario', 'id_problema', 'timestamp'], None),
+    ('ix_submissao_timestamp', 'submissao', ['timestamp', 'id_submissao'], None),
+    ('ix_submissao_pendente', 'submissao', ['timestamp', 'id_submissao'], "status = 'pendente'"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY não bloqueia escritas em submissao durante a criação, mas
+    # não roda dentro de transação: cada índice vai num bloco em autocommit.
+    # Se um CREATE falhar no meio, o índice fica INVALID; IF NOT EXISTS não o
+    # refaz, então apague-o (DROP INDEX CONCURRENTLY) antes de rodar de novo.
+    for nome, tabela, colunas, onde in INDICES:
+        with op.get_context().autocommit_block():
+            op.create_index(
+                nome, tabela, colunas,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(onde) if onde else None,
+                if_not_exists=True,
+            )
+    op.execute('ANALYZE problema, inscricao, submissao')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nome, tabela, _, _ in reversed(INDICES):
+        with op.get_context().autocommit_block():
+            op.drop_index(nome, table_name=tabela, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,32 @@
+"""usuario.foto_versao for photo ETags
+
+Revision ID: d4f8a1c3e9b5
+Revises: b2d7f4a9c6e8
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8a1c3e9b5'
+down_revision: Union[str, Sequence[str], None] = 'b2d7f4a9c6e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # sha256 da foto média: o GET condicional da foto compara o ETag sem ler os bytes
+    op.add_column('usuario', sa.Column('foto_versao', sa.String(length=64), nullable=True))
+    op.execute(
+        "UPDATE usuario SET foto_versao = encode(sha256(foto), 'hex') WHERE foto IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('usuario', 'foto_versao')
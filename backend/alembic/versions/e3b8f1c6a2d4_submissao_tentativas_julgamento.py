@@ -0,0 +1,30 @@
+"""submissao tentativas de julgamento
+
+Revision ID: e3b8f1c6a2d4
+Revises: c7e1a9d4b2f6
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8f1c6a2d4'
+down_revision: Union[str, Sequence[str], None] = 'c7e1a9d4b2f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Falhas de julgamento por submissão (ver app/julgamento.py); com DEFAULT
+    # constante o Postgres não reescreve a tabela
+    op.add_column('submissao', sa.Column('tentativas', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('submissao', 'tentativas')
@@ -0,0 +1,34 @@
+"""usuario email lower index
+
+Revision ID: f5a2c8d0b7e1
+Revises: e3b8f1c6a2d4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a2c8d0b7e1'
+down_revision: Union[str, Sequence[str], None] = 'e3b8f1c6a2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A importação de inscritos procura e-mails por lower(email); mesmo cuidado
+    # de c7e1a9d4b2f6 com CONCURRENTLY (fora de transação)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_usuario_email_lower', 'usuario', [sa.text('lower(email)')],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_usuario_email_lower', table_name='usuario',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,358 @@
+# backend/app/cache.py
+# Cache de respostas das listagens muito lidas (read-through).
+#
+# Cada entrada guarda o JSON já serializado e depende de algumas tabelas.
+# Cada tabela tem um contador de geração: a sessão anota as tabelas que
+# escreveu (flush do ORM e INSERT/UPDATE/DELETE explícitos) e, depois do
+# commit, SessaoComCache incrementa as gerações antes de o crud devolver, de
+# modo que quem escreveu nunca lê a versão antiga. Uma leitura que começou
+# antes do commit só guarda o resultado se as gerações não mudaram no meio.
+#
+# Backends: "memoria" (LRU com TTL, por processo: com vários workers as
+# invalidações de um não chegam aos outros, que ficam no máximo CACHE_TTL
+# desatualizados), "redis" (compartilhado; gerações ficam no Redis) ou
+# "desligado".
+#
+# As gerações também servem de validador HTTP: condicional() calcula ETag e
+# Last-Modified das tabelas da rota e responde 304 antes de consultar o ORM.
+# O validador precisa ser o mesmo em todos os workers: no Redis ele usa as
+# gerações de lá; no modo memória, as da tabela versao_tabela, incrementadas
+# depois de cada commit que escreve numa tabela usada por condicional().
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from itertools import chain
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+from prometheus_client import Counter
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from .serializacao import serializar
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria").strip().lower()
+CACHE_TTL = float(os.getenv("CACHE_TTL", "30"))               # segundos
+CACHE_MAX_ITENS = int(os.getenv("CACHE_MAX_ITENS", "1000"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+# Entra em todos os ETags, junto do esquema da API (mude para invalidar os validadores)
+CACHE_EPOCA = os.getenv("CACHE_EPOCA", "")
+
+CABECALHO_CACHE = "X-Cache"
+# SQL textual (procedures) pode mexer em qualquer tabela: invalida tudo
+TODAS = "*"
+_INFO_TABELAS = "cache_tabelas_alteradas"
+
+CONSULTAS_CACHE = Counter("api_cache_consultas", "Consultas ao cache de respostas", ["rota", "resultado"])
+
+
+class CacheMemoria:
+    """LRU com TTL dentro do processo."""
+
+    local = True
+
+    def __init__(self, max_itens: int, ttl: float):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens = OrderedDict()       # chave -> (expira_em, geracoes, corpo, cabecalhos)
+        self._geracoes = {}
+        self._lock = threading.Lock()
+
+    async def geracoes(self, tabelas) -> tuple:
+        with self._lock:
+            return tuple(self._geracoes.get(t, 0) for t in chain((TODAS,), tabelas))
+
+    async def versao(self, tabelas) -> tuple:
+        # as gerações deste processo não servem: as de versao_tabela valem para todos
+        return await _versao_banco(tabelas)
+
+    async def obter(self, chave: str, geracoes: tuple):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            expira_em, geracoes_item, corpo, cabecalhos = item
+            if expira_em < time.monotonic() or geracoes_item != geracoes:
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return corpo, cabecalhos
+
+    async def guardar(self, chave: str, geracoes: tuple, tabelas, corpo: bytes, cabecalhos: dict):
+        with self._lock:
+            if geracoes != tuple(self._geracoes.get(t, 0) for t in chain((TODAS,), tabelas)):
+                return    # houve escrita durante a leitura: o resultado pode estar velho
+            self._itens[chave] = (time.monotonic() + self.ttl, geracoes, corpo, cabecalhos)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    async def invalidar(self, tabelas):
+        with self._lock:
+            for t in tabelas:
+                self._geracoes[t] = self._geracoes.get(t, 0) + 1
+            if TODAS in tabelas:
+                self._itens.clear()
+
+
+class CacheRedis:
+    """Cache compartilhado entre processos; as gerações entram na chave."""
+
+    local = False
+
+    def __init__(self, url: str, ttl: float, prefixo: str = "api-cache"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requer o pacote redis (pip install redis)") from e
+        self.cliente = redis.from_url(url)
+        self.ttl = ttl
+        self.prefixo = prefixo
+
+    def _chave_geracao(self, tabela: str) -> str:
+        return f"{self.prefixo}:geracao:{tabela}"
+
+    def _chave_alteracao(self, tabela: str) -> str:
+        return f"{self.prefixo}:alterada:{tabela}"
+
+    async def geracoes(self, tabelas) -> tuple:
+        valores = await self.cliente.mget([self._chave_geracao(t) for t in chain((TODAS,), tabelas)])
+        return tuple(int(v or 0) for v in valores)
+
+    async def versao(self, tabelas) -> tuple:
+        """(gerações, instante da última escrita em alguma das tabelas)."""
+        todas = (TODAS, *tabelas)
+        valores = await self.cliente.mget([self._chave_geracao(t) for t in todas]
+                                          + [self._chave_alteracao(t) for t in todas])
+        return (tuple(int(v or 0) for v in valores[:len(todas)]),
+                max(float(v or 0) for v in valores[len(todas):]))
+
+    def _chave(self, chave: str, geracoes: tuple) -> str:
+        return f"{self.prefixo}:{chave}:{'.'.join(map(str, geracoes))}"
+
+    async def obter(self, chave: str, geracoes: tuple):
+        bruto = await self.cliente.get(self._chave(chave, geracoes))
+        if bruto is None:
+            return None
+        cabecalhos, _, corpo = bruto.partition(b"\n")
+        return corpo, json.loads(cabecalhos)
+
+    async def guardar(self, chave: str, geracoes: tuple, tabelas, corpo: bytes, cabecalhos: dict):
+        # a chave leva as gerações lidas antes da consulta; se houve escrita no
+        # meio, ninguém mais procura por ela e o TTL a remove
+        bruto = json.dumps(cabecalhos).encode() + b"\n" + corpo
+        await self.cliente.set(self._chave(chave, geracoes), bruto, ex=max(1, int(self.ttl)))
+
+    async def invalidar(self, tabelas):
+        async with self.cliente.pipeline(transaction=False) as pipe:
+            agora = time.time()
+            for t in tabelas:
+                pipe.incr(self._chave_geracao(t))
+                pipe.set(self._chave_alteracao(t), agora)
+            await pipe.execute()
+
+
+def _criar_backend():
+    if CACHE_BACKEND == "desligado":
+        return None
+    if CACHE_BACKEND == "redis":
+        return CacheRedis(CACHE_REDIS_URL, CACHE_TTL)
+    return CacheMemoria(CACHE_MAX_ITENS, CACHE_TTL)
+
+
+backend = _criar_backend()
+
+
+# Versões compartilhadas (versao_tabela) para o modo memória
+
+# tabelas usadas por condicional(); só elas (e TODAS) são contadas em versao_tabela
+_versionadas = {TODAS}
+
+
+async def _versao_banco(tabelas) -> tuple:
+    # import tardio: database importa este módulo
+    from .database import async_engine
+    from .models import VersaoTabela as V
+    todas = (TODAS, *tabelas)
+    async with async_engine.connect() as conn:
+        linhas = {t: (g, a) for t, g, a in await conn.execute(
+            select(V.tabela, V.geracao, V.alterada_em).where(V.tabela.in_(todas)))}
+    return (tuple(linhas.get(t, (0, 0))[0] for t in todas),
+            max(float(linhas.get(t, (0, 0))[1]) for t in todas))
+
+
+async def _incrementar_versoes(engine, tabelas):
+    # upsert: a linha da tabela nasce na primeira escrita (e volta se versao_tabela for esvaziada)
+    from .models import VersaoTabela as V
+    dialeto = postgresql if engine.dialect.name == "postgresql" else sqlite
+    agora = round(time.time(), 3)
+    stmt = dialeto.insert(V).values([{"tabela": t, "geracao": 1, "alterada_em": agora} for t in sorted(tabelas)])
+    stmt = stmt.on_conflict_do_update(index_elements=[V.tabela],
+                                      set_={"geracao": V.geracao + 1, "alterada_em": stmt.excluded.alterada_em})
+    async with engine.begin() as conn:
+        await conn.execute(stmt)
+
+
+# Anotação das tabelas escritas por cada sessão
+
+@event.listens_for(Session, "after_flush")
+def _anotar_flush(session, flush_context):
+    alteradas = session.info.setdefault(_INFO_TABELAS, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        alteradas.add(obj.__table__.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _anotar_execucao(estado):
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        tabela = estado.statement.table.name
+    elif isinstance(estado.statement, TextClause) and not estado.statement.text.lstrip().upper().startswith("SELECT"):
+        tabela = TODAS
+    else:
+        return
+    estado.session.info.setdefault(_INFO_TABELAS, set()).add(tabela)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_anotacoes(session):
+    session.info.pop(_INFO_TABELAS, None)
+
+
+class SessaoComCache(AsyncSession):
+    """AsyncSession que invalida o cache das tabelas escritas logo após o commit."""
+
+    async def commit(self):
+        await super().commit()
+        tabelas = self.sync_session.info.pop(_INFO_TABELAS, None)
+        if tabelas and backend is not None:
+            await backend.invalidar(tabelas)
+            if backend.local:
+                versionadas = {TODAS} if TODAS in tabelas else tabelas & _versionadas
+                if versionadas:
+                    await _incrementar_versoes(self.bind, versionadas)
+
+
+# Validação condicional (ETag / Last-Modified)
+
+_epoca: Optional[str] = None
+
+
+def _epoca_deploy(app) -> str:
+    # igual em todos os workers do mesmo deploy; muda quando o formato das respostas muda
+    global _epoca
+    if _epoca is None:
+        esquema = json.dumps(app.openapi(), sort_keys=True, default=str)
+        _epoca = hashlib.sha1((CACHE_EPOCA + esquema).encode()).hexdigest()[:12]
+    return _epoca
+
+
+async def validadores(tabelas, app) -> Optional[tuple]:
+    """(etag, last_modified em segundos) para respostas que dependem das tabelas.
+
+    Só gerações compartilhadas, o instante da última escrita (distingue
+    gerações que recomeçaram do zero), o dia e a época do deploy: o mesmo
+    valor em qualquer worker até a próxima escrita.
+    """
+    if backend is None:
+        return None
+    geracoes, alterada_em = await backend.versao(tabelas)
+    hoje = date.today()
+    # o status das competições muda na virada do dia sem nenhuma escrita
+    meia_noite = datetime.combine(hoje, datetime.min.time()).timestamp()
+    partes = [_epoca_deploy(app), hoje.isoformat(), f"{alterada_em:.3f}", *map(str, geracoes)]
+    etag = 'W/"' + hashlib.sha1(":".join(partes).encode()).hexdigest()[:20] + '"'
+    return etag, int(max(alterada_em, meia_noite))
+
+
+def _nao_modificado(request: Request, etag: str, ultima_modificacao: int) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # comparação fraca (RFC 9110): ignora o prefixo W/
+        candidatos = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+        return "*" in candidatos or etag.removeprefix("W/") in candidatos
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return ultima_modificacao <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def condicional(*tabelas: str):
+    """Dependência de rotas GET: 304 se o cliente já tem a versão atual das tabelas.
+
+    Roda antes do handler, então o 304 sai sem consultar o ORM (no modo
+    memória, só a leitura das versões em versao_tabela).
+    """
+    _versionadas.update(tabelas)
+
+    async def _verificar(request: Request, response: Response):
+        valores = await validadores(tabelas, request.app)
+        if valores is None:
+            return
+        etag, ultima_modificacao = valores
+        cabecalhos = {
+            "ETag": etag,
+            "Last-Modified": format_datetime(datetime.fromtimestamp(ultima_modificacao, timezone.utc), usegmt=True),
+            # o navegador pode guardar, mas revalida a cada uso
+            "Cache-Control": "no-cache",
+        }
+        if _nao_modificado(request, etag, ultima_modificacao):
+            raise HTTPException(status_code=304, headers=cabecalhos)
+        response.headers.update(cabecalhos)
+        request.state.validadores = cabecalhos   # servir() devolve Response própria
+    return _verificar
+
+
+# Leitura
+
+def _chave(request: Request) -> str:
+    # mesmos parâmetros em outra ordem são a mesma consulta
+    return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+
+
+def _extras(resposta: Response) -> dict:
+    # só os cabeçalhos próprios da API (X-Proximo-Cursor etc.)
+    return {k: v for k, v in resposta.headers.items() if k.lower().startswith("x-")}
+
+
+async def servir(request: Request, tabelas: tuple, modelo, carregar: Callable[[Response], Awaitable]) -> Response:
+    """Responde do cache ou chama carregar(response) e guarda o JSON serializado.
+
+    modelo é o response_model da rota (usado se carregar devolver objetos do
+    ORM; dicts de uma Projecao vão direto ao orjson); carregar pode definir
+    cabeçalhos na response recebida (ex.: X-Proximo-Cursor), que são guardados junto.
+    """
+    validacao = getattr(request.state, "validadores", {})
+    if backend is None:
+        parcial = Response()
+        itens = await carregar(parcial)
+        corpo = serializar(itens, modelo)
+        return Response(content=corpo, media_type="application/json", headers=_extras(parcial))
+
+    rota = request.scope["route"].path
+    chave = _chave(request)
+    geracoes = await backend.geracoes(tabelas)
+    achado = await backend.obter(chave, geracoes)
+    if achado is not None:
+        CONSULTAS_CACHE.labels(rota, "acerto").inc()
+        corpo, cabecalhos = achado
+        return Response(content=corpo, media_type="application/json",
+                        headers={**cabecalhos, **validacao, CABECALHO_CACHE: "HIT"})
+
+    CONSULTAS_CACHE.labels(rota, "falta").inc()
+    parcial = Response()
+    itens = await carregar(parcial)
+    corpo = serializar(itens, modelo)
+    cabecalhos = _extras(parcial)
+    await backend.guardar(chave, geracoes, tabelas, corpo, cabecalhos)
+    return Response(content=corpo, media_type="application/json", headers={**cabecalhos, **validacao, CABECALHO_CACHE: "MISS"})
@@ -1,18 +1,66 @@
+from datetime import datetime, timedelta, timezone
 from typing import Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from . import models, schemas
-from .security import hash_password
-import base64
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, func, select, case, insert, update, delete, or_
+from sqlalchemy.exc import DataError, IntegrityError
+from . import eventos, models, schemas, paginacao, placar
+from .serializacao import Projecao, carregamento
+from .security import hash_password_async, hash_passwords_async
 
-# Competições
-def get_competicoes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Competicao).offset(skip).limit(limit).all()
+async def _recarregar(db: AsyncSession, stmt):
+    # Depois de uma escrita: relê o objeto e os relacionados que já estavam na
+    # sessão (os agregados deles podem ter mudado; expire_on_commit=False)
+    return await db.scalar(stmt.execution_options(populate_existing=True))
 
-def get_competicao(db: Session, comp_id: int):
-    return db.query(models.Competicao).filter(models.Competicao.id_competicao == comp_id).first()
 
-def create_competicao(db: Session, comp: schemas.CompeticaoCreate):
+# Competições
+# Critérios de ordenação aceitos na listagem ("-" no início inverte a ordem)
+ORDENACAO_COMPETICOES = {
+    "data": models.Competicao.data,
+    "status": models.Competicao.status,
+    "inscritos": models.Competicao.num_inscritos,
+    # taxa de ocupação: inscritos / vagas (NULL quando não há limite de vagas)
+    "lotacao": models.Competicao.num_inscritos * 1.0
+        / func.nullif(models.Competicao.max_participantes, 0),
+}
+
+# Listagens grandes saem como dicts direto das tuplas (ver serializacao.py)
+PROJ_COMPETICAO = Projecao(schemas.CompeticaoRead, models.Competicao)
+PROJ_INSCRICAO = Projecao(schemas.InscricaoRead, models.Inscricao)
+PROJ_PROBLEMA = Projecao(schemas.ProblemaRead, models.Problema)
+PROJ_SUBMISSAO = Projecao(schemas.SubmissaoRead, models.Submissao)
+
+async def get_competicoes(db: AsyncSession, skip: int = 0, limit: int = 100,
+                          status: Optional[str] = None, ordenar: Optional[str] = None,
+                          cursor: Optional[str] = None):
+    # status e num_inscritos são expressões SQL: filtro e ordenação ficam no banco
+    def filtrar(stmt):
+        if status is not None:
+            stmt = stmt.where(models.Competicao.status == status)
+        if ordenar:
+            coluna = ORDENACAO_COMPETICOES[ordenar.lstrip("-")]
+            stmt = stmt.order_by(coluna.desc().nullslast() if ordenar.startswith("-") else coluna.asc().nullslast())
+        return stmt
+    return await paginacao.paginar_projecao(db, PROJ_COMPETICAO, skip, limit, cursor, filtrar)
+
+async def get_placar(db: AsyncSession, comp_id: int, skip: int = 0, limit: int = 100):
+    placar_comp = await placar.obter(db, comp_id)
+    if placar_comp is None:
+        return None
+    linhas = list(placar_comp.linhas(skip, limit))
+    # Só os nomes vêm do banco (uma consulta por página, sem tocar em submissao)
+    nomes = dict((await db.execute(
+        select(models.Usuario.id_usuario, models.Usuario.nome)
+        .where(models.Usuario.id_usuario.in_([l["id_usuario"] for l in linhas]))
+    )).all())
+    for linha in linhas:
+        linha["nome"] = nomes.get(linha["id_usuario"])
+    return linhas
+
+async def get_competicao(db: AsyncSession, comp_id: int):
+    return await db.scalar(select(models.Competicao).where(models.Competicao.id_competicao == comp_id))
+
+async def create_competicao(db: AsyncSession, comp: schemas.CompeticaoCreate):
     db_comp = models.Competicao(
         nome=comp.nome,
         local=comp.local,
@@ -23,39 +71,47 @@ def create_competicao(db: Session, comp: schemas.CompeticaoCreate):
         descricao=comp.descricao,
         finalizada=comp.finalizada
     )
+    # Linha de estatística com contadores zerados, atualizada a cada submissão
+    db_comp.estatistica = models.Estatistica()
     db.add(db_comp)
-    db.commit()
-    db.refresh(db_comp)
+    await db.commit()
+    await db.refresh(db_comp)
     return db_comp
 
-def update_competicao(db: Session, comp_id: int, comp_in: schemas.CompeticaoCreate):
-    db_comp = get_competicao(db, comp_id)
+async def update_competicao(db: AsyncSession, comp_id: int, comp_in: schemas.CompeticaoCreate):
+    db_comp = await get_competicao(db, comp_id)
     if not db_comp:
         return None
     for field, value in comp_in.dict(exclude_unset=True).items():
         setattr(db_comp, field, value)
-    db.commit()
-    db.refresh(db_comp)
+    await db.commit()
+    await db.refresh(db_comp)
+    # data/horário de início entram na penalidade: o placar é refeito na próxima leitura
+    placar.descartar(comp_id)
     return db_comp
 
-def delete_competicao(db: Session, comp_id: int):
-    db_comp = get_competicao(db, comp_id)
+async def delete_competicao(db: AsyncSession, comp_id: int):
+    db_comp = await get_competicao(db, comp_id)
     if not db_comp:
         return False
-    db.delete(db_comp)
-    db.commit()
+    await db.delete(db_comp)
+    await db.commit()
+    placar.descartar(comp_id)
     return True
 
 
 # Usuários
-def get_usuarios(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Usuario).offset(skip).limit(limit).all()
+async def get_usuarios(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await paginacao.paginar(db, select(models.Usuario), models.Usuario, skip, limit, cursor)
 
-def get_usuario(db: Session, user_id: int):
-    return db.query(models.Usuario).filter(models.Usuario.id_usuario == user_id).first()
+async def get_usuario(db: AsyncSession, user_id: int):
+    return await db.scalar(select(models.Usuario).where(models.Usuario.id_usuario == user_id))
 
-def create_usuario(db: Session, usuario: schemas.UsuarioCreate):
-    hashed = hash_password(usuario.senha_hash)
+async def get_usuario_por_email(db: AsyncSession, email: str):
+    return await db.scalar(select(models.Usuario).where(models.Usuario.email == email))
+
+async def create_usuario(db: AsyncSession, usuario: schemas.UsuarioCreate):
+    hashed = await hash_password_async(usuario.senha_hash)
     db_user = models.Usuario(
         nome=usuario.nome,
         email=usuario.email,
@@ -64,230 +120,711 @@ def create_usuario(db: Session, usuario: schemas.UsuarioCreate):
         foto=usuario.foto
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
-def update_usuario(db: Session, user_id: int, u_in: schemas.UsuarioUpdate):
-    db_user = db.query(models.Usuario).get(user_id)
+async def update_usuario(db: AsyncSession, user_id: int, u_in: schemas.UsuarioUpdate):
+    db_user = await db.get(models.Usuario, user_id)
     if not db_user:
         return None
-    
+
     data = u_in.dict(exclude_unset=True)
     # Se alterar senha, gerar hash
     if 'senha_hash' in data:
-        data['senha_hash'] = hash_password(data.pop('senha_hash'))
+        data['senha_hash'] = await hash_password_async(data.pop('senha_hash'))
 
     for field, value in data.items():
         setattr(db_user, field, value)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
-def delete_usuario(db: Session, user_id: int):
+async def delete_usuario(db: AsyncSession, user_id: int):
     # Chama a procedure deletar_usuario_completo
     try:
-        db.execute(text("CALL deletar_usuario_completo(:uid)"), {"uid": user_id})
-        db.commit()
+        competicoes = await _descontar_submissoes(db, models.Submissao.id_usuario == user_id)
+        await db.execute(text("CALL deletar_usuario_completo(:uid)"), {"uid": user_id})
+        await db.commit()
+        for comp_id in competicoes:
+            placar.descartar(comp_id)
         return True
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
-def update_usuario_foto(db: Session, user_id: int, foto_bytes: bytes):
+async def update_usuario_foto(db: AsyncSession, user_id: int, media: bytes, miniatura: Optional[bytes] = None):
     # Busca o usuário
-    db_user = db.query(models.Usuario).filter(models.Usuario.id_usuario == user_id).first()
+    db_user = await get_usuario(db, user_id)
     if not db_user:
         return None
 
-    # Atualiza o campo de foto (supondo que seja Column(LargeBinary))
-    db_user.foto = foto_bytes
+    # Variantes já redimensionadas (ver imagens.processar_foto)
+    db_user.foto = media
+    db_user.foto_miniatura = miniatura
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
-def get_usuario_com_foto_base64(db: Session, user_id: int):
-    user = db.query(models.Usuario).filter(models.Usuario.id_usuario == user_id).first()
-    if not user:
-        return None
-    foto_b64 = base64.b64encode(user.foto).decode("utf-8") if user.foto else None
-    # Retorne um dicionário ou um novo objeto, não altere user.foto
-    return {
-        "id_usuario": user.id_usuario,
-        "nome": user.nome,
-        "email": user.email,
-        "senha_hash": user.senha_hash,
-        "tipo": user.tipo,
-        "foto": foto_b64
-    }
+async def get_usuario_foto_versao(db: AsyncSession, user_id: int):
+    """Linha (foto_versao,) do usuário com foto, sem os bytes; None se não há foto.
+
+    foto_versao é None em fotos gravadas sem passar pelo ORM (ex.: carga direta no banco).
+    """
+    U = models.Usuario
+    return (await db.execute(
+        select(U.foto_versao).where(U.id_usuario == user_id, U.foto.isnot(None))
+    )).first()
+
+async def get_usuario_foto(db: AsyncSession, user_id: int, tamanho: str = "media"):
+    # Busca só a coluna da foto (adiada nas demais consultas de usuário);
+    # fotos antigas sem miniatura caem na versão média
+    coluna = models.Usuario.foto
+    if tamanho == "miniatura":
+        coluna = func.coalesce(models.Usuario.foto_miniatura, models.Usuario.foto)
+    return await db.scalar(select(coluna).where(models.Usuario.id_usuario == user_id))
 
 # Equipes
-def get_equipes(db: Session, skip=0, limit=100):
-    return db.query(models.EquipeColaboradores).offset(skip).limit(limit).all()
+async def get_equipes(db: AsyncSession, skip=0, limit=100, cursor: Optional[str] = None):
+    return await paginacao.paginar(db, select(models.EquipeColaboradores), models.EquipeColaboradores, skip, limit, cursor)
 
-def get_equipe(db: Session, equipe_id: int):
-    return db.query(models.EquipeColaboradores).filter(models.EquipeColaboradores.id_equipe==equipe_id).first()
+async def get_equipe(db: AsyncSession, equipe_id: int):
+    return await db.scalar(select(models.EquipeColaboradores).where(models.EquipeColaboradores.id_equipe==equipe_id))
+
+def _vincular_colaboradores(condicao, id_equipe: Optional[int]):
+    return (
+        update(models.Colaborador).where(condicao).values(id_equipe=id_equipe)
+        .execution_options(synchronize_session=False)
+    )
 
-def create_equipe(db: Session, e: schemas.EquipeCreate):
+async def create_equipe(db: AsyncSession, e: schemas.EquipeCreate):
     db_e = models.EquipeColaboradores(nome=e.nome)
     db.add(db_e)
-    db.commit()
-    db.refresh(db_e)
+    await db.commit()
+    await db.refresh(db_e)
     # Associar colaboradores à equipe
     if hasattr(e, 'colaboradores') and e.colaboradores:
-        db.query(models.Colaborador).filter(models.Colaborador.id_usuario.in_(e.colaboradores)).update({models.Colaborador.id_equipe: db_e.id_equipe}, synchronize_session=False)
-        db.commit()
+        await db.execute(_vincular_colaboradores(models.Colaborador.id_usuario.in_(e.colaboradores), db_e.id_equipe))
+        await db.commit()
     return db_e
 
-def update_equipe(db: Session, eq_id: int, e_in: schemas.EquipeCreate):
-    db_e = get_equipe(db, eq_id)
+async def update_equipe(db: AsyncSession, eq_id: int, e_in: schemas.EquipeCreate):
+    db_e = await get_equipe(db, eq_id)
     if not db_e:
         return None
-    
+
     # Atualizar nome da equipe
     db_e.nome = e_in.nome
-    db.commit()
-    db.refresh(db_e)
-    
+    await db.commit()
+    await db.refresh(db_e)
+
     # Atualizar colaboradores associados à equipe
     if hasattr(e_in, 'colaboradores') and e_in.colaboradores is not None:
         # Primeiro, remover todos os colaboradores desta equipe
-        db.query(models.Colaborador).filter(models.Colaborador.id_equipe == eq_id).update({models.Colaborador.id_equipe: None}, synchronize_session=False)
-        
+        await db.execute(_vincular_colaboradores(models.Colaborador.id_equipe == eq_id, None))
+
         # Depois, associar os novos colaboradores
         if e_in.colaboradores:
-            db.query(models.Colaborador).filter(models.Colaborador.id_usuario.in_(e_in.colaboradores)).update({models.Colaborador.id_equipe: eq_id}, synchronize_session=False)
-        
-        db.commit()
-    
+            await db.execute(_vincular_colaboradores(models.Colaborador.id_usuario.in_(e_in.colaboradores), eq_id))
+
+        await db.commit()
+
     return db_e
 
 
-def delete_equipe(db: Session, eq_id: int):
-    db_e = get_equipe(db, eq_id)
+async def delete_equipe(db: AsyncSession, eq_id: int):
+    db_e = await get_equipe(db, eq_id)
     if not db_e:
         return False
-    db.delete(db_e); db.commit()
+    await db.delete(db_e); await db.commit()
     return True
 
 # Inscrições
-def get_inscricoes(db: Session, skip=0, limit=100):
-    return db.query(models.Inscricao).offset(skip).limit(limit).all()
+def _select_inscricoes():
+    # InscricaoRead aninha participante -> usuário (ver serializacao.carregamento)
+    return select(models.Inscricao).options(*carregamento(schemas.InscricaoRead, models.Inscricao))
+
+async def get_inscricoes(db: AsyncSession, skip=0, limit=100, cursor: Optional[str] = None):
+    return await paginacao.paginar_projecao(db, PROJ_INSCRICAO, skip, limit, cursor)
 
-def get_inscricao(db: Session, inscricao_id: int):
-    return db.query(models.Inscricao).filter(models.Inscricao.id_inscricao==inscricao_id).first()
+async def get_inscricao(db: AsyncSession, inscricao_id: int):
+    return await db.scalar(_select_inscricoes().where(models.Inscricao.id_inscricao==inscricao_id))
 
-def create_inscricao(db: Session, i: schemas.InscricaoCreate):
+async def create_inscricao(db: AsyncSession, i: schemas.InscricaoCreate):
     db_i = models.Inscricao(**i.dict())
-    db.add(db_i); db.commit(); db.refresh(db_i)
+    db.add(db_i); await db.commit()
+    db_i = await _recarregar(db, _select_inscricoes().where(models.Inscricao.id_inscricao == db_i.id_inscricao))
+    await eventos.publicar(db_i.id_competicao, "inscricao", {
+        "id_inscricao": db_i.id_inscricao, "id_usuario": db_i.id_usuario,
+        "categoria": db_i.categoria, "nome": db_i.participante.usuario.nome,
+    })
     return db_i
 
-def update_inscricao(db: Session, insc_id: int, i_in: schemas.InscricaoCreate):
-    db_i = get_inscricao(db, insc_id)
+async def update_inscricao(db: AsyncSession, insc_id: int, i_in: schemas.InscricaoCreate):
+    db_i = await get_inscricao(db, insc_id)
     if not db_i:
         return None
     for field, value in i_in.dict(exclude_unset=True).items():
         setattr(db_i, field, value)
-    db.commit(); db.refresh(db_i)
+    await db.commit(); await db.refresh(db_i)
     return db_i
 
 
-def delete_inscricao(db: Session, insc_id: int):
-    db_i = get_inscricao(db, insc_id)
+async def delete_inscricao(db: AsyncSession, insc_id: int):
+    db_i = await get_inscricao(db, insc_id)
     if not db_i:
         return False
-    db.delete(db_i); db.commit()
+    await db.delete(db_i); await db.commit()
     return True
 
-def get_inscricoes_por_competicao(db: Session, comp_id: int):
-    return db.query(models.Inscricao).filter(models.Inscricao.id_competicao == comp_id).all()
+# Senha inicial dos usuários criados pela inscrição simplificada/importação
+SENHA_PADRAO = "senha123"
+LOTE_IMPORTACAO = 1000
+
+async def _importar_lote(db: AsyncSession, comp_id: int, lote: list, resultado: dict):
+    """Grava um lote numa transação; se o banco recusar o lote, nada dele fica e as linhas vão para "erros"."""
+    # Uma consulta por lote para achar e-mails já cadastrados (e se já estão inscritos);
+    # compara em minúsculas (ix_usuario_email_lower), qualquer que seja a grafia gravada
+    emails = {l["email"] for _, l in lote}
+    existentes = {
+        email.lower(): (id_usuario, tipo, inscrito)
+        for email, id_usuario, tipo, inscrito in await db.execute(
+            select(models.Usuario.email, models.Usuario.id_usuario, models.Usuario.tipo,
+                   models.Inscricao.id_inscricao.isnot(None))
+            .outerjoin(models.Inscricao, (models.Inscricao.id_usuario == models.Usuario.id_usuario)
+                       & (models.Inscricao.id_competicao == comp_id))
+            .where(func.lower(models.Usuario.email).in_(emails))
+        )
+    }
+
+    novos, inscrever, gravadas = [], [], []
+    for linha, l in lote:
+        if l["email"] not in existentes:
+            novos.append((linha, l))
+            gravadas.append(linha)
+            continue
+        id_usuario, tipo, inscrito = existentes[l["email"]]
+        if tipo != models.UsuarioTipo.participante:
+            resultado["erros"].append({"linha": linha, "erro": "E-mail pertence a um usuário que não é participante"})
+        elif inscrito:
+            resultado["erros"].append({"linha": linha, "erro": "Participante já inscrito nesta competição"})
+        else:
+            inscrever.append(id_usuario)
+            gravadas.append(linha)
+
+    try:
+        criados = await _gravar_lote(db, comp_id, novos, inscrever, resultado["hash_padrao"])
+        await db.commit()
+    except (IntegrityError, DataError) as e:
+        # ex.: o mesmo e-mail cadastrado por outra requisição depois da consulta acima
+        await db.rollback()
+        erro = ("Conflito com um cadastro feito ao mesmo tempo" if isinstance(e, IntegrityError)
+                else "Valor recusado pelo banco")
+        resultado["erros"].extend({"linha": linha, "erro": f"{erro}; lote não importado"} for linha in gravadas)
+        return
+    resultado["criados"] += criados
+    resultado["inscritos"] += len(inscrever)
+    if inscrever:
+        await eventos.publicar(comp_id, "lote", {"tabela": "inscricao"})
+
+async def _gravar_lote(db: AsyncSession, comp_id: int, novos: list, inscrever: list, hash_padrao: str) -> int:
+    # cria usuário/participante para os e-mails novos e inscreve todos; devolve quantos foram criados
+    if novos:
+        # Só senhas próprias (coluna senha) passam pelo pool; as demais reutilizam o
+        # hash da senha padrão, que é pública de qualquer forma
+        proprias = [l["senha"] for _, l in novos if l.get("senha")]
+        hashes = iter(await hash_passwords_async(proprias))
+        senhas = [next(hashes) if l.get("senha") else hash_padrao for _, l in novos]
+        ids = (await db.execute(
+            insert(models.Usuario).returning(models.Usuario.id_usuario, sort_by_parameter_order=True),
+            [{"nome": l["nome"], "email": l["email"], "senha_hash": h, "tipo": models.UsuarioTipo.participante}
+             for (_, l), h in zip(novos, senhas)],
+        )).scalars().all()
+        await db.execute(insert(models.Participante), [
+            {"id_usuario": id_usuario, "instituicao": l["instituicao"]}
+            for id_usuario, (_, l) in zip(ids, novos)
+        ])
+        inscrever.extend(ids)
+
+    if inscrever:
+        await db.execute(insert(models.Inscricao), [
+            {"id_usuario": id_usuario, "id_competicao": comp_id, "categoria": "individual"}
+            for id_usuario in inscrever
+        ])
+    return len(novos)
+
+async def importar_inscricoes(db: AsyncSession, comp_id: int, linhas):
+    """Importa [(linha, {"nome", "email", "instituicao", "senha"})] em transações de LOTE_IMPORTACAO linhas.
+
+    linhas é um iterável assíncrono; e-mails já em minúsculas. Cria usuário e
+    participante (com o e-mail em minúsculas) para e-mails novos e inscreve na
+    competição; e-mails repetidos no arquivo ou já inscritos vão para "erros".
+    """
+    resultado = {"criados": 0, "inscritos": 0, "erros": [], "hash_padrao": await hash_password_async(SENHA_PADRAO)}
+    vistos, lote = set(), []
+    async for linha, l in linhas:
+        if l["email"] in vistos:
+            resultado["erros"].append({"linha": linha, "erro": "E-mail repetido no arquivo"})
+            continue
+        vistos.add(l["email"])
+        lote.append((linha, l))
+        if len(lote) >= LOTE_IMPORTACAO:
+            await _importar_lote(db, comp_id, lote, resultado)
+            lote = []
+    if lote:
+        await _importar_lote(db, comp_id, lote, resultado)
+    del resultado["hash_padrao"]
+    return resultado
+
+async def get_inscricoes_por_competicao(db: AsyncSession, comp_id: int):
+    return PROJ_INSCRICAO.montar(await db.execute(
+        PROJ_INSCRICAO.select().where(models.Inscricao.id_competicao == comp_id)
+    ))
 
 # Problemas
-def get_problemas(db: Session, skip=0, limit=100):
-    return db.query(models.Problema).offset(skip).limit(limit).all()
+async def get_problemas(db: AsyncSession, skip=0, limit=100, comp_id: Optional[int] = None, cursor: Optional[str] = None):
+    def filtrar(stmt):
+        return stmt if comp_id is None else stmt.where(models.Problema.id_competicao == comp_id)
+    return await paginacao.paginar_projecao(db, PROJ_PROBLEMA, skip, limit, cursor, filtrar)
 
-def get_problema(db: Session, problema_id: int):
-    return db.query(models.Problema).filter(models.Problema.id_problema==problema_id).first()
+async def get_problema(db: AsyncSession, problema_id: int):
+    return await db.scalar(select(models.Problema).where(models.Problema.id_problema==problema_id))
 
-def create_problema(db: Session, p: schemas.ProblemaCreate):
+async def create_problema(db: AsyncSession, p: schemas.ProblemaCreate):
     db_p = models.Problema(**p.dict())
-    db.add(db_p); db.commit(); db.refresh(db_p)
+    db_p.estatistica = models.EstatisticaProblema(id_competicao=p.id_competicao)
+    db.add(db_p); await db.commit(); await db.refresh(db_p)
     return db_p
 
-def update_problema(db: Session, prob_id: int, p_in: schemas.ProblemaCreate):
-    db_p = get_problema(db, prob_id)
+async def update_problema(db: AsyncSession, prob_id: int, p_in: schemas.ProblemaCreate):
+    db_p = await get_problema(db, prob_id)
     if not db_p:
         return None
+    comp_anterior, titulo_anterior = db_p.id_competicao, db_p.titulo
     for field, value in p_in.dict(exclude_unset=True).items():
         setattr(db_p, field, value)
-    db.commit(); db.refresh(db_p)
+    if db_p.id_competicao == comp_anterior and db_p.titulo != titulo_anterior:
+        # estatistica guarda o título do problema mais difícil: relê com o nome novo
+        E = models.Estatistica
+        await db.flush()
+        await db.execute(
+            update(E).where(E.id_competicao == comp_anterior)
+            .values(problema_mais_dificil=_problema_mais_dificil(comp_anterior))
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit(); await db.refresh(db_p)
+    placar.esquecer_problema(prob_id)
+    if db_p.id_competicao != comp_anterior:
+        # problema mudou de competição: refaz os contadores das duas
+        await recalcular_estatistica(db, comp_anterior)
+        await recalcular_estatistica(db, db_p.id_competicao)
     return db_p
 
 
-def delete_problema(db: Session, prob_id: int):
-    db_p = get_problema(db, prob_id)
+async def delete_problema(db: AsyncSession, prob_id: int):
+    db_p = await get_problema(db, prob_id)
     if not db_p:
         return False
-    db.delete(db_p); db.commit()
+    await _descontar_submissoes(db, models.Submissao.id_problema == prob_id)
+    await db.delete(db_p); await db.commit()
+    placar.esquecer_problema(prob_id)
     return True
 
 # Submissões
-def get_submissoes(db: Session, skip=0, limit=100):
-    return db.query(models.Submissao).offset(skip).limit(limit).all()
+async def get_submissoes(db: AsyncSession, skip=0, limit=100, cursor: Optional[str] = None):
+    # ordenadas por (timestamp, id_submissao); ver paginacao.CHAVES
+    return await paginacao.paginar_projecao(db, PROJ_SUBMISSAO, skip, limit, cursor)
+
+def select_exportacao(comp_id: int):
+    return (
+        PROJ_SUBMISSAO.select()
+        .join(models.Problema, models.Problema.id_problema == models.Submissao.id_problema)
+        .where(models.Problema.id_competicao == comp_id)
+        .order_by(*paginacao.chave(models.Submissao))
+    )
 
-def get_submissao(db: Session, submissao_id: int):
-    return db.query(models.Submissao).filter(models.Submissao.id_submissao==submissao_id).first()
+async def exportar_submissoes(db: AsyncSession, comp_id: int, lote: int = 2000):
+    """Gera as submissões da competição em blocos de até `lote` dicts (SubmissaoRead).
 
-def create_submissao(db: Session, s: schemas.SubmissaoCreate):
+    Lê de um cursor do servidor (yield_per): a memória fica em um bloco,
+    qualquer que seja o tamanho da competição.
+    """
+    resultado = await db.stream(select_exportacao(comp_id).execution_options(yield_per=lote))
+    async for linhas in resultado.partitions():
+        yield PROJ_SUBMISSAO.montar(linhas)
+
+async def get_submissao(db: AsyncSession, submissao_id: int):
+    return await db.scalar(select(models.Submissao).where(models.Submissao.id_submissao==submissao_id))
+
+async def _publicar_submissao(db: AsyncSession, db_s: models.Submissao, status_anterior=None):
+    # mesmos campos de SubmissaoRead; o orjson serializa enum e datetime
+    dados = {campo: getattr(db_s, campo) for campo in schemas.SubmissaoRead.model_fields}
+    if status_anterior is not None:
+        dados["status_anterior"] = models.SubmissaoStatus(status_anterior)
+    await eventos.publicar(await placar.id_competicao(db, db_s.id_problema), "submissao", dados)
+
+async def create_submissao(db: AsyncSession, s: schemas.SubmissaoCreate):
     db_s = models.Submissao(**s.dict())
-    db.add(db_s); db.commit(); db.refresh(db_s)
+    db.add(db_s)
+    await _somar_contadores(db, _contabilizar({}, db_s.id_problema, db_s.timestamp, db_s.status, +1))
+    await db.commit(); await db.refresh(db_s)
+    await _publicar_submissao(db, db_s)
+    await placar.registrar_submissao(db, db_s)
     return db_s
 
-def update_submissao(db: Session, sub_id: int, s_in: schemas.SubmissaoCreate):
-    db_s = get_submissao(db, sub_id)
+async def create_submissoes_lote(db: AsyncSession, itens: list):
+    """Insere [(linha, SubmissaoCreate)] numa transação, com um INSERT multi-linha.
+
+    Problemas e participantes são validados com uma consulta cada; devolve
+    (quantidade inserida, [{"linha", "erro"}] das linhas recusadas).
+    """
+    id_problemas = {s.id_problema for _, s in itens}
+    id_usuarios = {s.id_usuario for _, s in itens}
+    problemas = set(await db.scalars(select(models.Problema.id_problema)
+                                     .where(models.Problema.id_problema.in_(id_problemas))))
+    participantes = set(await db.scalars(select(models.Participante.id_usuario)
+                                         .where(models.Participante.id_usuario.in_(id_usuarios))))
+
+    linhas, erros = [], []
+    contadores = {}  # id_problema -> [total, aceitos, soma_timestamps]
+    for linha, s in itens:
+        if s.id_problema not in problemas:
+            erros.append({"linha": linha, "erro": "Problema não encontrado"})
+            continue
+        if s.id_usuario not in participantes:
+            erros.append({"linha": linha, "erro": "Participante não encontrado"})
+            continue
+        dados = s.dict()
+        dados["status"] = models.SubmissaoStatus(dados["status"])
+        linhas.append(dados)
+        c = contadores.setdefault(s.id_problema, [0, 0, 0])
+        c[0] += 1
+        c[1] += dados["status"] == models.SubmissaoStatus.aceito
+        c[2] += models.epoch(s.timestamp)
+
+    if linhas:
+        # ids na ordem das linhas: o placar conta cada submissão pelo id_submissao
+        ids = await db.scalars(insert(models.Submissao).returning(models.Submissao.id_submissao,
+                                                                  sort_by_parameter_order=True), linhas)
+        for dados, id_submissao in zip(linhas, ids.all(), strict=True):
+            dados["id_submissao"] = id_submissao
+        await _somar_contadores(db, contadores)
+        await db.commit()
+        # um aviso por competição em vez de um evento por linha; o cliente recarrega
+        for comp_id in {await placar.id_competicao(db, p) for p in contadores}:
+            await eventos.publicar(comp_id, "lote", {"tabela": "submissao"})
+        await placar.registrar_lote(db, linhas)
+    return len(linhas), erros
+
+async def update_submissao(db: AsyncSession, sub_id: int, s_in: schemas.SubmissaoCreate):
+    db_s = await get_submissao(db, sub_id)
     if not db_s:
         return None
+    celula_antiga = (db_s.id_usuario, db_s.id_problema)
+    status_anterior = db_s.status
+    deltas = _contabilizar({}, db_s.id_problema, db_s.timestamp, db_s.status, -1)
     for field, value in s_in.dict(exclude_unset=True).items():
         setattr(db_s, field, value)
-    db.commit(); db.refresh(db_s)
+    if models.SubmissaoStatus(db_s.status) == models.SubmissaoStatus.pendente:
+        # de volta à fila de julgamento, com as tentativas zeradas
+        db_s.tentativas, db_s.reservada_ate = 0, None
+    await _somar_contadores(db, _contabilizar(deltas, db_s.id_problema, db_s.timestamp, db_s.status, +1))
+    await db.commit(); await db.refresh(db_s)
+    await _publicar_submissao(db, db_s, status_anterior)
+    await placar.recalcular_celula(db, *celula_antiga)
+    if celula_antiga != (db_s.id_usuario, db_s.id_problema):
+        await placar.recalcular_celula(db, db_s.id_usuario, db_s.id_problema)
     return db_s
 
 
-def delete_submissao(db: Session, sub_id: int):
-    db_s = get_submissao(db, sub_id)
+# Fila de julgamento (ver julgamento.py): a própria tabela submissao é a fila
+def _agora_utc() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def select_pendentes(lote: int, agora: Optional[datetime] = None, id_submissao: Optional[int] = None):
+    # mais antigas primeiro, pelo índice parcial ix_submissao_pendente, sem as
+    # reservadas por outro laço (reserva vencida volta a valer)
+    S = models.Submissao
+    agora = agora or _agora_utc()
+    stmt = (
+        select(S.id_submissao, S.id_problema, S.id_usuario, S.timestamp, S.tentativas)
+        .where(S.status == models.SubmissaoStatus.pendente,
+               or_(S.reservada_ate.is_(None), S.reservada_ate < agora))
+        .order_by(S.timestamp, S.id_submissao)
+        .limit(lote)
+    )
+    return stmt if id_submissao is None else stmt.where(S.id_submissao == id_submissao)
+
+async def reivindicar_pendentes(db: AsyncSession, lote: int, reserva: float, max_tentativas: int = 3,
+                                id_submissao: Optional[int] = None) -> list:
+    """Reserva até `lote` submissões pendentes por `reserva` segundos e faz o commit.
+
+    Devolve as reservadas como dicts, com tentativas já contando esta. A
+    transação é curta (FOR UPDATE SKIP LOCKED só enquanto marca as linhas): o
+    juiz roda depois, sem conexão presa. Se quem reservou cair, a reserva vence
+    e outro laço pega a submissão. As que já chegaram a max_tentativas (ex.:
+    laços que caíram com elas) viram erro em vez de voltar ao juiz.
+    Com id_submissao, reserva só essa (se ainda estiver na fila).
+    """
+    S = models.Submissao
+    agora = _agora_utc()
+    linhas = [dict(l._mapping) for l in await db.execute(
+        select_pendentes(lote, agora, id_submissao).with_for_update(skip_locked=True)
+    )]
+    esgotadas = [l for l in linhas if l["tentativas"] >= max_tentativas]
+    linhas = [l for l in linhas if l["tentativas"] < max_tentativas]
+    if linhas:
+        await db.execute(
+            update(S).where(S.id_submissao.in_([l["id_submissao"] for l in linhas]))
+            .values(tentativas=S.tentativas + 1, reservada_ate=agora + timedelta(seconds=reserva))
+            .execution_options(synchronize_session=False)
+        )
+        for l in linhas:
+            l["tentativas"] += 1
+    await _marcar_erro(db, esgotadas)
+    await db.commit()
+    await _publicar_erros(db, esgotadas)
+    return linhas
+
+async def _marcar_erro(db: AsyncSession, linhas: list):
+    # erro não entra no placar nem nos aceites; total_submissoes já a contava
+    S = models.Submissao
+    if linhas:
+        await db.execute(
+            update(S).where(S.id_submissao.in_([l["id_submissao"] for l in linhas]))
+            .values(status=models.SubmissaoStatus.erro, reservada_ate=None)
+            .execution_options(synchronize_session=False)
+        )
+
+async def _publicar_erros(db: AsyncSession, linhas: list):
+    for l in linhas:
+        await eventos.publicar(await placar.id_competicao(db, l["id_problema"]), "submissao", {
+            **{c: l[c] for c in schemas.SubmissaoRead.model_fields if c != "status"},
+            "status": models.SubmissaoStatus.erro, "status_anterior": models.SubmissaoStatus.pendente,
+        })
+
+async def liberar_reservas(db: AsyncSession, linhas: list):
+    """Devolve à fila, sem contar a tentativa, submissões reservadas por reivindicar_pendentes."""
+    await db.execute(update(models.Submissao), [
+        {"id_submissao": l["id_submissao"], "tentativas": l["tentativas"] - 1, "reservada_ate": None}
+        for l in linhas
+    ])
+    await db.commit()
+
+async def registrar_falha_julgamento(db: AsyncSession, linha: dict, max_tentativas: int = 3) -> bool:
+    """Julgamento de uma submissão reservada falhou: devolve à fila ou, no limite, marca erro.
+
+    Faz o commit; devolve se ela saiu da fila.
+    """
+    desistiu = linha["tentativas"] >= max_tentativas
+    if desistiu:
+        await _marcar_erro(db, [linha])
+    else:
+        await db.execute(update(models.Submissao), [{"id_submissao": linha["id_submissao"], "reservada_ate": None}])
+    await db.commit()
+    if desistiu:
+        await _publicar_erros(db, [linha])
+    return desistiu
+
+async def gravar_julgamentos(db: AsyncSession, linhas: list, veredictos: list) -> int:
+    """Grava de uma vez o status de cada linha reservada e faz o commit; devolve quantas gravou.
+
+    Só grava as que continuam pendentes com a reserva deste laço (mesmo número
+    de tentativas): se a reserva venceu e outro laço pegou a submissão, ou
+    alguém mudou o status pela API, o veredicto é descartado.
+    """
+    pendente = models.SubmissaoStatus.pendente
+    for linha, veredicto in zip(linhas, veredictos, strict=True):
+        linha["status"] = models.SubmissaoStatus(veredicto)
+        if linha["status"] not in (models.SubmissaoStatus.aceito, models.SubmissaoStatus.rejeitado):
+            raise ValueError(f"Veredicto inválido para a submissão {linha['id_submissao']}: {veredicto}")
+    S = models.Submissao
+    atuais = dict((await db.execute(
+        select(S.id_submissao, S.tentativas)
+        .where(S.id_submissao.in_([l["id_submissao"] for l in linhas]), S.status == pendente)
+        .with_for_update()
+    )).all())
+    linhas = [l for l in linhas if atuais.get(l["id_submissao"]) == l["tentativas"]]
+    if not linhas:
+        await db.rollback()
+        return 0
+    await db.execute(update(models.Submissao), [
+        {"id_submissao": l["id_submissao"], "status": l["status"], "reservada_ate": None} for l in linhas
+    ])
+    # pendente já contava em total_submissoes; só os aceites mudam os contadores
+    deltas = {}
+    for l in linhas:
+        if l["status"] == models.SubmissaoStatus.aceito:
+            deltas.setdefault(l["id_problema"], [0, 0, 0])[1] += 1
+    await _somar_contadores(db, deltas)
+    await db.commit()
+
+    for l in linhas:
+        await eventos.publicar(await placar.id_competicao(db, l["id_problema"]), "submissao",
+                               {**{c: l[c] for c in schemas.SubmissaoRead.model_fields}, "status_anterior": pendente})
+    # pendente não entra no placar: o veredicto conta como submissão nova
+    await placar.registrar_lote(db, linhas)
+    return len(linhas)
+
+async def delete_submissao(db: AsyncSession, sub_id: int):
+    db_s = await get_submissao(db, sub_id)
     if not db_s:
         return False
-    db.delete(db_s); db.commit()
+    celula = (db_s.id_usuario, db_s.id_problema)
+    await _somar_contadores(db, _contabilizar({}, db_s.id_problema, db_s.timestamp, db_s.status, -1))
+    await db.delete(db_s); await db.commit()
+    await placar.recalcular_celula(db, *celula)
     return True
 
-# Estatísticas (list + opcional call da procedure)
-def get_estatisticas(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Estatistica).offset(skip).limit(limit).all()
+# Estatísticas
+# Os contadores de estatistica/estatistica_problema são atualizados com
+# UPDATE ... SET x = x + delta na mesma transação de cada escrita de
+# submissão, então ler a estatística de uma competição é buscar uma linha.
+# Cada transação soma antes os deltas e trava as linhas sempre na mesma ordem
+# (estatistica_problema por id_problema, depois estatistica por competição),
+# para que escritas concorrentes em vários problemas não entrem em deadlock.
+# Apagar participante, usuário ou problema leva as submissões por ON DELETE
+# CASCADE: antes disso _descontar_submissoes tira a parte delas.
+def _problema_mais_dificil(comp_id):
+    # problema com menos aceites entre os que já receberam submissões
+    return (
+        select(models.Problema.titulo)
+        .join(models.EstatisticaProblema, models.EstatisticaProblema.id_problema == models.Problema.id_problema)
+        .where(models.EstatisticaProblema.id_competicao == comp_id,
+               models.EstatisticaProblema.total_submissoes > 0)
+        .order_by(models.EstatisticaProblema.total_aceitos, models.Problema.id_problema)
+        .limit(1)
+        .scalar_subquery()
+    )
 
-def get_estatistica(db: Session, estat_id: int):
-    return db.query(models.Estatistica).filter(models.Estatistica.id_estatistica == estat_id).first()
+def _contabilizar(deltas: dict, id_problema: int, timestamp, status, sinal: int) -> dict:
+    """Soma uma submissão (sinal +1) ou a retira (-1) em deltas: id_problema -> [total, aceitos, soma]."""
+    aceito = models.SubmissaoStatus(status) == models.SubmissaoStatus.aceito
+    d = deltas.setdefault(id_problema, [0, 0, 0])
+    d[0] += sinal
+    d[1] += sinal if aceito else 0
+    d[2] += sinal * models.epoch(timestamp)
+    return deltas
+
+async def _somar_contadores(db: AsyncSession, deltas: dict):
+    """Aplica deltas (id_problema -> [total, aceitos, soma_timestamps]) aos contadores."""
+    EP, E = models.EstatisticaProblema, models.Estatistica
+    por_competicao = {}
+    for id_problema in sorted(deltas):
+        total, aceitos, soma = deltas[id_problema]
+        if total or aceitos:
+            await db.execute(
+                update(EP).where(EP.id_problema == id_problema).values(
+                    total_submissoes=EP.total_submissoes + total,
+                    total_aceitos=EP.total_aceitos + aceitos,
+                ).execution_options(synchronize_session=False)
+            )
+        c = por_competicao.setdefault(await placar.id_competicao(db, id_problema), [0, 0, 0])
+        c[0] += total; c[1] += aceitos; c[2] += soma
+    for comp_id in sorted(k for k in por_competicao if k is not None):
+        total, aceitos, soma = por_competicao[comp_id]
+        valores = dict(
+            total_submissoes=E.total_submissoes + total,
+            total_aceitos=E.total_aceitos + aceitos,
+            soma_timestamps=E.soma_timestamps + soma,
+        )
+        if total or aceitos:
+            # só muda quando os contadores por problema mudam; uma vez por transação
+            valores["problema_mais_dificil"] = _problema_mais_dificil(comp_id)
+        await db.execute(
+            update(E).where(E.id_competicao == comp_id).values(**valores)
+            .execution_options(synchronize_session=False)
+        )
+
+def _agregar_submissoes(*condicoes):
+    """(id_problema, total, aceitos, soma dos timestamps) das submissões que atendem às condições."""
+    S = models.Submissao
+    aceito = case((S.status == models.SubmissaoStatus.aceito, 1), else_=0)
+    return (
+        select(S.id_problema, func.count(S.id_submissao), func.sum(aceito),
+               func.sum(func.extract("epoch", S.timestamp)))
+        .where(*condicoes)
+        .group_by(S.id_problema)
+    )
+
+def select_contadores(comp_id: int):
+    """(id_problema, total, aceitos, soma dos timestamps) das submissões da competição."""
+    P = models.Problema
+    return (
+        _agregar_submissoes(P.id_competicao == comp_id)
+        .join(P, P.id_problema == models.Submissao.id_problema)
+    )
+
+async def _descontar_submissoes(db: AsyncSession, *condicoes) -> set:
+    """Retira dos contadores as submissões que um ON DELETE CASCADE vai apagar.
+
+    Chame na transação do delete; devolve as competições afetadas.
+    """
+    deltas = {
+        id_problema: [-total, -(aceitos or 0), -int(soma or 0)]
+        for id_problema, total, aceitos, soma in await db.execute(_agregar_submissoes(*condicoes))
+    }
+    await _somar_contadores(db, deltas)
+    return {await placar.id_competicao(db, p) for p in deltas}
+
+async def recalcular_estatistica(db: AsyncSession, comp_id: int):
+    """Refaz do zero os contadores de uma competição (reconciliação)."""
+    P, EP = models.Problema, models.EstatisticaProblema
+    por_problema = {
+        id_problema: (total, aceitos or 0, soma or 0)
+        for id_problema, total, aceitos, soma in await db.execute(select_contadores(comp_id))
+    }
+    await db.execute(delete(EP).where(EP.id_competicao == comp_id).execution_options(synchronize_session=False))
+    for id_problema in await db.scalars(select(P.id_problema).where(P.id_competicao == comp_id)):
+        total, aceitos, _ = por_problema.get(id_problema, (0, 0, 0))
+        db.add(EP(id_problema=id_problema, id_competicao=comp_id, total_submissoes=total, total_aceitos=aceitos))
+    await db.flush()
+
+    est = await get_estatistica_por_competicao(db, comp_id)
+    if not est:
+        est = models.Estatistica(id_competicao=comp_id)
+        db.add(est)
+    est.total_submissoes = sum(v[0] for v in por_problema.values())
+    est.total_aceitos = sum(v[1] for v in por_problema.values())
+    est.soma_timestamps = int(sum(v[2] for v in por_problema.values()))
+    est.problema_mais_dificil = await db.scalar(select(_problema_mais_dificil(comp_id)))
+    await db.commit()
+    return est
+
+async def get_estatistica_por_competicao(db: AsyncSession, comp_id: int):
+    return await db.scalar(select(models.Estatistica).where(models.Estatistica.id_competicao == comp_id))
+
+async def get_estatisticas(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await paginacao.paginar(db, select(models.Estatistica), models.Estatistica, skip, limit, cursor)
+
+async def get_estatistica(db: AsyncSession, estat_id: int):
+    return await db.scalar(select(models.Estatistica).where(models.Estatistica.id_estatistica == estat_id))
 
 # Colaboradores
-def get_colaboradores(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Colaborador).offset(skip).limit(limit).all()
+def _select_colaboradores():
+    # nome_equipe/num_competicoes vêm como subconsultas no SELECT e o usuário pelo JOIN
+    return select(models.Colaborador).options(*carregamento(schemas.ColaboradorRead, models.Colaborador))
+
+async def get_colaboradores(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await paginacao.paginar(db, _select_colaboradores(), models.Colaborador, skip, limit, cursor)
 
-def get_colaborador(db: Session, user_id: int):
-    return db.query(models.Colaborador).filter(models.Colaborador.id_usuario == user_id).first()
+async def get_colaborador(db: AsyncSession, user_id: int):
+    return await db.scalar(_select_colaboradores().where(models.Colaborador.id_usuario == user_id))
 
-def create_colaborador(db: Session, c: schemas.ColaboradorCreate):
+async def create_colaborador(db: AsyncSession, c: schemas.ColaboradorCreate):
     db_c = models.Colaborador(
         id_usuario=c.id_usuario,
         papel=c.papel,
         id_equipe=c.id_equipe or None,
         instituicao=getattr(c, "instituicao", None)
     )
-    db.add(db_c); db.commit(); db.refresh(db_c)
-    return db_c
+    db.add(db_c); await db.commit()
+    return await _recarregar(db, _select_colaboradores().where(models.Colaborador.id_usuario == db_c.id_usuario))
 
-def update_colaborador(db: Session, user_id: int, c_in: schemas.ColaboradorUpdate):
-    db_c = get_colaborador(db, user_id)
+async def update_colaborador(db: AsyncSession, user_id: int, c_in: schemas.ColaboradorUpdate):
+    db_c = await get_colaborador(db, user_id)
     if not db_c:
         return None
     data = c_in.dict(exclude_unset=True)
@@ -297,110 +834,132 @@ def update_colaborador(db: Session, user_id: int, c_in: schemas.ColaboradorUpdat
             data["papel"] = models.ColaboradorPapel(data["papel"])
     for field, value in data.items():
         setattr(db_c, field, value)
-    db.commit()
-    db.refresh(db_c)
+    await db.commit()
+    await db.refresh(db_c)
     return db_c
 
-def delete_colaborador(db: Session, user_id: int):
-    db_c = get_colaborador(db, user_id)
+async def delete_colaborador(db: AsyncSession, user_id: int):
+    db_c = await get_colaborador(db, user_id)
     if not db_c:
         return False
-    db.delete(db_c); db.commit()
+    await db.delete(db_c); await db.commit()
     return True
 
 # Participantes
-def get_participantes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Participante).offset(skip).limit(limit).all()
+def _select_participantes():
+    # num_competicoes/num_submissoes já vêm como agregados no SELECT;
+    # o usuário aninhado em ParticipanteRead vem pelo mesmo JOIN
+    return select(models.Participante).options(*carregamento(schemas.ParticipanteRead, models.Participante))
 
-def get_participante(db: Session, user_id: int):
-    return db.query(models.Participante).filter(models.Participante.id_usuario == user_id).first()
+async def get_participantes(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await paginacao.paginar(db, _select_participantes(), models.Participante, skip, limit, cursor)
 
-def create_participante(db: Session, p: schemas.ParticipanteCreate):
+async def get_participante(db: AsyncSession, user_id: int):
+    return await db.scalar(_select_participantes().where(models.Participante.id_usuario == user_id))
+
+async def create_participante(db: AsyncSession, p: schemas.ParticipanteCreate):
     db_p = models.Participante(
         id_usuario=p.id_usuario,
-        instituicao=p.instituicao,  
+        instituicao=p.instituicao,
     )
-    db.add(db_p); db.commit(); db.refresh(db_p)
-    return db_p
+    db.add(db_p); await db.commit()
+    return await _recarregar(db, _select_participantes().where(models.Participante.id_usuario == db_p.id_usuario))
 
-def update_participante(db: Session, user_id: int, p_in: schemas.ParticipanteUpdate):
-    db_p = get_participante(db, user_id)
+async def update_participante(db: AsyncSession, user_id: int, p_in: schemas.ParticipanteUpdate):
+    db_p = await get_participante(db, user_id)
     if not db_p:
         return None
     for field, value in p_in.dict(exclude_unset=True).items():
         setattr(db_p, field, value)
-    db.commit(); db.refresh(db_p)
+    await db.commit(); await db.refresh(db_p)
     return db_p
 
 
-def delete_participante(db: Session, user_id: int):
-    db_p = get_participante(db, user_id)
+async def delete_participante(db: AsyncSession, user_id: int):
+    db_p = await get_participante(db, user_id)
     if not db_p:
         return False
-    db.delete(db_p); db.commit()
+    competicoes = await _descontar_submissoes(db, models.Submissao.id_usuario == user_id)
+    await db.delete(db_p); await db.commit()
+    for comp_id in competicoes:
+        placar.descartar(comp_id)
     return True
 
 # Patrocinadores
-def get_patrocinadores(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Patrocinador).offset(skip).limit(limit).all()
+def _select_patrocinadores():
+    # num_competicoes/total_contribuicao vêm como agregados no SELECT
+    return select(models.Patrocinador).options(*carregamento(schemas.PatrocinadorRead, models.Patrocinador))
 
-def get_patrocinador(db: Session, user_id: int):
-    return db.query(models.Patrocinador).filter(models.Patrocinador.id_usuario == user_id).first()
+async def get_patrocinadores(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await paginacao.paginar(db, _select_patrocinadores(), models.Patrocinador, skip, limit, cursor)
 
-def create_patrocinador(db: Session, p: schemas.PatrocinadorCreate):
+async def get_patrocinador(db: AsyncSession, user_id: int):
+    return await db.scalar(_select_patrocinadores().where(models.Patrocinador.id_usuario == user_id))
+
+async def create_patrocinador(db: AsyncSession, p: schemas.PatrocinadorCreate):
     db_p = models.Patrocinador(
         id_usuario=p.id_usuario,
     )
-    db.add(db_p); db.commit(); db.refresh(db_p)
-    return db_p
+    db.add(db_p); await db.commit()
+    return await _recarregar(db, _select_patrocinadores().where(models.Patrocinador.id_usuario == db_p.id_usuario))
 
-def update_patrocinador(db: Session, user_id: int, p_in: schemas.PatrocinadorCreate):
-    db_p = get_patrocinador(db, user_id)
+async def update_patrocinador(db: AsyncSession, user_id: int, p_in: schemas.PatrocinadorCreate):
+    db_p = await get_patrocinador(db, user_id)
     if not db_p:
         return None
     for field, value in p_in.dict(exclude_unset=True).items():
         setattr(db_p, field, value)
-    db.commit(); db.refresh(db_p)
+    await db.commit(); await db.refresh(db_p)
     return db_p
 
-def delete_patrocinador(db: Session, user_id: int):
-    db_p = get_patrocinador(db, user_id)
+async def delete_patrocinador(db: AsyncSession, user_id: int):
+    db_p = await get_patrocinador(db, user_id)
     if not db_p:
         return False
-    db.delete(db_p); db.commit()
+    await db.delete(db_p); await db.commit()
     return True
 
 # Competicao Patrocinador
-def get_competicao_patrocinador(db: Session, user_id: int, comp_id: int):
-    return db.query(models.CompeticaoPatrocinador).filter(models.CompeticaoPatrocinador.id_usuario_patro == user_id 
-                                                          and models.CompeticaoPatrocinador.id_competicao == comp_id).first()
+def _select_patrocinios():
+    # Patrocinador (com seus agregados) e usuário vêm no mesmo SELECT do vínculo
+    return select(models.CompeticaoPatrocinador).options(
+        *carregamento(schemas.CompeticaoPatrocinadorRead, models.CompeticaoPatrocinador)
+    )
+
+async def get_patrocinios(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await paginacao.paginar(db, _select_patrocinios(), models.CompeticaoPatrocinador, skip, limit, cursor)
+
+async def get_competicao_patrocinador(db: AsyncSession, user_id: int, comp_id: int):
+    return await db.scalar(_select_patrocinios().where(models.CompeticaoPatrocinador.id_usuario_patro == user_id,
+                                                       models.CompeticaoPatrocinador.id_competicao == comp_id))
 
-def create_competicao_patrocinador(db: Session, comp_id: int, user_id: int, contribuicao: float):
+async def create_competicao_patrocinador(db: AsyncSession, comp_id: int, user_id: int, contribuicao: float):
     link = models.CompeticaoPatrocinador(
         id_competicao=comp_id,
         id_usuario_patro=user_id,
         contribuicao=contribuicao
     )
     db.add(link)
-    db.commit()
-    db.refresh(link)
-    return link
+    await db.commit()
+    return await _recarregar(db, _select_patrocinios().where(models.CompeticaoPatrocinador.id_link == link.id_link))
 
-def update_competicao_patrocinador(db: Session, user_id: int, comp_id: int, cp_in: schemas.CompeticaoPatrocinadorCreate):
-    db_p = get_competicao_patrocinador(db, user_id, comp_id)
+async def update_competicao_patrocinador(db: AsyncSession, user_id: int, comp_id: int, cp_in: schemas.CompeticaoPatrocinadorCreate):
+    db_p = await get_competicao_patrocinador(db, user_id, comp_id)
     if not db_p:
         return None
     for field, value in cp_in.dict(exclude_unset=True).items():
         setattr(db_p, field, value)
-    db.commit(); db.refresh(db_p)
+    await db.commit(); await db.refresh(db_p)
     return db_p
 
-def delete_competicao_patrocinador(db: Session, user_id: int, comp_id: int):
-    db_p = get_competicao_patrocinador(db, user_id,comp_id)
+async def delete_competicao_patrocinador(db: AsyncSession, user_id: int, comp_id: int):
+    db_p = await get_competicao_patrocinador(db, user_id,comp_id)
     if not db_p:
         return False
-    db.delete(db_p); db.commit()
+    await db.delete(db_p); await db.commit()
     return True
 
-def get_patrocinios_por_competicao(db: Session, comp_id: int):
-    return db.query(models.CompeticaoPatrocinador).filter(models.CompeticaoPatrocinador.id_competicao == comp_id).all()
\ No newline at end of file
+async def get_patrocinios_por_competicao(db: AsyncSession, comp_id: int):
+    return (await db.scalars(
+        _select_patrocinios().where(models.CompeticaoPatrocinador.id_competicao == comp_id)
+    )).all()
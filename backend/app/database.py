@@ -1,21 +1,135 @@
 import os
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .cache import SessaoComCache
 
-# ...
 load_dotenv(encoding="utf-8")
 DATABASE_URL = os.getenv("DATABASE_URL")
-print("→ carregou DATABASE_URL:", repr(DATABASE_URL))   # <— adicione isto
 
-engine = create_engine(DATABASE_URL, echo=True)
+def _env_bool(nome: str, padrao: bool) -> bool:
+    return os.getenv(nome, str(padrao)).strip().lower() in ("1", "true", "sim", "yes")
+
+# Pool de conexões (por processo): pool_size + max_overflow conexões no
+# máximo, então workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) precisa caber no
+# max_connections do Postgres
+DB_ECHO = _env_bool("DB_ECHO", False)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))      # segundos esperando uma conexão livre
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # segundos até reabrir uma conexão
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+# statement_timeout (ms) aplicado pelo servidor em cada transação, por classe de requisição
+TIMEOUTS_CONSULTA = {
+    "leitura": int(os.getenv("DB_TIMEOUT_LEITURA_MS", "5000")),    # GET
+    "escrita": int(os.getenv("DB_TIMEOUT_ESCRITA_MS", "10000")),   # POST/PUT/DELETE comuns
+    "lote": int(os.getenv("DB_TIMEOUT_LOTE_MS", "120000")),        # cargas e importações
+}
+
+# Driver assíncrono equivalente ao da DATABASE_URL (a API usa só o engine assíncrono)
+DRIVERS_ASYNC = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def _url_async(url: str) -> str:
+    u = make_url(url)
+    return u.set(drivername=DRIVERS_ASYNC.get(u.drivername, u.drivername)).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _url_async(DATABASE_URL)
+
+
+class PoolMedido(AsyncAdaptedQueuePool):
+    """QueuePool que mede quanto cada checkout esperou por uma conexão."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            self.checkouts += 1
+            self.espera_total += espera
+            self.espera_max = max(self.espera_max, espera)
+
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=PoolMedido,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+# expire_on_commit=False: depois do commit os objetos continuam legíveis sem
+# nova consulta (em async não existe carga preguiçosa implícita); SessaoComCache
+# invalida o cache de respostas (app/cache.py) das tabelas escritas a cada commit
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=SessaoComCache, autoflush=False, expire_on_commit=False)
+
+# Engine síncrono, só para scripts e ferramentas fora da API
+engine = create_engine(DATABASE_URL, echo=DB_ECHO, pool_pre_ping=DB_POOL_PRE_PING)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+@event.listens_for(Session, "after_begin")
+def _aplicar_statement_timeout(session, transaction, connection):
+    timeout = session.info.get("statement_timeout")
+    if timeout and connection.dialect.name == "postgresql":
+        # SET LOCAL vale só até o fim desta transação
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+def estatisticas_pool() -> dict:
+    pool = async_engine.pool
+    return {
+        "tamanho": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "em_uso": pool.checkedout(),
+        "livres": pool.checkedin(),
+        # conexões além de pool_size abertas agora (negativo: pool ainda não encheu)
+        "overflow": pool.overflow(),
+        "checkouts": pool.checkouts,
+        "espera_media_ms": round(pool.espera_total * 1000 / pool.checkouts, 3) if pool.checkouts else 0.0,
+        "espera_max_ms": round(pool.espera_max * 1000, 3),
+        "timeouts": pool.timeouts,
+    }
+
+
+@asynccontextmanager
+async def sessao(classe: str):
+    async with AsyncSessionLocal() as db:
+        db.info["statement_timeout"] = TIMEOUTS_CONSULTA[classe]
+        yield db
+
+async def get_db(request: Request):
+    classe = "leitura" if request.method in ("GET", "HEAD") else "escrita"
+    async with sessao(classe) as db:
+        yield db
+
+async def get_db_lote():
+    """Sessão para cargas em lote/importações (statement_timeout maior)."""
+    async with sessao("lote") as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,167 @@
+# backend/app/eventos.py
+# Eventos ao vivo por competição, entregues por Server-Sent Events
+# (GET /competicoes/{id}/eventos).
+#
+# Depois do commit, o crud publica "submissao" (nova ou mudança de status),
+# "inscricao" e, via placar.py, "placar" (linha do participante cujo total
+# mudou). Cada evento é codificado uma vez e posto, sem await, na fila de cada
+# assinante da competição: quem publica nunca espera um cliente.
+#
+# Contrapressão por conexão: a fila de um assinante guarda no máximo
+# EVENTOS_FILA eventos. Se o cliente não consome (rede lenta, aba em segundo
+# plano) e a fila enche, ela é esvaziada e no lugar vai um único "resync": o
+# cliente recarrega placar/listas pela API. A memória por conexão fica
+# limitada e publicar continua O(assinantes).
+#
+# Um espectador ocioso custa uma deque vazia e a corrotina da resposta parada
+# num await (nenhuma task nem conexão com o banco por espectador); um
+# comentário SSE a cada EVENTOS_HEARTBEAT s mantém proxies abertos e faz a
+# queda do cliente aparecer.
+#
+# Não há histórico para repetir eventos perdidos: a abertura do stream manda
+# um id fixo (sem evento), então o EventSource sempre reconecta com
+# Last-Event-ID, e quem reconecta recebe "resync" logo de início em vez de
+# seguir sem o que foi publicado enquanto esteve fora. Os eventos não levam id
+# próprio (com Redis cada worker numeraria os seus).
+#
+# Como o placar, o estado é do processo. Com vários workers defina
+# EVENTOS_REDIS_URL: publicar vira um PUBLISH no Redis e cada worker repassa
+# aos próprios assinantes a partir de uma única assinatura (requer o pacote redis).
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+
+from .serializacao import dumps
+
+logger = logging.getLogger(__name__)
+
+EVENTOS_FILA = int(os.getenv("EVENTOS_FILA", "256"))
+EVENTOS_HEARTBEAT = float(os.getenv("EVENTOS_HEARTBEAT", "15"))
+EVENTOS_REDIS_URL = os.getenv("EVENTOS_REDIS_URL")
+CANAL_REDIS = "eventos:"
+
+ASSINANTES = Gauge("api_eventos_assinantes", "Conexões SSE abertas neste processo")
+RESYNCS = Counter("api_eventos_resync", "Filas de assinantes descartadas por estarem cheias")
+
+RESYNC = b"event: resync\ndata: {}\n\n"
+PING = b": ping\n\n"
+ABERTURA = b"retry: 3000\nid: conectado\n\n"
+
+_assinantes: dict = {}     # id_competicao -> set[Assinante]
+_redis = None
+_repasse: Optional[asyncio.Task] = None
+
+
+class Assinante:
+    __slots__ = ("fila", "sinal")
+
+    def __init__(self):
+        self.fila = deque()
+        self.sinal = asyncio.Event()
+
+    def entregar(self, mensagem: bytes):
+        if len(self.fila) >= EVENTOS_FILA:
+            self.fila.clear()
+            self.fila.append(RESYNC)
+            RESYNCS.inc()
+        elif not (self.fila and self.fila[0] is RESYNC):
+            # depois de um resync o cliente vai recarregar tudo: descarta até ele ler
+            self.fila.append(mensagem)
+        self.sinal.set()
+
+    def retirar(self) -> bytes:
+        self.sinal.clear()
+        mensagens = b"".join(self.fila)
+        self.fila.clear()
+        return mensagens
+
+
+def codificar(tipo: str, dados: dict) -> bytes:
+    return b"event: %s\ndata: %s\n\n" % (tipo.encode(), dumps(dados))
+
+
+def _repassar(comp_id: int, mensagem: bytes):
+    for assinante in _assinantes.get(comp_id, ()):
+        assinante.entregar(mensagem)
+
+
+async def publicar(comp_id: Optional[int], tipo: str, dados: dict):
+    """Entrega o evento aos assinantes da competição (chame depois do commit)."""
+    if comp_id is None:
+        return
+    mensagem = codificar(tipo, dados)
+    if _redis is not None:
+        try:
+            await _redis.publish(f"{CANAL_REDIS}{comp_id}", mensagem)
+            return
+        except Exception:
+            # Redis fora do ar: ao menos os assinantes deste processo recebem
+            logger.exception("Falha ao publicar evento no Redis")
+    _repassar(comp_id, mensagem)
+
+
+def tem_assinantes(comp_id: int) -> bool:
+    return bool(_assinantes.get(comp_id))
+
+
+async def transmitir(comp_id: int, reconexao: bool = False):
+    """Corpo da resposta SSE de um assinante; termina quando o cliente desconecta.
+
+    reconexao: a requisição trouxe Last-Event-ID, ou seja, o cliente pode ter
+    perdido eventos e começa com um "resync".
+    """
+    assinante = Assinante()
+    _assinantes.setdefault(comp_id, set()).add(assinante)
+    ASSINANTES.inc()
+    try:
+        yield ABERTURA + RESYNC if reconexao else ABERTURA
+        while True:
+            try:
+                async with asyncio.timeout(EVENTOS_HEARTBEAT):
+                    await assinante.sinal.wait()
+            except TimeoutError:
+                yield PING
+                continue
+            yield assinante.retirar()
+    finally:
+        ASSINANTES.dec()
+        assinantes = _assinantes.get(comp_id)
+        if assinantes is not None:
+            assinantes.discard(assinante)
+            if not assinantes:
+                del _assinantes[comp_id]
+
+
+async def _repassar_do_redis(pubsub):
+    async for mensagem in pubsub.listen():
+        if mensagem["type"] == "pmessage":
+            comp_id = int(mensagem["channel"].decode()[len(CANAL_REDIS):])
+            _repassar(comp_id, mensagem["data"])
+
+
+async def iniciar():
+    global _redis, _repasse
+    if not EVENTOS_REDIS_URL:
+        return
+    try:
+        import redis.asyncio as redis
+    except ImportError as e:
+        raise RuntimeError("EVENTOS_REDIS_URL requer o pacote redis (pip install redis)") from e
+    _redis = redis.from_url(EVENTOS_REDIS_URL)
+    pubsub = _redis.pubsub()
+    await pubsub.psubscribe(f"{CANAL_REDIS}*")
+    _repasse = asyncio.create_task(_repassar_do_redis(pubsub))
+
+
+async def parar():
+    global _redis, _repasse
+    if _repasse is not None:
+        _repasse.cancel()
+        _repasse = None
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
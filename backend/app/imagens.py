@@ -0,0 +1,58 @@
+# backend/app/imagens.py
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Tamanhos fixos (maior lado, em pixels) gerados a partir da foto enviada
+TAMANHOS_FOTO = {
+    "miniatura": 96,   # listas e cards
+    "media": 512,      # página de perfil
+}
+QUALIDADE_JPEG = 85
+
+# Pillow libera o GIL na decodificação/redimensionamento, então threads bastam
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("IMAGENS_WORKERS", "2")),
+    thread_name_prefix="imagens",
+)
+
+
+class ImagemInvalida(ValueError):
+    pass
+
+
+def _redimensionar(img: Image.Image, lado: int) -> bytes:
+    copia = img.copy()
+    copia.thumbnail((lado, lado), Image.LANCZOS)
+    saida = io.BytesIO()
+    copia.save(saida, format="JPEG", quality=QUALIDADE_JPEG, optimize=True, progressive=True)
+    return saida.getvalue()
+
+
+def gerar_variantes(dados: bytes) -> dict:
+    """Decodifica a imagem e devolve {tamanho: bytes JPEG} para cada TAMANHOS_FOTO."""
+    try:
+        img = Image.open(io.BytesIO(dados))
+        img = ImageOps.exif_transpose(img)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ImagemInvalida(str(e)) from e
+
+    # JPEG não tem transparência: achata sobre fundo branco
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        fundo = Image.new("RGB", img.size, (255, 255, 255))
+        fundo.paste(img, mask=img.getchannel("A"))
+        img = fundo
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    return {nome: _redimensionar(img, lado) for nome, lado in TAMANHOS_FOTO.items()}
+
+
+async def processar_foto(dados: bytes) -> dict:
+    """Executa gerar_variantes fora do event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, gerar_variantes, dados)
@@ -0,0 +1,240 @@
+# backend/app/julgamento.py
+# Fila de julgamento das submissões pendentes.
+#
+# A fila é a própria tabela submissao: cada laço reserva um lote de pendentes
+# numa transação curta (SELECT ... FOR UPDATE SKIP LOCKED, marca
+# submissao.reservada_ate e soma uma tentativa; crud.reivindicar_pendentes),
+# manda o lote para o juiz num pool de processos sem segurar conexão do pool do
+# banco e grava todos os veredictos num UPDATE só, numa segunda transação
+# (crud.gravar_julgamentos). Laços concorrentes, no mesmo processo ou em outras
+# máquinas, nunca pegam a mesma linha; se um cair no meio, a reserva vence
+# depois de JULGAMENTO_RESERVA segundos e o lote volta à fila.
+#
+# Se o lote falhar (o juiz levanta exceção, morre ou devolve um veredicto
+# inválido), as reservas são desfeitas e as submissões são julgadas uma a uma:
+# as boas seguem, e cada uma que falhar de novo gasta uma tentativa. Com
+# JULGAMENTO_TENTATIVAS tentativas ela vira status erro (fora da fila e do
+# índice parcial das pendentes) e não trava as que vêm depois.
+#
+# O juiz é um callable juiz(submissoes: list[dict]) -> list[str] ("aceito" ou
+# "rejeitado", na mesma ordem), indicado por JULGAMENTO_JUIZ="modulo:funcao".
+# Roda nos processos do pool, fora do event loop da API. O padrão é
+# juiz_falso, determinístico, para desenvolvimento e testes.
+#
+# Na API, JULGAMENTO_PROCESSOS > 0 liga a fila no startup (um laço por
+# processo do pool); o placar e os eventos do processo acompanham os
+# veredictos. Para máquinas só de julgamento: python -m app.julgamento
+# --processos 8 (aí o placar em memória dos processos da API não vê os
+# veredictos, como já acontece com escritas feitas em outro worker).
+import argparse
+import asyncio
+import hashlib
+import importlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from prometheus_client import Counter
+
+from . import crud
+from .database import async_engine, sessao
+
+logger = logging.getLogger(__name__)
+
+JULGAMENTO_PROCESSOS = int(os.getenv("JULGAMENTO_PROCESSOS", "0"))   # 0: fila desligada na API
+JULGAMENTO_LOTE = int(os.getenv("JULGAMENTO_LOTE", "50"))
+JULGAMENTO_INTERVALO = float(os.getenv("JULGAMENTO_INTERVALO", "0.5"))  # espera com a fila vazia (s)
+JULGAMENTO_JUIZ = os.getenv("JULGAMENTO_JUIZ", "app.julgamento:juiz_falso")
+JULGAMENTO_TENTATIVAS = int(os.getenv("JULGAMENTO_TENTATIVAS", "3"))  # falhas até sair da fila
+JULGAMENTO_ESPERA_MAX = float(os.getenv("JULGAMENTO_ESPERA_MAX", "30"))  # teto da espera após erros (s)
+JULGAMENTO_RESERVA = float(os.getenv("JULGAMENTO_RESERVA", "300"))  # prazo do juiz para um lote (s)
+# Juiz falso: % de aceites e tempo simulado por submissão
+JUIZ_FALSO_ACEITES = int(os.getenv("JUIZ_FALSO_ACEITES", "40"))
+JUIZ_FALSO_MS = float(os.getenv("JUIZ_FALSO_MS", "0"))
+
+JULGADAS = Counter("api_julgamento_submissoes", "Submissões julgadas pela fila", ["veredicto"])
+FALHAS = Counter("api_julgamento_falhas", "Tentativas de julgamento que falharam", ["desistencia"])
+
+_tarefas: list = []
+_pool: Optional[ProcessPoolExecutor] = None
+_processos = 0
+
+
+def juiz_falso(submissoes: list) -> list:
+    """Veredicto estável por submissão (hash do id), com JUIZ_FALSO_MS de 'execução' cada."""
+    veredictos = []
+    for s in submissoes:
+        if JUIZ_FALSO_MS:
+            time.sleep(JUIZ_FALSO_MS / 1000)
+        sorteio = hashlib.blake2b(str(s["id_submissao"]).encode(), digest_size=2).digest()
+        veredictos.append("aceito" if int.from_bytes(sorteio, "big") % 100 < JUIZ_FALSO_ACEITES else "rejeitado")
+    return veredictos
+
+
+_juizes: dict = {}
+
+
+def _julgar(caminho: str, submissoes: list) -> list:
+    # roda no processo do pool; o juiz é importado uma vez por processo
+    if caminho not in _juizes:
+        modulo, nome = caminho.split(":")
+        _juizes[caminho] = getattr(importlib.import_module(modulo), nome)
+    return list(_juizes[caminho](submissoes))
+
+
+def _executor() -> ProcessPoolExecutor:
+    # um juiz que derruba o processo (ex.: segfault) quebra o pool inteiro: troca por um novo
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=_processos or 1)
+    return _pool
+
+
+def _descartar_pool(quebrado: ProcessPoolExecutor):
+    global _pool
+    if _pool is quebrado:
+        _pool = None
+    quebrado.shutdown(wait=False, cancel_futures=True)
+
+
+async def _executar(juiz: str, linhas: list) -> list:
+    executor = _executor()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, _julgar, juiz, linhas)
+    except BrokenProcessPool:
+        _descartar_pool(executor)
+        raise
+
+
+async def _julgar_uma(id_submissao: int, juiz: str, tentativas: int, reserva: float) -> int:
+    async with sessao("lote") as db:
+        linhas = await crud.reivindicar_pendentes(db, 1, reserva, tentativas, id_submissao)
+    if not linhas:
+        # outro laço pegou ou já julgou
+        return 0
+    try:
+        veredictos = await _executar(juiz, linhas)
+        async with sessao("lote") as db:
+            gravadas = await crud.gravar_julgamentos(db, linhas, veredictos)
+    except Exception:
+        async with sessao("lote") as db:
+            desistiu = await crud.registrar_falha_julgamento(db, linhas[0], tentativas)
+        FALHAS.labels(str(desistiu).lower()).inc()
+        logger.exception("Falha ao julgar a submissão %d (%d de %d tentativas%s)", id_submissao,
+                         linhas[0]["tentativas"], tentativas, "; marcada como erro" if desistiu else "")
+        return 0
+    JULGADAS.labels(veredictos[0]).inc(gravadas)
+    return gravadas
+
+
+async def processar_lote(lote: int = JULGAMENTO_LOTE, juiz: str = JULGAMENTO_JUIZ,
+                         tentativas: int = JULGAMENTO_TENTATIVAS,
+                         reserva: float = JULGAMENTO_RESERVA) -> tuple[int, bool]:
+    """Reserva, julga e grava um lote; devolve (submissões julgadas, se o lote falhou)."""
+    async with sessao("lote") as db:
+        linhas = await crud.reivindicar_pendentes(db, lote, reserva, tentativas)
+    if not linhas:
+        return 0, False
+    try:
+        veredictos = await _executar(juiz, linhas)
+        async with sessao("lote") as db:
+            gravadas = await crud.gravar_julgamentos(db, linhas, veredictos)
+    except Exception:
+        logger.exception("Falha ao julgar lote de %d submissões; julgando uma a uma", len(linhas))
+        async with sessao("lote") as db:
+            await crud.liberar_reservas(db, linhas)
+    else:
+        for v in veredictos:
+            JULGADAS.labels(v).inc()
+        return gravadas, False
+    julgadas = 0
+    for linha in linhas:
+        julgadas += await _julgar_uma(linha["id_submissao"], juiz, tentativas, reserva)
+    return julgadas, True
+
+
+async def _laco(lote: int, juiz: str, intervalo: float, tentativas: int, reserva: float):
+    erros = 0
+    while True:
+        try:
+            julgadas, falhou = await processar_lote(lote, juiz, tentativas, reserva)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # ex.: banco fora do ar; reservas feitas vencem e o lote volta para a fila
+            logger.exception("Falha ao julgar lote de submissões")
+            julgadas, falhou = 0, True
+        # só conta como erro o lote em que nada foi julgado (uma a uma todas podem ter passado)
+        erros = erros + 1 if falhou and not julgadas else 0
+        if erros:
+            # falhas seguidas: espera cada vez mais (até JULGAMENTO_ESPERA_MAX) antes de tentar de novo
+            await asyncio.sleep(min(intervalo * 2 ** erros, JULGAMENTO_ESPERA_MAX))
+        elif julgadas < lote and not falhou:
+            # fila vazia (ou quase): espera antes de consultar de novo
+            await asyncio.sleep(intervalo)
+
+
+def _paralelismo(processos: int) -> int:
+    if async_engine.dialect.name != "postgresql" and processos > 1:
+        # sem SKIP LOCKED (ex.: SQLite) dois laços pegariam as mesmas linhas
+        logger.warning("Fila de julgamento com um laço só: %s não tem FOR UPDATE SKIP LOCKED",
+                       async_engine.dialect.name)
+        return 1
+    return processos
+
+
+async def iniciar(processos: int = JULGAMENTO_PROCESSOS, lote: int = JULGAMENTO_LOTE,
+                  juiz: str = JULGAMENTO_JUIZ, intervalo: float = JULGAMENTO_INTERVALO,
+                  tentativas: int = JULGAMENTO_TENTATIVAS, reserva: float = JULGAMENTO_RESERVA):
+    """Sobe o pool e um laço de reivindicação por processo (nada se processos == 0)."""
+    global _processos
+    if processos <= 0 or _tarefas:
+        return
+    _processos = processos
+    _executor()
+    for _ in range(_paralelismo(processos)):
+        _tarefas.append(asyncio.create_task(_laco(lote, juiz, intervalo, tentativas, reserva)))
+
+
+async def parar():
+    global _pool
+    for tarefa in _tarefas:
+        tarefa.cancel()
+    await asyncio.gather(*_tarefas, return_exceptions=True)
+    _tarefas.clear()
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def _rodar(args):
+    await iniciar(args.processos, args.lote, args.juiz, args.intervalo, args.tentativas, args.reserva)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await parar()
+        await async_engine.dispose()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Julga as submissões pendentes (fila na tabela submissao)")
+    p.add_argument("--processos", type=int, default=JULGAMENTO_PROCESSOS or os.cpu_count() or 2)
+    p.add_argument("--lote", type=int, default=JULGAMENTO_LOTE)
+    p.add_argument("--juiz", default=JULGAMENTO_JUIZ, help="modulo:funcao do juiz")
+    p.add_argument("--intervalo", type=float, default=JULGAMENTO_INTERVALO)
+    p.add_argument("--tentativas", type=int, default=JULGAMENTO_TENTATIVAS,
+                   help="tentativas até a submissão virar erro")
+    p.add_argument("--reserva", type=float, default=JULGAMENTO_RESERVA,
+                   help="segundos até um lote reservado e não gravado voltar à fila")
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_rodar(p.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from . import models
+from sqlalchemy import exc as sa_exc
+from .database import async_engine, Base, sessao
+from . import cache, eventos, julgamento, models, paginacao, placar, security, observabilidade
 from .routers import (competicoes, usuarios, equipes, inscricoes, problemas,
                       submissoes, estatisticas, colaboradores, participantes,
-                      patrocinadores, auth, competicaopatrocinador, universidades)
-
-Base.metadata.create_all(bind=engine)
+                      patrocinadores, auth, competicaopatrocinador, universidades,
+                      metricas)
 
 app = FastAPI(title="Marathon Manager API")
 
@@ -18,7 +19,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[paginacao.CABECALHO_PROXIMO, cache.CABECALHO_CACHE, *observabilidade.CABECALHOS],
 )
+# Consultas/tempo de banco por requisição (cabeçalhos X-DB-*, log e /metrics)
+app.add_middleware(observabilidade.MiddlewareConsultas)
+
+@app.on_event("startup")
+async def criar_tabelas():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+@app.on_event("startup")
+async def carregar_placares():
+    async with sessao("lote") as db:
+        await placar.reconstruir_ativos(db)
+
+@app.on_event("startup")
+async def iniciar_eventos():
+    await eventos.iniciar()
+
+@app.on_event("shutdown")
+async def parar_eventos():
+    await eventos.parar()
+
+@app.on_event("startup")
+async def iniciar_julgamento():
+    # só com JULGAMENTO_PROCESSOS > 0 (ver julgamento.py)
+    await julgamento.iniciar()
+
+@app.on_event("shutdown")
+async def parar_julgamento():
+    await julgamento.parar()
+
+@app.exception_handler(paginacao.CursorInvalido)
+def cursor_invalido(request: Request, exc: paginacao.CursorInvalido):
+    return JSONResponse(status_code=400, content={"detail": "Cursor inválido"})
+
+@app.exception_handler(security.FilaHashCheia)
+def fila_hash_cheia(request: Request, exc: security.FilaHashCheia):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado, tente novamente em instantes"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(sa_exc.TimeoutError)
+def pool_esgotado(request: Request, exc: sa_exc.TimeoutError):
+    # nenhuma conexão livre no pool dentro de DB_POOL_TIMEOUT
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Banco de dados sobrecarregado, tente novamente em instantes"},
+        headers={"Retry-After": "1"},
+    )
 
 app.include_router(competicoes.router)
 app.include_router(usuarios.router)
@@ -33,6 +85,7 @@ app.include_router(patrocinadores.router)
 app.include_router(auth.router)
 app.include_router(competicaopatrocinador.router)
 app.include_router(universidades.router)
+app.include_router(metricas.router)
 
 @app.get("/")
 def read_root():
@@ -3,13 +3,15 @@
 from sqlalchemy import (
     Column, Integer, String, Date, DECIMAL,
     ForeignKey, Enum, LargeBinary, DateTime, UniqueConstraint,
-    Time, Text, Boolean
+    Time, Text, Boolean, BigInteger, Index, text
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-from sqlalchemy.ext.hybrid import hybrid_property
-from datetime import datetime
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import relationship, column_property, deferred, validates
+import calendar
 import enum
+import hashlib
+from datetime import datetime
 
 from .database import Base
 
@@ -35,6 +37,7 @@ class SubmissaoStatus(enum.Enum):
     aceito = "aceito"
     rejeitado = "rejeitado"
     pendente = "pendente"
+    erro = "erro"           # o juiz falhou JULGAMENTO_TENTATIVAS vezes; fora da fila e do placar
 
 
 # 1. Usuário
@@ -47,12 +50,35 @@ class Usuario(Base):
     tipo = Column(Enum(UsuarioTipo), nullable=False)
 
     # Novo atributo
-    foto = Column(LargeBinary, nullable=True)
+    # Adiado: os bytes só são lidos quando acessados (ver GET /usuarios/{id}/foto)
+    foto = deferred(Column(LargeBinary, nullable=True))
+    # Variante reduzida para listas (a coluna foto guarda a versão média)
+    foto_miniatura = deferred(Column(LargeBinary, nullable=True))
+    # sha256 da foto, gravado junto com ela: o ETag da foto sai sem ler os bytes
+    foto_versao = Column(String(64), nullable=True)
 
     colaborador = relationship("Colaborador", uselist=False, back_populates="usuario")
     participante = relationship("Participante", uselist=False, back_populates="usuario")
     patrocinador = relationship("Patrocinador", uselist=False, back_populates="usuario")
-  
+
+    # Migração f5a2c8d0b7e1: a importação de inscritos compara e-mails em minúsculas
+    __table_args__ = (
+        Index("ix_usuario_email_lower", func.lower(email)),
+    )
+
+    @validates("foto")
+    def _versionar_foto(self, chave, foto):
+        self.foto_versao = hashlib.sha256(foto).hexdigest() if foto is not None else None
+        return foto
+
+    @property
+    def foto_url(self):
+        # aceita ?tamanho=miniatura para a variante reduzida
+        return f"/usuarios/{self.id_usuario}/foto" if self.tem_foto else None
+
+# Indica se há foto sem trazer os bytes da imagem
+Usuario.tem_foto = column_property(Usuario.foto.isnot(None))
+
 
 # 2. Equipe de Colaboradores
 class EquipeColaboradores(Base):
@@ -75,14 +101,7 @@ class Colaborador(Base):
     usuario = relationship("Usuario", back_populates="colaborador")
     equipe = relationship("EquipeColaboradores", back_populates="colaboradores")
 
-    @hybrid_property
-    def num_competicoes(self):
-        # Competicoes via equipe
-        return len(self.equipe.competicoes) if self.equipe else 0
-    
-    @hybrid_property
-    def nome_equipe(self):
-        return self.equipe.nome if self.equipe else None
+    # num_competicoes e nome_equipe são definidos em "Agregados"
 
 # 4. Participante
 class Participante(Base):
@@ -91,17 +110,13 @@ class Participante(Base):
     instituicao = Column(String(100))
 
     usuario = relationship("Usuario", back_populates="participante")
-    inscricoes = relationship("Inscricao", back_populates="participante")
-    submissoes = relationship("Submissao", back_populates="participante")
-
-    @hybrid_property
-    def num_competicoes(self):
-        # Competicoes via inscricoes
-        return len(self.inscricoes)
-    
-    @hybrid_property
-    def num_submissoes(self):
-        return len(self.submissoes)
+    # passive_deletes: inscrições e submissões saem pelo ON DELETE CASCADE do
+    # banco (o ORM tentaria anular a FK, que é NOT NULL)
+    inscricoes = relationship("Inscricao", back_populates="participante", passive_deletes=True)
+    submissoes = relationship("Submissao", back_populates="participante", passive_deletes=True)
+
+    # num_competicoes e num_submissoes são definidos no fim do módulo
+    # como agregados calculados pelo banco (ver "Agregados")
 
 # 5. Patrocinador
 class Patrocinador(Base):
@@ -111,14 +126,7 @@ class Patrocinador(Base):
     usuario = relationship("Usuario", back_populates="patrocinador")
     competicoes = relationship("CompeticaoPatrocinador", back_populates="patrocinador")
 
-    @hybrid_property
-    def num_competicoes(self):
-        # Competicoes via competicao_patrocinador
-        return len(self.competicoes)
-    
-    @hybrid_property
-    def total_contribuicao(self):
-        return sum(link.contribuicao for link in self.competicoes)
+    # num_competicoes e total_contribuicao são definidos em "Agregados"
 
 # 6. Competição
 class Competicao(Base):
@@ -139,22 +147,18 @@ class Competicao(Base):
     patrocinadores = relationship("CompeticaoPatrocinador", back_populates="competicao")
     inscricoes = relationship("Inscricao", back_populates="competicao")
     problemas = relationship("Problema", back_populates="competicao")
-    estatistica = relationship("Estatistica", uselist=False, back_populates="competicao")
-
-    @hybrid_property
-    def num_inscritos(self):
-        # contador simples em Python
-        return len(self.inscricoes)
-    
-    @hybrid_property
-    def status(self):
-        hoje = datetime.today().date()
-        if self.finalizada:
-            return "Finalizada"
-        if self.data >= hoje:
-            return "Em andamento"
-        else:
-            return "Finalizada"
+    estatistica = relationship("Estatistica", uselist=False, back_populates="competicao",
+                               cascade="all, delete-orphan")
+
+    # status calculado no próprio SELECT (permite filtrar/ordenar no banco)
+    status = column_property(
+        case(
+            (finalizada.is_(True), "Finalizada"),
+            (data >= func.current_date(), "Em andamento"),
+            else_="Finalizada",
+        )
+    )
+    # num_inscritos é definido em "Agregados", no fim do módulo
 
 # 7. CompeticaoPatrocinador
 class CompeticaoPatrocinador(Base):
@@ -178,7 +182,7 @@ class Inscricao(Base):
     __tablename__ = "inscricao"
     id_inscricao = Column(Integer, primary_key=True, index=True)
     categoria = Column(String(50))
-    id_usuario = Column(Integer, ForeignKey("participante.id_usuario"), nullable=False)
+    id_usuario = Column(Integer, ForeignKey("participante.id_usuario", ondelete="CASCADE"), nullable=False)
     id_competicao = Column(Integer, ForeignKey("competicao.id_competicao"), nullable=False)
 
     participante = relationship("Participante", back_populates="inscricoes")
@@ -186,6 +190,9 @@ class Inscricao(Base):
 
     __table_args__ = (
         UniqueConstraint("id_usuario", "id_competicao", name="uix_inscricao_usuario_competicao"),
+        # inscritos por competição (num_inscritos, /inscricoes/competicao/{id});
+        # por participante a unique acima já serve
+        Index("ix_inscricao_id_competicao", "id_competicao"),
     )
 
 
@@ -199,7 +206,12 @@ class Problema(Base):
     id_competicao = Column(Integer, ForeignKey("competicao.id_competicao"), nullable=False)
 
     competicao = relationship("Competicao", back_populates="problemas")
-    submissoes = relationship("Submissao", back_populates="problema")
+    submissoes = relationship("Submissao", back_populates="problema", passive_deletes=True)
+    estatistica = relationship("EstatisticaProblema", uselist=False, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_problema_id_competicao", "id_competicao"),
+    )
 
 
 # 10. Submissao
@@ -208,20 +220,136 @@ class Submissao(Base):
     id_submissao = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, nullable=False)
     status = Column(Enum(SubmissaoStatus), nullable=False)
-    id_problema = Column(Integer, ForeignKey("problema.id_problema"), nullable=False)
-    id_usuario = Column(Integer, ForeignKey("participante.id_usuario"), nullable=False)
+    id_problema = Column(Integer, ForeignKey("problema.id_problema", ondelete="CASCADE"), nullable=False)
+    id_usuario = Column(Integer, ForeignKey("participante.id_usuario", ondelete="CASCADE"), nullable=False)
+    # vezes que a fila de julgamento pegou a submissão (app/julgamento.py); no
+    # limite ela vira status erro e sai da fila
+    tentativas = Column(Integer, nullable=False, default=0, server_default="0")
+    # até quando a submissão está reservada para um laço de julgamento (UTC)
+    reservada_ate = Column(DateTime, nullable=True)
 
     problema = relationship("Problema", back_populates="submissoes")
     participante = relationship("Participante", back_populates="submissoes")
 
+    # Migração c7e1a9d4b2f6; os planos das consultas que dependem delas são
+    # conferidos por tests/test_planos.py
+    __table_args__ = (
+        # submissões de uma competição em ordem (placar, exportação, recálculo da estatística)
+        Index("ix_submissao_problema_timestamp", "id_problema", "timestamp", "id_submissao"),
+        # por participante (num_submissoes, view de estatísticas, célula do placar)
+        Index("ix_submissao_usuario_problema", "id_usuario", "id_problema", "timestamp"),
+        # chave da paginação por cursor de /submissoes/ (paginacao.CHAVES)
+        Index("ix_submissao_timestamp", "timestamp", "id_submissao"),
+        # fila das pendentes (~1% das linhas)
+        Index("ix_submissao_pendente", "timestamp", "id_submissao",
+              postgresql_where=text("status = 'pendente'"), sqlite_where=text("status = 'pendente'")),
+    )
+
 
 # 11. Estatistica
+# Contadores mantidos a cada escrita de submissão (ver crud._somar_contadores);
+# media_tempo e taxa_acerto são derivados deles na leitura.
 class Estatistica(Base):
     __tablename__ = "estatistica"
     id_estatistica = Column(Integer, primary_key=True, index=True)
-    media_tempo = Column(DECIMAL(10,2))
-    taxa_acerto = Column(DECIMAL(5,2))
     problema_mais_dificil = Column(String(100))
     id_competicao = Column(Integer, ForeignKey("competicao.id_competicao"), unique=True, nullable=False)
+    total_submissoes = Column(Integer, default=0, nullable=False)
+    total_aceitos = Column(Integer, default=0, nullable=False)
+    # soma dos timestamps das submissões, em segundos desde a época
+    soma_timestamps = Column(BigInteger, default=0, nullable=False)
 
     competicao = relationship("Competicao", back_populates="estatistica")
+
+    @property
+    def taxa_acerto(self):
+        if not self.total_submissoes:
+            return 0.0
+        return round(self.total_aceitos * 100.0 / self.total_submissoes, 2)
+
+    @property
+    def media_tempo(self):
+        # média de (agora - timestamp) = agora - média dos timestamps, em segundos
+        if not self.total_submissoes:
+            return 0.0
+        return round(epoch(datetime.now()) - self.soma_timestamps / self.total_submissoes, 2)
+
+
+# 12. EstatisticaProblema
+class EstatisticaProblema(Base):
+    __tablename__ = "estatistica_problema"
+    id_problema = Column(Integer, ForeignKey("problema.id_problema"), primary_key=True)
+    id_competicao = Column(Integer, ForeignKey("competicao.id_competicao"), nullable=False, index=True)
+    total_submissoes = Column(Integer, default=0, nullable=False)
+    total_aceitos = Column(Integer, default=0, nullable=False)
+
+
+# 13. VersaoTabela
+# Versão de cada tabela usada em validadores HTTP (ETag/Last-Modified; ver
+# cache.py), compartilhada por todos os workers quando o cache é em memória
+class VersaoTabela(Base):
+    __tablename__ = "versao_tabela"
+    tabela = Column(String(64), primary_key=True)
+    geracao = Column(BigInteger, nullable=False, default=0, server_default="0")
+    alterada_em = Column(DECIMAL(16, 3), nullable=False, default=0, server_default="0")  # epoch (s)
+
+
+def epoch(instante: datetime) -> int:
+    # timestamps são gravados sem fuso; usa o valor nominal, como EXTRACT(EPOCH ...)
+    if instante.tzinfo is not None:
+        instante = instante.astimezone().replace(tzinfo=None)
+    return calendar.timegm(instante.timetuple())
+
+
+# Agregados
+# Contadores calculados pelo banco como subconsultas correlacionadas, carregados
+# no mesmo SELECT da entidade (evita carregar coleções inteiras só para len()).
+Participante.num_competicoes = column_property(
+    select(func.count(Inscricao.id_inscricao))
+    .where(Inscricao.id_usuario == Participante.id_usuario)
+    .correlate_except(Inscricao)
+    .scalar_subquery()
+)
+
+Participante.num_submissoes = column_property(
+    select(func.count(Submissao.id_submissao))
+    .where(Submissao.id_usuario == Participante.id_usuario)
+    .correlate_except(Submissao)
+    .scalar_subquery()
+)
+
+Competicao.num_inscritos = column_property(
+    select(func.count(Inscricao.id_inscricao))
+    .where(Inscricao.id_competicao == Competicao.id_competicao)
+    .correlate_except(Inscricao)
+    .scalar_subquery()
+)
+
+Patrocinador.num_competicoes = column_property(
+    select(func.count(CompeticaoPatrocinador.id_link))
+    .where(CompeticaoPatrocinador.id_usuario_patro == Patrocinador.id_usuario)
+    .correlate_except(CompeticaoPatrocinador)
+    .scalar_subquery()
+)
+
+Patrocinador.total_contribuicao = column_property(
+    select(func.coalesce(func.sum(CompeticaoPatrocinador.contribuicao), 0))
+    .where(CompeticaoPatrocinador.id_usuario_patro == Patrocinador.id_usuario)
+    .correlate_except(CompeticaoPatrocinador)
+    .scalar_subquery()
+)
+
+Colaborador.nome_equipe = column_property(
+    select(EquipeColaboradores.nome)
+    .where(EquipeColaboradores.id_equipe == Colaborador.id_equipe)
+    .correlate_except(EquipeColaboradores)
+    .scalar_subquery()
+)
+
+# Competições da equipe do colaborador (0 quando não há equipe)
+Colaborador.num_competicoes = column_property(
+    select(func.count(Competicao.id_competicao))
+    .where(Competicao.id_equipe == Colaborador.id_equipe)
+    .correlate_except(Competicao)
+    .scalar_subquery()
+)
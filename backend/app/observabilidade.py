@@ -0,0 +1,165 @@
+# backend/app/observabilidade.py
+# Medição das consultas feitas por cada requisição.
+#
+# Listeners do engine somam, na MedicaoRequisicao da requisição corrente
+# (ContextVar), quantas consultas foram feitas, o tempo gasto no banco e
+# quantas vezes cada SQL se repetiu: o mesmo SQL muitas vezes na mesma
+# requisição é o sinal típico de N+1 (carga preguiçosa dentro de um loop).
+# O resultado vai nos cabeçalhos X-DB-*, no log e nos histogramas de /metrics.
+import json
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import Counter as ContadorPrometheus, Gauge, Histogram
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from .database import async_engine, estatisticas_pool
+
+# Mesmo SQL repetido a partir de quantas vezes numa requisição conta como suspeita de N+1
+LIMIAR_REPETICAO = int(os.getenv("DB_LIMIAR_REPETICAO", "5"))
+# Modo estrito (testes): estourar o orçamento de consultas derruba a requisição
+MODO_ESTRITO = os.getenv("DB_MODO_ESTRITO", "false").strip().lower() in ("1", "true", "sim", "yes")
+ORCAMENTO_CONSULTAS = int(os.getenv("DB_ORCAMENTO_CONSULTAS", "20"))
+
+CABECALHO_CONSULTAS = "X-DB-Consultas"
+CABECALHO_TEMPO = "X-DB-Tempo-ms"
+CABECALHO_REPETICAO = "X-DB-Repeticao-Max"
+CABECALHOS = [CABECALHO_CONSULTAS, CABECALHO_TEMPO, CABECALHO_REPETICAO]
+
+logger = logging.getLogger(__name__)
+
+_medicao: ContextVar[Optional["MedicaoRequisicao"]] = ContextVar("medicao_requisicao", default=None)
+
+_ROTULOS = ["metodo", "rota"]
+DURACAO = Histogram("api_requisicao_duracao_segundos", "Duração das requisições", _ROTULOS)
+CONSULTAS = Histogram("api_db_consultas_por_requisicao", "Consultas SQL por requisição", _ROTULOS,
+                      buckets=(1, 2, 3, 5, 10, 20, 50, 100, 250, 1000))
+TEMPO_DB = Histogram("api_db_tempo_por_requisicao_segundos", "Tempo no banco por requisição", _ROTULOS)
+SUSPEITAS_N_MAIS_1 = ContadorPrometheus("api_db_suspeitas_n_mais_1", "Requisições com SQL repetido "
+                                        "acima do limiar", _ROTULOS)
+POOL = Gauge("api_db_pool", "Estado do pool de conexões deste processo", ["medida"])
+
+
+class OrcamentoConsultasExcedido(RuntimeError):
+    pass
+
+
+class MedicaoRequisicao:
+    __slots__ = ("consultas", "tempo_db", "formas", "orcamento")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_db = 0.0
+        self.formas = Counter()   # SQL (já parametrizado) -> execuções
+        self.orcamento = ORCAMENTO_CONSULTAS
+
+    def registrar(self, sql: str, duracao: float):
+        self.consultas += 1
+        self.tempo_db += duracao
+        self.formas[sql] += 1
+        if MODO_ESTRITO and self.orcamento is not None and self.consultas > self.orcamento:
+            raise OrcamentoConsultasExcedido(
+                f"{self.consultas} consultas (orçamento {self.orcamento}); última: {sql[:200]}"
+            )
+
+    def mais_repetida(self):
+        return self.formas.most_common(1)[0] if self.formas else (None, 0)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if _medicao.get() is not None:
+        context._inicio_medicao = time.perf_counter()
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    medicao = _medicao.get()
+    inicio = getattr(context, "_inicio_medicao", None)
+    if medicao is not None and inicio is not None:
+        medicao.registrar(statement, time.perf_counter() - inicio)
+
+
+def orcamento_consultas(limite: Optional[int]):
+    """Dependência que troca o orçamento de consultas da rota (None = sem limite)."""
+    async def _ajustar():
+        medicao = _medicao.get()
+        if medicao is not None:
+            medicao.orcamento = limite
+    return _ajustar
+
+
+def _rota(scope) -> str:
+    # o modelo da rota (/competicoes/{comp_id}), não a URL, para não explodir os rótulos
+    rota = scope.get("route")
+    return getattr(rota, "path", None) or "nao_encontrada"
+
+
+class MiddlewareConsultas:
+    """Middleware ASGI que mede cada requisição HTTP."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        medicao = MedicaoRequisicao()
+        token = _medicao.set(medicao)
+        inicio = time.perf_counter()
+        status = 500
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                # consultas feitas depois do início da resposta (streaming) só entram no log/métricas
+                status = mensagem["status"]
+                headers = MutableHeaders(scope=mensagem)
+                headers[CABECALHO_CONSULTAS] = str(medicao.consultas)
+                headers[CABECALHO_TEMPO] = f"{medicao.tempo_db * 1000:.1f}"
+                headers[CABECALHO_REPETICAO] = str(medicao.mais_repetida()[1])
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicao.reset(token)
+            _registrar(scope, medicao, status, time.perf_counter() - inicio)
+
+
+def _registrar(scope, medicao: MedicaoRequisicao, status: int, duracao: float):
+    metodo, rota = scope["method"], _rota(scope)
+    DURACAO.labels(metodo, rota).observe(duracao)
+    CONSULTAS.labels(metodo, rota).observe(medicao.consultas)
+    TEMPO_DB.labels(metodo, rota).observe(medicao.tempo_db)
+
+    sql, repeticoes = medicao.mais_repetida()
+    suspeita = repeticoes >= LIMIAR_REPETICAO
+    if suspeita:
+        SUSPEITAS_N_MAIS_1.labels(metodo, rota).inc()
+    if suspeita or logger.isEnabledFor(logging.DEBUG):
+        registro = {
+            "metodo": metodo,
+            "rota": rota,
+            "status": status,
+            "duracao_ms": round(duracao * 1000, 1),
+            "consultas": medicao.consultas,
+            "tempo_db_ms": round(medicao.tempo_db * 1000, 1),
+            "repeticao_max": repeticoes,
+        }
+        if suspeita:
+            registro["sql_repetido"] = " ".join(sql.split())[:300]
+            logger.warning("possível N+1 %s", json.dumps(registro, ensure_ascii=False))
+        else:
+            logger.debug("requisição %s", json.dumps(registro, ensure_ascii=False))
+
+
+def atualizar_metricas_pool():
+    for medida, valor in estatisticas_pool().items():
+        POOL.labels(medida).set(valor)
@@ -0,0 +1,104 @@
+# backend/app/paginacao.py
+# Paginação por cursor (keyset): em vez de OFFSET, filtra pelas linhas
+# posteriores à última chave devolvida, então páginas profundas custam o
+# mesmo que a primeira e não "pulam" linhas inseridas durante a leitura.
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import Response
+from sqlalchemy import inspect, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+CABECALHO_PROXIMO = "X-Proximo-Cursor"
+DESCRICAO_CURSOR = (
+    "Ativa a paginação por cursor (skip é ignorado): envie vazio na primeira página "
+    "e depois o valor do cabeçalho X-Proximo-Cursor"
+)
+
+# Chave de ordenação por modelo; os demais usam a chave primária
+CHAVES = {
+    models.Submissao: (models.Submissao.timestamp, models.Submissao.id_submissao),
+}
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def chave(modelo):
+    if modelo in CHAVES:
+        return CHAVES[modelo]
+    return tuple(getattr(modelo, c.key) for c in inspect(modelo).primary_key)
+
+
+def codificar(valores) -> str:
+    bruto = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores])
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def decodificar(cursor: str, colunas) -> list:
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(valores, list) or len(valores) != len(colunas):
+            raise CursorInvalido(cursor)
+        convertidos = []
+        for coluna, valor in zip(colunas, valores):
+            tipo = coluna.type.python_type
+            if tipo in (date, datetime):
+                valor = tipo.fromisoformat(valor)
+            elif not isinstance(valor, tipo):
+                raise CursorInvalido(cursor)
+            convertidos.append(valor)
+        return convertidos
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise CursorInvalido(cursor) from e
+
+
+def _pagina(stmt, modelo, skip: int, limit: int, cursor: Optional[str]):
+    colunas = chave(modelo)
+    stmt = stmt.order_by(*colunas)
+    if cursor is None:
+        stmt = stmt.offset(skip)
+    elif cursor:
+        stmt = stmt.where(tuple_(*colunas) > tuple_(*decodificar(cursor, colunas)))
+    return stmt.limit(limit)
+
+
+async def paginar(db: AsyncSession, stmt, modelo, skip: int, limit: int, cursor: Optional[str] = None):
+    """Executa o select com OFFSET/LIMIT ou, se cursor não for None, com o filtro keyset.
+
+    cursor == "" pede a primeira página no modo cursor.
+    """
+    return (await db.scalars(_pagina(stmt, modelo, skip, limit, cursor))).all()
+
+
+async def paginar_projecao(db: AsyncSession, projecao, skip: int, limit: int, cursor: Optional[str] = None,
+                           filtrar=None):
+    """Como paginar, mas sobre uma serializacao.Projecao: devolve dicts prontos para o JSON.
+
+    filtrar(stmt) -> stmt acrescenta WHERE/ORDER BY ao select da projeção.
+    """
+    stmt = projecao.select()
+    if filtrar is not None:
+        stmt = filtrar(stmt)
+    return projecao.montar(await db.execute(_pagina(stmt, projecao.modelo, skip, limit, cursor)))
+
+
+def definir_proximo(response: Response, itens: list, limit: int, cursor: Optional[str], modelo=None):
+    """No modo cursor, devolve em X-Proximo-Cursor a chave da última linha da página.
+
+    Para itens em dict (paginar_projecao) informe o modelo.
+    """
+    if cursor is None or not itens or len(itens) < limit:
+        return
+    ultimo = itens[-1]
+    if isinstance(ultimo, dict):
+        valores = [ultimo[c.key] for c in chave(modelo)]
+    else:
+        valores = [getattr(ultimo, c.key) for c in chave(type(ultimo))]
+    response.headers[CABECALHO_PROXIMO] = codificar(valores)
@@ -0,0 +1,362 @@
+# backend/app/placar.py
+# Placar ao vivo mantido em memória, por competição.
+#
+# Cada célula (participante, problema) guarda só ((timestamp, id_submissao) do
+# aceite, rejeições antes do aceite) e os id_submissao já contados nela, então
+# aplicar de novo a mesma submissão (ex.: a reconstrução já a leu do banco) não
+# muda nada. Os totais por participante ficam numa SortedList ordenada por
+# (-resolvidos, penalidade, id_usuario), então cada submissão atualiza o
+# ranking em O(log n) e a leitura do placar não consulta a tabela submissao.
+#
+# O estado é do processo: com vários workers, cada um reconstrói o seu no
+# startup e só enxerga as escritas feitas por ele mesmo. O _lock protege só
+# trechos sem await (nunca é segurado enquanto se espera o banco).
+#
+# Reconstrução: uma por competição de cada vez (quem chega depois espera a
+# mesma). Enquanto o histórico é lido, as escritas que chegam só anotam a
+# célula tocada; no fim essas células são refeitas pelo banco e só então o
+# placar entra em _placares, então nada commitado durante a leitura se perde.
+# Placares de competições encerradas saem da memória depois de PLACAR_OCIOSO
+# segundos sem leitura (e sem espectadores em /eventos).
+import asyncio
+import os
+import threading
+from datetime import date, datetime, time
+from time import monotonic
+from typing import Optional
+
+from sortedcontainers import SortedList
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import eventos, models
+
+# Minutos de penalidade por submissão rejeitada antes do aceite (regra ICPC)
+PENALIDADE_REJEICAO = 20
+PLACAR_OCIOSO = float(os.getenv("PLACAR_OCIOSO", "600"))
+# sem veredicto: não contam no placar
+SEM_VEREDICTO = (models.SubmissaoStatus.pendente, models.SubmissaoStatus.erro)
+
+_lock = threading.RLock()
+_placares: dict = {}
+_reconstrucoes: dict = {}    # id_competicao -> _Reconstrucao em andamento
+_competicao_do_problema: dict = {}
+
+
+def _local(instante: datetime) -> datetime:
+    # timestamps com fuso viram horário local ingênuo, como Competicao.data/horario
+    if instante.tzinfo is not None:
+        return instante.astimezone().replace(tzinfo=None)
+    return instante
+
+
+class PlacarCompeticao:
+    def __init__(self, inicio: datetime, finalizada: bool = False):
+        self.inicio = inicio
+        self.finalizada = finalizada
+        self.ultimo_acesso = monotonic()
+        self.celulas = {}         # (id_usuario, id_problema) -> ((timestamp, id_submissao) do aceite | None, rejeicoes)
+        self.aplicadas = {}       # (id_usuario, id_problema) -> {id_submissao já contado na célula}
+        self.totais = {}          # id_usuario -> (resolvidos, penalidade)
+        self.ranking = SortedList()
+
+    def _minuto(self, instante: datetime) -> int:
+        return max(0, int((instante - self.inicio).total_seconds() // 60))
+
+    def _trocar_celula(self, id_usuario: int, id_problema: int, nova):
+        antiga = self.celulas.get((id_usuario, id_problema), (None, 0))
+        if nova == antiga and (id_usuario in self.totais):
+            return
+        self.celulas[(id_usuario, id_problema)] = nova
+
+        resolvidos, penalidade = self.totais.get(id_usuario, (0, 0))
+        if id_usuario in self.totais:
+            self.ranking.remove((-resolvidos, penalidade, id_usuario))
+        for aceite, rejeicoes, sinal in ((antiga[0], antiga[1], -1), (nova[0], nova[1], 1)):
+            if aceite is not None:
+                resolvidos += sinal
+                penalidade += sinal * (self._minuto(aceite[0]) + PENALIDADE_REJEICAO * rejeicoes)
+        self.totais[id_usuario] = (resolvidos, penalidade)
+        self.ranking.add((-resolvidos, penalidade, id_usuario))
+
+    def aplicar(self, id_submissao: int, id_usuario: int, id_problema: int, instante: datetime,
+                status: models.SubmissaoStatus) -> bool:
+        """Aplica uma submissão nova (uma já contada é ignorada). Devolve False
+        quando ela chega fora de ordem de um jeito que exige recalcular a célula
+        pelo histórico."""
+        if status in SEM_VEREDICTO:
+            return True
+        celula = (id_usuario, id_problema)
+        aplicadas = self.aplicadas.setdefault(celula, set())
+        if id_submissao in aplicadas:
+            return True
+        aplicadas.add(id_submissao)
+        aceite, rejeicoes = self.celulas.get(celula, (None, 0))
+        chave = (_local(instante), id_submissao)
+        if aceite is not None and chave > aceite:
+            # depois do aceite nada muda, mas o participante aparece no placar
+            self._trocar_celula(id_usuario, id_problema, (aceite, rejeicoes))
+            return True
+        if status == models.SubmissaoStatus.aceito:
+            if aceite is not None:
+                return False
+            self._trocar_celula(id_usuario, id_problema, (chave, rejeicoes))
+        else:
+            self._trocar_celula(id_usuario, id_problema, (aceite, rejeicoes + 1))
+        return True
+
+    def redefinir_celula(self, id_usuario: int, id_problema: int, tentativas):
+        """Recalcula a célula a partir de (id_submissao, timestamp, status) ordenados por timestamp."""
+        aceite, rejeicoes, aplicadas = None, 0, set()
+        for id_submissao, instante, status in tentativas:
+            if status in SEM_VEREDICTO:
+                continue
+            aplicadas.add(id_submissao)
+            if aceite is not None:
+                continue
+            if status == models.SubmissaoStatus.aceito:
+                aceite = (_local(instante), id_submissao)
+            else:
+                rejeicoes += 1
+        celula = (id_usuario, id_problema)
+        self.aplicadas[celula] = aplicadas
+        if aceite is None and rejeicoes == 0 and celula not in self.celulas:
+            return
+        self._trocar_celula(id_usuario, id_problema, (aceite, rejeicoes))
+
+    def encerrada(self) -> bool:
+        # mesma regra de Competicao.status
+        return self.finalizada or self.inicio.date() < date.today()
+
+    def posicao(self, resolvidos: int, penalidade: int) -> int:
+        # empatados em (resolvidos, penalidade) dividem a mesma posição
+        return self.ranking.bisect_left((-resolvidos, penalidade)) + 1
+
+    def linha(self, id_usuario: int) -> dict:
+        resolvidos, penalidade = self.totais.get(id_usuario, (0, 0))
+        return {
+            "posicao": self.posicao(resolvidos, penalidade),
+            "id_usuario": id_usuario,
+            "resolvidos": resolvidos,
+            "penalidade": penalidade,
+        }
+
+    def linhas(self, skip: int = 0, limit: int = 100):
+        for neg_resolvidos, penalidade, id_usuario in self.ranking.islice(skip, skip + limit):
+            yield {
+                "posicao": self.posicao(-neg_resolvidos, penalidade),
+                "id_usuario": id_usuario,
+                "resolvidos": -neg_resolvidos,
+                "penalidade": penalidade,
+            }
+
+
+def _inicio(comp: models.Competicao) -> datetime:
+    return datetime.combine(comp.data, comp.horario or time.min)
+
+
+async def id_competicao(db: AsyncSession, id_problema: int) -> Optional[int]:
+    if id_problema not in _competicao_do_problema:
+        comp_id = await db.scalar(
+            select(models.Problema.id_competicao).where(models.Problema.id_problema == id_problema)
+        )
+        if comp_id is None:
+            return None
+        _competicao_do_problema[id_problema] = comp_id
+    return _competicao_do_problema[id_problema]
+
+
+def select_historico(comp_id: int):
+    """Todas as submissões da competição em ordem cronológica."""
+    return (
+        select(models.Submissao.id_submissao, models.Submissao.id_usuario, models.Submissao.id_problema,
+               models.Submissao.timestamp, models.Submissao.status)
+        .join(models.Problema, models.Problema.id_problema == models.Submissao.id_problema)
+        .where(models.Problema.id_competicao == comp_id)
+        .order_by(models.Submissao.timestamp, models.Submissao.id_submissao)
+    )
+
+
+def select_celula(id_usuario: int, id_problema: int):
+    """Tentativas de um participante num problema, em ordem."""
+    return (
+        select(models.Submissao.id_submissao, models.Submissao.timestamp, models.Submissao.status)
+        .where(models.Submissao.id_usuario == id_usuario, models.Submissao.id_problema == id_problema)
+        .order_by(models.Submissao.timestamp, models.Submissao.id_submissao)
+    )
+
+
+class _Reconstrucao:
+    __slots__ = ("futuro", "tocadas", "descartada")
+
+    def __init__(self):
+        self.futuro = asyncio.get_running_loop().create_future()
+        self.tocadas = set()      # (id_usuario, id_problema) escritas durante a leitura
+        self.descartada = False
+
+
+def _anotar(comp_id: int, id_usuario: int, id_problema: int) -> bool:
+    """Com a competição em reconstrução, anota a célula para ser refeita no fim (chame com _lock)."""
+    reconstrucao = _reconstrucoes.get(comp_id)
+    if reconstrucao is None:
+        return False
+    reconstrucao.tocadas.add((id_usuario, id_problema))
+    return True
+
+
+async def _carregar(db: AsyncSession, comp_id: int, reconstrucao: _Reconstrucao) -> Optional[PlacarCompeticao]:
+    comp = await db.get(models.Competicao, comp_id)
+    if not comp:
+        return None
+    placar = PlacarCompeticao(_inicio(comp), comp.finalizada)
+    linhas = await db.stream(select_historico(comp_id).execution_options(yield_per=5000))
+    # o placar novo ainda não é visível: as escritas de agora caem em reconstrucao.tocadas
+    async for id_submissao, id_usuario, id_problema, instante, status in linhas:
+        _competicao_do_problema[id_problema] = comp_id
+        placar.aplicar(id_submissao, id_usuario, id_problema, instante, status)
+    while True:
+        with _lock:
+            tocadas, reconstrucao.tocadas = reconstrucao.tocadas, set()
+            if not tocadas:
+                if not reconstrucao.descartada:
+                    _placares[comp_id] = placar
+                return placar
+        for id_usuario, id_problema in tocadas:
+            tentativas = (await db.execute(select_celula(id_usuario, id_problema))).all()
+            with _lock:
+                placar.redefinir_celula(id_usuario, id_problema, tentativas)
+
+
+async def reconstruir(db: AsyncSession, comp_id: int) -> Optional[PlacarCompeticao]:
+    """Lê o histórico da competição; chamadas simultâneas esperam a mesma leitura."""
+    while True:
+        with _lock:
+            reconstrucao = _reconstrucoes.get(comp_id)
+            dono = reconstrucao is None
+            if dono:
+                reconstrucao = _reconstrucoes[comp_id] = _Reconstrucao()
+        if not dono:
+            try:
+                return await asyncio.shield(reconstrucao.futuro)
+            except asyncio.CancelledError:
+                if not reconstrucao.futuro.cancelled():
+                    raise
+                continue    # quem reconstruía desistiu (ex.: cliente desconectou): tenta de novo
+        try:
+            placar = await _carregar(db, comp_id, reconstrucao)
+        except BaseException:
+            reconstrucao.futuro.cancel()
+            raise
+        else:
+            reconstrucao.futuro.set_result(placar)
+            return placar
+        finally:
+            with _lock:
+                if _reconstrucoes.get(comp_id) is reconstrucao:
+                    del _reconstrucoes[comp_id]
+
+
+async def reconstruir_ativos(db: AsyncSession):
+    """Carrega no startup os placares das competições em andamento."""
+    ids = await db.scalars(select(models.Competicao.id_competicao).where(models.Competicao.status == "Em andamento"))
+    for comp_id in ids.all():
+        await reconstruir(db, comp_id)
+
+
+def _despejar_ociosos():
+    # chame com _lock
+    limite = monotonic() - PLACAR_OCIOSO
+    for comp_id, placar in list(_placares.items()):
+        if placar.ultimo_acesso < limite and placar.encerrada() and not eventos.tem_assinantes(comp_id):
+            del _placares[comp_id]
+
+
+async def obter(db: AsyncSession, comp_id: int) -> Optional[PlacarCompeticao]:
+    with _lock:
+        _despejar_ociosos()
+        placar = _placares.get(comp_id)
+        if placar is not None:
+            placar.ultimo_acesso = monotonic()
+            return placar
+    return await reconstruir(db, comp_id)
+
+
+def descartar(comp_id: int):
+    """Esquece o placar (ex.: mudou o horário de início); é refeito na próxima leitura."""
+    with _lock:
+        _placares.pop(comp_id, None)
+        reconstrucao = _reconstrucoes.pop(comp_id, None)
+        if reconstrucao is not None:
+            # a leitura em andamento termina para quem a espera, mas não fica em _placares
+            reconstrucao.descartada = True
+
+
+def esquecer_problema(id_problema: int):
+    with _lock:
+        comp_id = _competicao_do_problema.pop(id_problema, None)
+    if comp_id is not None:
+        descartar(comp_id)
+
+
+async def _publicar_mudancas(comp_id: int, placar: PlacarCompeticao, antes: dict):
+    """Evento "placar" com a linha de cada participante cujo total mudou.
+
+    antes: id_usuario -> totais antes da escrita (ou None).
+    """
+    with _lock:
+        linhas = [placar.linha(u) for u, total in antes.items() if placar.totais.get(u) != total]
+    for linha in linhas:
+        await eventos.publicar(comp_id, "placar", linha)
+
+
+async def recalcular_celula(db: AsyncSession, id_usuario: int, id_problema: int):
+    """Refaz uma célula pelo histórico (após update/delete de submissão)."""
+    comp_id = await id_competicao(db, id_problema)
+    with _lock:
+        placar = _placares.get(comp_id)
+        if placar is None:
+            _anotar(comp_id, id_usuario, id_problema)
+            return
+    tentativas = (await db.execute(select_celula(id_usuario, id_problema))).all()
+    with _lock:
+        antes = {id_usuario: placar.totais.get(id_usuario)}
+        placar.redefinir_celula(id_usuario, id_problema, tentativas)
+    await _publicar_mudancas(comp_id, placar, antes)
+
+
+async def registrar_submissao(db: AsyncSession, sub: models.Submissao):
+    """Atualiza o placar com uma submissão recém-criada."""
+    comp_id = await id_competicao(db, sub.id_problema)
+    with _lock:
+        placar = _placares.get(comp_id)
+        if placar is None:
+            _anotar(comp_id, sub.id_usuario, sub.id_problema)
+            return
+        antes = {sub.id_usuario: placar.totais.get(sub.id_usuario)}
+        aplicada = placar.aplicar(sub.id_submissao, sub.id_usuario, sub.id_problema, sub.timestamp, sub.status)
+    if aplicada:
+        await _publicar_mudancas(comp_id, placar, antes)
+    else:
+        await recalcular_celula(db, sub.id_usuario, sub.id_problema)
+
+
+async def registrar_lote(db: AsyncSession, linhas: list):
+    """Como registrar_submissao, para dicts inseridos em lote (com id_submissao; ver crud.create_submissoes_lote)."""
+    competicoes = {p: await id_competicao(db, p) for p in {l["id_problema"] for l in linhas}}
+    pendentes, antes = set(), {}   # antes: id_competicao -> (placar, {id_usuario: totais})
+    with _lock:
+        for linha in sorted(linhas, key=lambda l: (_local(l["timestamp"]), l["id_submissao"])):
+            comp_id = competicoes[linha["id_problema"]]
+            placar = _placares.get(comp_id)
+            if placar is None:
+                _anotar(comp_id, linha["id_usuario"], linha["id_problema"])
+                continue
+            totais = antes.setdefault(comp_id, (placar, {}))[1]
+            totais.setdefault(linha["id_usuario"], placar.totais.get(linha["id_usuario"]))
+            if not placar.aplicar(linha["id_submissao"], linha["id_usuario"], linha["id_problema"],
+                                  linha["timestamp"], linha["status"]):
+                pendentes.add((linha["id_usuario"], linha["id_problema"]))
+    for comp_id, (placar, totais) in antes.items():
+        await _publicar_mudancas(comp_id, placar, totais)
+    for id_usuario, id_problema in pendentes:
+        await recalcular_celula(db, id_usuario, id_problema)
@@ -1,15 +1,12 @@
 # app/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from .. import schemas
+from .. import schemas, crud
 
 from app.database import get_db
 from app.models import Usuario  # seu modelo SQLAlchemy de usuários
-
-# Contexto para hashing de senhas (caso ainda não exista)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.security import verify_and_update_async
 
 router = APIRouter(
     prefix="/auth",
@@ -17,21 +14,27 @@ router = APIRouter(
 )
 
 @router.post("/login", response_model=schemas.UserResponse)
-def login(request: schemas.LoginRequest, db: Session = Depends(get_db)):
+async def login(request: schemas.LoginRequest, db: AsyncSession = Depends(get_db)):
     # 1. Buscar usuário pelo e-mail
-    user = db.query(Usuario).filter(Usuario.email == request.email).first()
+    user = await crud.get_usuario_por_email(db, request.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas"
         )
-    
-    # 2. Verificar senha usando o hashing
-    if not pwd_context.verify(request.password, user.senha_hash):
+
+    # 2. Verificar senha no pool de hash (fora do event loop)
+    valida, novo_hash = await verify_and_update_async(request.password, user.senha_hash)
+    if not valida:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas"
         )
 
+    # Hash gerado com outro custo: grava o refeito com o custo atual
+    if novo_hash:
+        user.senha_hash = novo_hash
+        await db.commit()
+
     # 3. Retornar dados do usuário (sem a senha)
     return user
@@ -1,37 +1,135 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
-from .. import crud, schemas
-from ..database import get_db
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import cache, crud, eventos, models, schemas, paginacao, placar, serializacao
+from ..database import get_db, sessao
+from datetime import datetime
+import csv
+import enum
+import io
 
 
 router = APIRouter(prefix="/competicoes", tags=["Competicoes"])
 
-@router.get("/", response_model=list[schemas.CompeticaoRead])
-def listar_competicoes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_competicoes(db, skip, limit)
+# num_inscritos vem de inscricao
+TABELAS = ("competicao", "inscricao")
 
-@router.get("/{comp_id}", response_model=schemas.CompeticaoRead)
-def obter_competicao(comp_id: int, db: Session = Depends(get_db)):
-    comp = crud.get_competicao(db, comp_id)
+@router.get("/", response_model=list[schemas.CompeticaoRead], dependencies=[Depends(cache.condicional(*TABELAS))])
+async def listar_competicoes(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = Query(None, description="Filtra por status (ex.: 'Em andamento', 'Finalizada')"),
+    ordenar: Optional[str] = Query(None, description="data, status, inscritos ou lotacao; prefixe com '-' para ordem decrescente"),
+    cursor: Optional[str] = Query(None, description=paginacao.DESCRICAO_CURSOR),
+    db: AsyncSession = Depends(get_db)
+):
+    if ordenar and ordenar.lstrip("-") not in crud.ORDENACAO_COMPETICOES:
+        raise HTTPException(status_code=400, detail="Critério de ordenação inválido")
+    if ordenar and cursor is not None:
+        raise HTTPException(status_code=400, detail="Paginação por cursor só está disponível na ordem padrão")
+    async def carregar(response: Response):
+        itens = await crud.get_competicoes(db, skip, limit, status=status, ordenar=ordenar, cursor=cursor)
+        paginacao.definir_proximo(response, itens, limit, cursor, models.Competicao)
+        return itens
+    return await cache.servir(request, TABELAS, list[schemas.CompeticaoRead], carregar)
+
+@router.get("/{comp_id}/placar", response_model=list[schemas.PlacarLinha])
+async def obter_placar(comp_id: int, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    # Servido do placar em memória (app/placar.py)
+    linhas = await crud.get_placar(db, comp_id, skip, limit)
+    if linhas is None:
+        raise HTTPException(status_code=404, detail="Competição não encontrada")
+    return linhas
+
+# Exportação das submissões: NDJSON (um SubmissaoRead por linha) ou CSV
+COLUNAS_EXPORTACAO = list(schemas.SubmissaoRead.model_fields)
+TIPOS_EXPORTACAO = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+def _bloco_ndjson(bloco: list) -> bytes:
+    return b"".join(serializacao.dumps(item) + b"\n" for item in bloco)
+
+def _valor_csv(valor):
+    # mesmos textos do JSON: valor do enum e data ISO 8601
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+def _bloco_csv(bloco: list) -> bytes:
+    saida = io.StringIO()
+    escritor = csv.writer(saida, lineterminator="\n")
+    escritor.writerows([_valor_csv(item[c]) for c in COLUNAS_EXPORTACAO] for item in bloco)
+    return saida.getvalue().encode()
+
+@router.get(
+    "/{comp_id}/submissoes/export",
+    response_class=StreamingResponse,
+    summary="Exporta todas as submissões da competição (NDJSON ou CSV, em streaming)",
+    responses={200: {"content": {t: {} for t in TIPOS_EXPORTACAO.values()}}}
+)
+async def exportar_submissoes(
+    comp_id: int,
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    if not await crud.get_competicao(db, comp_id):
+        raise HTTPException(status_code=404, detail="Competição não encontrada")
+
+    async def gerar():
+        # sessão própria (timeout de lote): vive enquanto a resposta é enviada
+        async with sessao("lote") as db_exportacao:
+            if formato == "csv":
+                yield (",".join(COLUNAS_EXPORTACAO) + "\n").encode()
+            async for bloco in crud.exportar_submissoes(db_exportacao, comp_id):
+                yield _bloco_csv(bloco) if formato == "csv" else _bloco_ndjson(bloco)
+
+    nome = f"competicao-{comp_id}-submissoes.{formato}"
+    return StreamingResponse(gerar(), media_type=TIPOS_EXPORTACAO[formato],
+                             headers={"Content-Disposition": f'attachment; filename="{nome}"'})
+
+@router.get(
+    "/{comp_id}/eventos",
+    response_class=StreamingResponse,
+    summary="Eventos ao vivo da competição (Server-Sent Events)",
+    description="Eventos: submissao (nova ou mudança de status), inscricao, placar (linha do participante "
+                "cujo total mudou), lote (carga em massa) e resync (o cliente ficou para trás e deve "
+                "recarregar placar e listas). Uma reconexão (com Last-Event-ID) começa com resync.",
+    responses={200: {"content": {"text/event-stream": {}}}}
+)
+async def eventos_competicao(comp_id: int, last_event_id: Optional[str] = Header(None)):
+    # Sem Depends(get_db): a sessão da dependência viveria até o fim da resposta
+    # e cada espectador prenderia uma conexão do pool
+    async with sessao("leitura") as db:
+        # placar em memória carregado, para que as submissões gerem eventos "placar"
+        if await placar.obter(db, comp_id) is None:
+            raise HTTPException(status_code=404, detail="Competição não encontrada")
+    return StreamingResponse(eventos.transmitir(comp_id, last_event_id is not None), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/{comp_id}", response_model=schemas.CompeticaoRead, dependencies=[Depends(cache.condicional(*TABELAS))])
+async def obter_competicao(comp_id: int, db: AsyncSession = Depends(get_db)):
+    comp = await crud.get_competicao(db, comp_id)
     if not comp:
         raise HTTPException(status_code=404, detail="Competição não encontrada")
     return comp
 
 @router.post("/", response_model=schemas.CompeticaoRead, status_code=201)
-def criar_competicao(comp: schemas.CompeticaoCreate, db: Session = Depends(get_db)):
-    return crud.create_competicao(db, comp)
+async def criar_competicao(comp: schemas.CompeticaoCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_competicao(db, comp)
 
 @router.put("/{comp_id}", response_model=schemas.CompeticaoRead)
-def alterar_competicao(comp_id: int, comp: schemas.CompeticaoCreate, db: Session = Depends(get_db)):
-    updated = crud.update_competicao(db, comp_id, comp)
+async def alterar_competicao(comp_id: int, comp: schemas.CompeticaoCreate, db: AsyncSession = Depends(get_db)):
+    updated = await crud.update_competicao(db, comp_id, comp)
     if not updated:
         raise HTTPException(404, "Competição não encontrada")
     return updated
 
 @router.delete("/{comp_id}", status_code=204)
-def remover_competicao(comp_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_competicao(db, comp_id)
+async def remover_competicao(comp_id: int, db: AsyncSession = Depends(get_db)):
+    success = await crud.delete_competicao(db, comp_id)
     if not success:
         raise HTTPException(404, "Competição não encontrada")
     return Response(status_code=204)
@@ -39,16 +137,18 @@ def remover_competicao(comp_id: int, db: Session = Depends(get_db)):
 @router.post(
     "/{comp_id}/gerar-estatistica",
     status_code=204,
-    summary="Gera ou atualiza estatísticas de uma competição",
+    summary="Recalcula do zero as estatísticas de uma competição",
     responses={204: {"description": "Estatística recalculada com sucesso"}}
 )
-def gerar_estatistica(
+async def gerar_estatistica(
     comp_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    # Chama a procedure no banco
-    db.execute(text("CALL public.sp_gerar_estatistica(:id)"), {"id": comp_id})
-    db.commit()
+    # As estatísticas já são mantidas a cada submissão; isto só reconcilia
+    # os contadores (ex.: depois de cargas feitas direto no banco)
+    if not await crud.get_competicao(db, comp_id):
+        raise HTTPException(404, "Competição não encontrada")
+    await crud.recalcular_estatistica(db, comp_id)
 
     # Retorna apenas o status 204
     return Response(status_code=204)
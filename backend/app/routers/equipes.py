@@ -1,36 +1,49 @@
 # backend/app/routers/equipes.py
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from .. import crud, schemas
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from .. import cache, crud, schemas, paginacao
 from ..database import get_db
 
 router = APIRouter(prefix="/equipes", tags=["Equipes"])
 
-@router.get("/", response_model=list[schemas.EquipeRead])
-def listar_equipes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_equipes(db, skip, limit)
+TABELAS = ("equipe_colaboradores",)
 
-@router.get("/{equipe_id}", response_model=schemas.EquipeRead)
-def obter_equipe(equipe_id: int, db: Session = Depends(get_db)):
-    eq = crud.get_equipe(db, equipe_id)
+@router.get("/", response_model=list[schemas.EquipeRead], dependencies=[Depends(cache.condicional(*TABELAS))])
+async def listar_equipes(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=paginacao.DESCRICAO_CURSOR),
+    db: AsyncSession = Depends(get_db)
+):
+    async def carregar(response: Response):
+        itens = await crud.get_equipes(db, skip, limit, cursor=cursor)
+        paginacao.definir_proximo(response, itens, limit, cursor)
+        return itens
+    return await cache.servir(request, TABELAS, list[schemas.EquipeRead], carregar)
+
+@router.get("/{equipe_id}", response_model=schemas.EquipeRead, dependencies=[Depends(cache.condicional(*TABELAS))])
+async def obter_equipe(equipe_id: int, db: AsyncSession = Depends(get_db)):
+    eq = await crud.get_equipe(db, equipe_id)
     if not eq:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Equipe não encontrada")
     return eq
 
 @router.post("/", response_model=schemas.EquipeRead, status_code=status.HTTP_201_CREATED)
-def criar_equipe(equipe: schemas.EquipeCreate, db: Session = Depends(get_db)):
-    return crud.create_equipe(db, equipe)
+async def criar_equipe(equipe: schemas.EquipeCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_equipe(db, equipe)
 
 @router.put("/{equipe_id}", response_model=schemas.EquipeRead)
-def alterar_equipe(equipe_id: int, eq: schemas.EquipeCreate, db: Session = Depends(get_db)):
-    updated = crud.update_equipe(db, equipe_id, eq)
+async def alterar_equipe(equipe_id: int, eq: schemas.EquipeCreate, db: AsyncSession = Depends(get_db)):
+    updated = await crud.update_equipe(db, equipe_id, eq)
     if not updated:
         raise HTTPException(404, "Equipe não encontrada")
     return updated
 
 @router.delete("/{equipe_id}", status_code=204)
-def remover_equipe(equipe_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_equipe(db, equipe_id)
+async def remover_equipe(equipe_id: int, db: AsyncSession = Depends(get_db)):
+    success = await crud.delete_equipe(db, equipe_id)
     if not success:
         raise HTTPException(404, "Equipe não encontrada")
     return Response(status_code=204)
\ No newline at end of file
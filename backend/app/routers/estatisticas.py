@@ -1,18 +1,38 @@
 # backend/app/routers/estatisticas.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from .. import crud, schemas
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from .. import cache, crud, schemas, paginacao
 from ..database import get_db
 
 router = APIRouter(prefix="/estatisticas", tags=["Estatísticas"])
 
 @router.get("/", response_model=list[schemas.EstatisticaRead])
-def listar_estatisticas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_estatisticas(db, skip, limit)
+async def listar_estatisticas(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=paginacao.DESCRICAO_CURSOR),
+    db: AsyncSession = Depends(get_db)
+):
+    # os contadores mudam a cada submissão; media_tempo envelhece no máximo CACHE_TTL
+    async def carregar(response: Response):
+        itens = await crud.get_estatisticas(db, skip, limit, cursor=cursor)
+        paginacao.definir_proximo(response, itens, limit, cursor)
+        return itens
+    return await cache.servir(request, ("estatistica",), list[schemas.EstatisticaRead], carregar)
+
+@router.get("/competicao/{comp_id}", response_model=schemas.EstatisticaRead)
+async def obter_estatistica_por_competicao(comp_id: int, db: AsyncSession = Depends(get_db)):
+    est = await crud.get_estatistica_por_competicao(db, comp_id)
+    if not est:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Estatística não encontrada")
+    return est
 
 @router.get("/{estat_id}", response_model=schemas.EstatisticaRead)
-def obter_estatistica(estat_id: int, db: Session = Depends(get_db)):
-    est = crud.get_estatistica(db, estat_id)
+async def obter_estatistica(estat_id: int, db: AsyncSession = Depends(get_db)):
+    est = await crud.get_estatistica(db, estat_id)
     if not est:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Estatística não encontrada")
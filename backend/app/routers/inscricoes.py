@@ -1,35 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, UploadFile, File, Form
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Response, UploadFile, File, Form, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from .. import crud, schemas, models
-from ..database import get_db
-from ..security import hash_password
-import base64
+from .. import crud, schemas, models, imagens, paginacao, observabilidade, serializacao
+from ..database import get_db, get_db_lote
+from itertools import islice
+import csv
+import io
 
 router = APIRouter(prefix="/inscricoes", tags=["Inscrições"])
 
 @router.get("/", response_model=list[schemas.InscricaoRead])
-def listar_inscricoes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_inscricoes(db, skip, limit)
+async def listar_inscricoes(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=paginacao.DESCRICAO_CURSOR),
+    db: AsyncSession = Depends(get_db)
+):
+    # dicts já no formato de InscricaoRead (crud.PROJ_INSCRICAO): sem revalidar
+    itens = await crud.get_inscricoes(db, skip, limit, cursor=cursor)
+    resposta = serializacao.RespostaJSON(itens)
+    paginacao.definir_proximo(resposta, itens, limit, cursor, models.Inscricao)
+    return resposta
 
 @router.get("/competicao/{comp_id}", response_model=List[schemas.InscricaoRead])
-def listar_inscricoes_por_competicao(comp_id: int, db: Session = Depends(get_db)):
-    return db.query(models.Inscricao)\
-        .filter(models.Inscricao.id_competicao == comp_id)\
-        .join(models.Participante)\
-        .options(joinedload(models.Inscricao.participante))\
-        .all()
+async def listar_inscricoes_por_competicao(comp_id: int, db: AsyncSession = Depends(get_db)):
+    return serializacao.RespostaJSON(await crud.get_inscricoes_por_competicao(db, comp_id))
 
 @router.get("/{insc_id}", response_model=schemas.InscricaoRead)
-def obter_inscricao(insc_id: int, db: Session = Depends(get_db)):
-    i = crud.get_inscricao(db, insc_id)
+async def obter_inscricao(insc_id: int, db: AsyncSession = Depends(get_db)):
+    i = await crud.get_inscricao(db, insc_id)
     if not i:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inscrição não encontrada")
     return i
 
 @router.post("/", response_model=schemas.InscricaoRead, status_code=status.HTTP_201_CREATED)
-def criar_inscricao(insc: schemas.InscricaoCreate, db: Session = Depends(get_db)):
-    return crud.create_inscricao(db, insc)
+async def criar_inscricao(insc: schemas.InscricaoCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_inscricao(db, insc)
 
 @router.post("/competicao/{comp_id}", response_model=schemas.InscricaoRead, status_code=status.HTTP_201_CREATED)
 async def criar_inscricao_completa(
@@ -39,42 +46,46 @@ async def criar_inscricao_completa(
     birthDate: str = Form(...),
     university: str = Form(...),
     photo: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Cria uma inscrição completa incluindo usuário e participante"""
     try:
         # Verificar se a competição existe
-        competicao = crud.get_competicao(db, comp_id)
+        competicao = await crud.get_competicao(db, comp_id)
         if not competicao:
             raise HTTPException(status_code=404, detail="Competição não encontrada")
         
         # Verificar se o usuário já existe
-        existing_user = db.query(models.Usuario).filter(models.Usuario.email == email).first()
+        existing_user = await crud.get_usuario_por_email(db, email)
         if existing_user:
             raise HTTPException(status_code=400, detail="Usuário com este email já existe")
         
-        # Processar foto se fornecida
-        foto_bytes = None
+        # Processar foto se fornecida (redimensionada fora do event loop)
+        variantes = None
         if photo:
-            foto_bytes = await photo.read()
+            try:
+                variantes = await imagens.processar_foto(await photo.read())
+            except imagens.ImagemInvalida:
+                raise HTTPException(status_code=400, detail="Não foi possível ler a imagem enviada.")
         
         # Criar usuário
-        senha_hash = hash_password("senha123")  # Senha padrão, pode ser alterada depois
+        # Senha padrão, pode ser alterada depois (create_usuario gera o hash)
         usuario_data = schemas.UsuarioCreate(
             nome=name,
             email=email,
-            senha_hash=senha_hash,
+            senha_hash=crud.SENHA_PADRAO,
             tipo="participante",
-            foto=foto_bytes
         )
-        usuario = crud.create_usuario(db, usuario_data)
+        usuario = await crud.create_usuario(db, usuario_data)
+        if variantes:
+            await crud.update_usuario_foto(db, usuario.id_usuario, variantes["media"], variantes["miniatura"])
         
         # Criar participante
         participante_data = schemas.ParticipanteCreate(
             id_usuario=usuario.id_usuario,
             instituicao=university
         )
-        participante = crud.create_participante(db, participante_data)
+        participante = await crud.create_participante(db, participante_data)
         
         # Criar inscrição
         inscricao_data = schemas.InscricaoCreate(
@@ -82,26 +93,92 @@ async def criar_inscricao_completa(
             id_competicao=comp_id,
             categoria="individual"
         )
-        inscricao = crud.create_inscricao(db, inscricao_data)
+        inscricao = await crud.create_inscricao(db, inscricao_data)
         
         return inscricao
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Erro interno do servidor: {str(e)}")
 
+# Cabeçalhos aceitos no CSV de importação (o formulário usa os nomes em inglês)
+COLUNAS_IMPORTACAO = {
+    "nome": ("nome", "name"),
+    "email": ("email", "e-mail"),
+    "instituicao": ("instituicao", "instituição", "universidade", "university"),
+    "senha": ("senha", "password"),  # opcional; sem ela vale a senha padrão
+}
+# Tamanho máximo de cada coluna no banco (String(n) dos modelos)
+LIMITES_IMPORTACAO = {
+    "nome": models.Usuario.nome.type.length,
+    "email": models.Usuario.email.type.length,
+    "instituicao": models.Participante.instituicao.type.length,
+}
+
+def _linhas_csv(arquivo, erros: list):
+    """Lê o CSV linha a linha (sem carregar o arquivo inteiro) e normaliza as colunas."""
+    leitor = csv.DictReader(io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline=""))
+    cabecalho = {(c or "").strip().lower(): c for c in (leitor.fieldnames or [])}
+    colunas = {}
+    for campo, aliases in COLUNAS_IMPORTACAO.items():
+        colunas[campo] = next((cabecalho[a] for a in aliases if a in cabecalho), None)
+    if not colunas["nome"] or not colunas["email"]:
+        raise HTTPException(status_code=400, detail="O CSV precisa das colunas nome e email")
+
+    for registro in leitor:
+        linha = leitor.line_num
+        dados = {campo: (registro.get(col) or "").strip() if col else "" for campo, col in colunas.items()}
+        if not dados["nome"] or "@" not in dados["email"]:
+            erros.append({"linha": linha, "erro": "Nome ou e-mail ausente/inválido"})
+            continue
+        longos = [campo for campo, limite in LIMITES_IMPORTACAO.items() if len(dados[campo]) > limite]
+        if longos:
+            erros.append({"linha": linha, "erro": "Acima do tamanho máximo: " + ", ".join(
+                f"{campo} ({LIMITES_IMPORTACAO[campo]})" for campo in longos)})
+            continue
+        # e-mails são comparados e gravados em minúsculas
+        dados["email"] = dados["email"].lower()
+        dados["instituicao"] = dados["instituicao"] or None
+        dados["senha"] = dados["senha"] or None
+        yield linha, dados
+
+async def _em_blocos(linhas):
+    """Consome o gerador de _linhas_csv em blocos numa thread: ler o upload bloqueia."""
+    while True:
+        bloco = await run_in_threadpool(lambda: list(islice(linhas, crud.LOTE_IMPORTACAO)))
+        if not bloco:
+            return
+        for item in bloco:
+            yield item
+
+@router.post("/competicao/{comp_id}/importar", response_model=schemas.InscricaoImportacaoResultado,
+             dependencies=[Depends(observabilidade.orcamento_consultas(None))])
+async def importar_inscricoes(comp_id: int, arquivo: UploadFile = File(...), db: AsyncSession = Depends(get_db_lote)):
+    """Importa um CSV (nome, email, instituicao[, senha]) de inscritos para a competição."""
+    if not await crud.get_competicao(db, comp_id):
+        raise HTTPException(status_code=404, detail="Competição não encontrada")
+
+    erros_csv = []
+    try:
+        resultado = await crud.importar_inscricoes(db, comp_id, _em_blocos(_linhas_csv(arquivo.file, erros_csv)))
+    except UnicodeDecodeError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="O CSV precisa estar em UTF-8")
+    resultado["erros"] = sorted(resultado["erros"] + erros_csv, key=lambda e: e["linha"])
+    return resultado
+
 @router.put("/{insc_id}", response_model=schemas.InscricaoRead)
-def alterar_inscricao(insc_id: int, i: schemas.InscricaoCreate, db: Session = Depends(get_db)):
-    updated = crud.update_inscricao(db, insc_id, i)
+async def alterar_inscricao(insc_id: int, i: schemas.InscricaoCreate, db: AsyncSession = Depends(get_db)):
+    updated = await crud.update_inscricao(db, insc_id, i)
     if not updated:
         raise HTTPException(404, "Inscrição não encontrada")
     return updated
 
 @router.delete("/{insc_id}", status_code=204)
-def remover_inscricao(insc_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_inscricao(db, insc_id)
+async def remover_inscricao(insc_id: int, db: AsyncSession = Depends(get_db)):
+    success = await crud.delete_inscricao(db, insc_id)
     if not success:
         raise HTTPException(404, "Inscrição não encontrada")
     return Response(status_code=204)
\ No newline at end of file
@@ -0,0 +1,18 @@
+# backend/app/routers/metricas.py
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from .. import schemas, observabilidade
+from ..database import estatisticas_pool
+
+router = APIRouter(tags=["Métricas"])
+
+@router.get("/metricas/pool", response_model=schemas.PoolMetricas)
+def obter_metricas_pool():
+    # Estado do pool deste processo (cada worker do uvicorn tem o seu)
+    return estatisticas_pool()
+
+@router.get("/metrics", response_class=Response, include_in_schema=False)
+def exportar_prometheus():
+    # Formato texto do Prometheus: histogramas por rota (observabilidade.py) e o pool
+    observabilidade.atualizar_metricas_pool()
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
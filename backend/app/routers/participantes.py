@@ -1,36 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from .. import crud, schemas
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from .. import crud, schemas, paginacao
 from ..database import get_db
 
 router = APIRouter(prefix="/participantes", tags=["Participantes"])
 
 @router.get("/", response_model=list[schemas.ParticipanteRead])
-def listar_participantes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_participantes(db, skip, limit)
+async def listar_participantes(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=paginacao.DESCRICAO_CURSOR),
+    db: AsyncSession = Depends(get_db)
+):
+    itens = await crud.get_participantes(db, skip, limit, cursor=cursor)
+    paginacao.definir_proximo(response, itens, limit, cursor)
+    return itens
 
 @router.get("/{user_id}", response_model=schemas.ParticipanteRead)
-def obter_participante(user_id: int, db: Session = Depends(get_db)):
-    p = crud.get_participante(db, user_id)
+async def obter_participante(user_id: int, db: AsyncSession = Depends(get_db)):
+    p = await crud.get_participante(db, user_id)
     if not p:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Participante não encontrado")
     return p
 
 @router.post("/", response_model=schemas.ParticipanteRead, status_code=status.HTTP_201_CREATED)
-def criar_participante(p: schemas.ParticipanteCreate, db: Session = Depends(get_db)):
-    return crud.create_participante(db, p)
+async def criar_participante(p: schemas.ParticipanteCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_participante(db, p)
 
 @router.put("/{user_id}", response_model=schemas.ParticipanteRead)
-def alterar_participante(user_id: int, p: schemas.ParticipanteUpdate, db: Session = Depends(get_db)):
-    updated = crud.update_participante(db, user_id, p)
+async def alterar_participante(user_id: int, p: schemas.ParticipanteUpdate, db: AsyncSession = Depends(get_db)):
+    updated = await crud.update_participante(db, user_id, p)
     if not updated:
         raise HTTPException(404, "Participante não encontrada")
     # Sempre retorne o participante atualizado do banco
-    return crud.get_participante(db, user_id)
+    return await crud.get_participante(db, user_id)
 
 @router.delete("/{user_id}", status_code=204)
-def remover_participante(user_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_participante(db, user_id)
+async def remover_participante(user_id: int, db: AsyncSession = Depends(get_db)):
+    success = await crud.delete_participante(db, user_id)
     if not success:
         raise HTTPException(404, "Participante não encontrada")
     return Response(status_code=204)
@@ -1,39 +1,51 @@
 # backend/app/routers/problemas.py
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from .. import crud, schemas, models
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from .. import cache, crud, models, schemas, paginacao
 from ..database import get_db
 
 router = APIRouter(prefix="/problemas", tags=["Problemas"])
 
-@router.get("/", response_model=list[schemas.ProblemaRead])
-def listar_problemas(skip: int = 0, limit: int = 100, comp_id: int = None, db: Session = Depends(get_db)):
-    if comp_id is not None:
-        return db.query(models.Problema).filter(models.Problema.id_competicao == comp_id).offset(skip).limit(limit).all()
-    return crud.get_problemas(db, skip, limit)
+TABELAS = ("problema",)
 
-@router.get("/{problema_id}", response_model=schemas.ProblemaRead)
-def obter_problema(problema_id: int, db: Session = Depends(get_db)):
-    prob = crud.get_problema(db, problema_id)
+@router.get("/", response_model=list[schemas.ProblemaRead], dependencies=[Depends(cache.condicional(*TABELAS))])
+async def listar_problemas(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    comp_id: int = None,
+    cursor: Optional[str] = Query(None, description=paginacao.DESCRICAO_CURSOR),
+    db: AsyncSession = Depends(get_db)
+):
+    async def carregar(response: Response):
+        itens = await crud.get_problemas(db, skip, limit, comp_id=comp_id, cursor=cursor)
+        paginacao.definir_proximo(response, itens, limit, cursor, models.Problema)
+        return itens
+    return await cache.servir(request, TABELAS, list[schemas.ProblemaRead], carregar)
+
+@router.get("/{problema_id}", response_model=schemas.ProblemaRead, dependencies=[Depends(cache.condicional(*TABELAS))])
+async def obter_problema(problema_id: int, db: AsyncSession = Depends(get_db)):
+    prob = await crud.get_problema(db, problema_id)
     if not prob:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Problema não encontrado")
     return prob
 
 @router.post("/", response_model=schemas.ProblemaRead, status_code=status.HTTP_201_CREATED)
-def criar_problema(problema: schemas.ProblemaCreate, db: Session = Depends(get_db)):
-    return crud.create_problema(db, problema)
+async def criar_problema(problema: schemas.ProblemaCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_problema(db, problema)
 
 @router.put("/{problema_id}", response_model=schemas.ProblemaRead)
-def alterar_problema(problema_id: int, prob: schemas.ProblemaCreate, db: Session = Depends(get_db)):
-    updated = crud.update_problema(db, problema_id, prob)
+async def alterar_problema(problema_id: int, prob: schemas.ProblemaCreate, db: AsyncSession = Depends(get_db)):
+    updated = await crud.update_problema(db, problema_id, prob)
     if not updated:
         raise HTTPException(404, "Problema não encontrado")
     return updated
 
 @router.delete("/{problema_id}", status_code=204)
-def remover_problema(problema_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_problema(db, problema_id)
+async def remover_problema(problema_id: int, db: AsyncSession = Depends(get_db)):
+    success = await crud.delete_problema(db, problema_id)
     if not success:
         raise HTTPException(404, "Problema não encontrado")
     return Response(status_code=204)
\ No newline at end of file
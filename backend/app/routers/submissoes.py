@@ -1,37 +1,108 @@
 # backend/app/routers/submissoes.py
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from .. import crud, schemas
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from .. import crud, schemas, models, paginacao, observabilidade, serializacao
+import json
+from ..database import get_db, get_db_lote
 
 router = APIRouter(prefix="/submissoes", tags=["Submissões"])
 
 @router.get("/", response_model=list[schemas.SubmissaoRead])
-def listar_submissoes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_submissoes(db, skip, limit)
+async def listar_submissoes(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=paginacao.DESCRICAO_CURSOR),
+    db: AsyncSession = Depends(get_db)
+):
+    # dicts já no formato de SubmissaoRead (crud.PROJ_SUBMISSAO): sem revalidar
+    itens = await crud.get_submissoes(db, skip, limit, cursor=cursor)
+    resposta = serializacao.RespostaJSON(itens)
+    paginacao.definir_proximo(resposta, itens, limit, cursor, models.Submissao)
+    return resposta
 
 @router.get("/{sub_id}", response_model=schemas.SubmissaoRead)
-def obter_submissao(sub_id: int, db: Session = Depends(get_db)):
-    sub = crud.get_submissao(db, sub_id)
+async def obter_submissao(sub_id: int, db: AsyncSession = Depends(get_db)):
+    sub = await crud.get_submissao(db, sub_id)
     if not sub:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Submissão não encontrada")
     return sub
 
 @router.post("/", response_model=schemas.SubmissaoRead, status_code=status.HTTP_201_CREATED)
-def criar_submissao(submissao: schemas.SubmissaoCreate, db: Session = Depends(get_db)):
-    return crud.create_submissao(db, submissao)
+async def criar_submissao(submissao: schemas.SubmissaoCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_submissao(db, submissao)
+
+# Limite de linhas por requisição em /bulk
+MAX_LOTE = 50_000
+
+def _ler_lote(corpo: bytes, ndjson: bool):
+    """Valida o corpo numa passada; devolve ([(linha, SubmissaoCreate)], erros)."""
+    if ndjson:
+        objetos, erros_json = [], []
+        for i, l in enumerate(corpo.splitlines(), start=1):
+            if not l.strip():
+                continue
+            try:
+                objetos.append((i, json.loads(l)))
+            except ValueError:
+                erros_json.append({"linha": i, "erro": "JSON inválido"})
+    else:
+        try:
+            dados = json.loads(corpo)
+        except ValueError:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "JSON inválido")
+        if not isinstance(dados, list):
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Envie uma lista de submissões")
+        objetos, erros_json = list(enumerate(dados, start=1)), []
+
+    if len(objetos) > MAX_LOTE:
+        raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, f"Máximo de {MAX_LOTE} submissões por lote")
+
+    itens, erros = [], erros_json
+    for linha, obj in objetos:
+        if not isinstance(obj, dict):
+            erros.append({"linha": linha, "erro": "Linha não é um objeto JSON"})
+            continue
+        try:
+            sub = schemas.SubmissaoCreate(**obj)
+        except ValidationError as e:
+            erros.append({"linha": linha, "erro": "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())})
+            continue
+        if sub.status not in models.SubmissaoStatus.__members__:
+            erros.append({"linha": linha, "erro": f"status inválido: {sub.status}"})
+            continue
+        itens.append((linha, sub))
+    return itens, erros
+
+@router.post("/bulk", response_model=schemas.SubmissaoLoteResultado,
+             dependencies=[Depends(observabilidade.orcamento_consultas(None))])
+async def criar_submissoes_lote(request: Request, db: AsyncSession = Depends(get_db_lote)):
+    """Insere muitas submissões de uma vez (lista JSON ou NDJSON).
+
+    As linhas válidas são gravadas numa única transação; as demais voltam em
+    "erros" com o número da linha (1-based).
+    """
+    corpo = await request.body()
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    itens, erros = await run_in_threadpool(_ler_lote, corpo, ndjson)
+    inseridas, erros_banco = await crud.create_submissoes_lote(db, itens) if itens else (0, [])
+    erros = sorted(erros + erros_banco, key=lambda e: e["linha"])
+    return {"inseridas": inseridas, "erros": erros}
 
 @router.put("/{sub_id}", response_model=schemas.SubmissaoRead)
-def alterar_submissao(sub_id: int, sub: schemas.SubmissaoCreate, db: Session = Depends(get_db)):
-    updated = crud.update_submissao(db, sub_id, sub)
+async def alterar_submissao(sub_id: int, sub: schemas.SubmissaoCreate, db: AsyncSession = Depends(get_db)):
+    updated = await crud.update_submissao(db, sub_id, sub)
     if not updated:
         raise HTTPException(404, "Submissão não encontrada")
     return updated
 
 @router.delete("/{sub_id}", status_code=204)
-def remover_submissao(sub_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_submissao(db, sub_id)
+async def remover_submissao(sub_id: int, db: AsyncSession = Depends(get_db)):
+    success = await crud.delete_submissao(db, sub_id)
     if not success:
         raise HTTPException(404, "Submissão não encontrada")
     return Response(status_code=204)
\ No newline at end of file
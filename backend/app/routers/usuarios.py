@@ -1,46 +1,52 @@
 # backend/app/routers/usuarios.py
 from fastapi import APIRouter, Depends, HTTPException, status, Response, UploadFile, File, Request
-from fastapi import Body
-from sqlalchemy.orm import Session
-from .. import crud, schemas, models
+from fastapi import Body, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from .. import crud, schemas, models, imagens, paginacao
 from ..database import get_db
 import traceback
+import hashlib
 
 router = APIRouter(prefix="/usuarios", tags=["Usuários"])
 
 @router.get("/", response_model=list[schemas.UsuarioRead])
-def listar_usuarios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_usuarios(db, skip, limit)
+async def listar_usuarios(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=paginacao.DESCRICAO_CURSOR),
+    db: AsyncSession = Depends(get_db)
+):
+    itens = await crud.get_usuarios(db, skip, limit, cursor=cursor)
+    paginacao.definir_proximo(response, itens, limit, cursor)
+    return itens
 
 @router.get("/{user_id}", response_model=schemas.UsuarioRead)
-def obter_usuario(user_id: int, db: Session = Depends(get_db)):
-    user = crud.get_usuario_com_foto_base64(db, user_id)
+async def obter_usuario(user_id: int, db: AsyncSession = Depends(get_db)):
+    user = await crud.get_usuario(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     return user
 
 @router.post("/", response_model=schemas.UsuarioRead, status_code=status.HTTP_201_CREATED)
-def criar_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)):
-    return crud.create_usuario(db, usuario)
+async def criar_usuario(usuario: schemas.UsuarioCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_usuario(db, usuario)
 
-@router.put("/{usuario_id}")
-def alterar_usuario(usuario_id: int, usuario: schemas.UsuarioUpdate, db: Session = Depends(get_db)):
-    db_usuario = db.query(models.Usuario).filter(models.Usuario.id_usuario == usuario_id).first()
+@router.put("/{usuario_id}", response_model=schemas.UsuarioRead)
+async def alterar_usuario(usuario_id: int, usuario: schemas.UsuarioUpdate, db: AsyncSession = Depends(get_db)):
+    db_usuario = await crud.update_usuario(db, usuario_id, usuario)
     if not db_usuario:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
-    db_usuario.nome = usuario.nome
-    db.commit()
-    db.refresh(db_usuario)
-    # Retorne o usuário com foto em base64
-    return crud.get_usuario_com_foto_base64(db, usuario_id)
+    return db_usuario
 
 @router.delete("/{user_id}", status_code=204)
-def remover_usuario(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.Usuario).filter(models.Usuario.id_usuario == user_id).first()
+async def remover_usuario(user_id: int, db: AsyncSession = Depends(get_db)):
+    user = await crud.get_usuario(db, user_id)
     if not user:
         raise HTTPException(404, "Usuário não encontrado")
     try:
-        crud.delete_usuario(db, user_id)
+        await crud.delete_usuario(db, user_id)
     except Exception as e:
         print(f"Erro ao deletar usuário {user_id}: {e}")
         traceback.print_exc()  # <-- Adicione esta linha para mostrar o stack trace completo
@@ -51,7 +57,7 @@ def remover_usuario(user_id: int, db: Session = Depends(get_db)):
 async def upload_user_photo(
     user_id: int,
     foto: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Valida extensão
     if not foto.content_type in ["image/jpeg", "image/png"]:
@@ -60,16 +66,70 @@ async def upload_user_photo(
             detail="Apenas imagens JPEG ou PNG são permitidas."
         )
 
-    # Lê os bytes da imagem
+    # Lê os bytes da imagem e gera as variantes fora do event loop
     foto_bytes = await foto.read()
+    try:
+        variantes = await imagens.processar_foto(foto_bytes)
+    except imagens.ImagemInvalida:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Não foi possível ler a imagem enviada."
+        )
 
     # Atualiza no banco
-    user = crud.update_usuario_foto(db, user_id, foto_bytes)
+    user = await crud.update_usuario_foto(db, user_id, variantes["media"], variantes["miniatura"])
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado."
         )
 
-    # Retorna o usuário com a imagem convertida em base64
-    return crud.get_usuario_com_foto_base64(db, user_id)
\ No newline at end of file
+    return user
+
+def _tipo_imagem(dados: bytes) -> str:
+    # Identifica o formato pelos bytes iniciais (só aceitamos JPEG e PNG no upload)
+    if dados.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if dados.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    return "application/octet-stream"
+
+def _cabecalhos_foto(versao: str, tamanho: str) -> dict:
+    # cada variante (media/miniatura) tem seu ETag
+    return {"ETag": f'"{versao}-{tamanho}"', "Cache-Control": "private, max-age=300"}
+
+def _foto_nao_modificada(request: Request, versao: str, tamanho: str) -> Optional[Response]:
+    headers = _cabecalhos_foto(versao, tamanho)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or headers["ETag"] in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    return None
+
+@router.get(
+    "/{user_id}/foto",
+    response_class=Response,
+    responses={200: {"content": {"image/jpeg": {}, "image/png": {}}}, 304: {"description": "Foto não modificada"}}
+)
+async def obter_foto_usuario(
+    user_id: int,
+    request: Request,
+    tamanho: str = Query("media", pattern="^(media|miniatura)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    # a versão (sha256 gravado com a foto) responde o If-None-Match sem ler os bytes
+    linha = await crud.get_usuario_foto_versao(db, user_id)
+    if linha is None:
+        raise HTTPException(status_code=404, detail="Foto não encontrada")
+    if linha.foto_versao is not None:
+        resposta = _foto_nao_modificada(request, linha.foto_versao, tamanho)
+        if resposta is not None:
+            return resposta
+
+    foto = await crud.get_usuario_foto(db, user_id, tamanho)
+    if not foto:
+        raise HTTPException(status_code=404, detail="Foto não encontrada")
+    versao = linha.foto_versao or hashlib.sha256(foto).hexdigest()
+    resposta = _foto_nao_modificada(request, versao, tamanho)
+    if resposta is not None:
+        return resposta
+    return Response(content=foto, media_type=_tipo_imagem(foto), headers=_cabecalhos_foto(versao, tamanho))
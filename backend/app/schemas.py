@@ -28,6 +28,14 @@ class CompeticaoRead(CompeticaoBase):
     class Config:
         from_attributes = True
 
+# Linha do placar ao vivo de uma competição
+class PlacarLinha(BaseModel):
+    posicao: int
+    id_usuario: int
+    nome: Optional[str] = None
+    resolvidos: int
+    penalidade: int  # minutos
+
 # Schemas para Usuário
 class UsuarioBase(BaseModel):
     nome: str
@@ -42,8 +50,14 @@ class UsuarioCreate(UsuarioBase):
 class UsuarioUpdate(BaseModel):
     nome: Optional[str] = None
 
-class UsuarioRead(UsuarioBase):
+class UsuarioRead(BaseModel):
     id_usuario: int
+    nome: str
+    email: str
+    senha_hash: str
+    tipo: str
+    # A foto não vem no JSON: é servida em binário por GET /usuarios/{id}/foto
+    foto_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -135,6 +149,16 @@ class InscricaoRead(InscricaoBase):
     class Config:
         from_attributes = True
 
+# Resultado de POST /inscricoes/competicao/{comp_id}/importar
+class InscricaoImportacaoErro(BaseModel):
+    linha: int
+    erro: str
+
+class InscricaoImportacaoResultado(BaseModel):
+    criados: int
+    inscritos: int
+    erros: list[InscricaoImportacaoErro] = []
+
 # Schemas para Problema
 class ProblemaBase(BaseModel):
     titulo: str
@@ -167,6 +191,15 @@ class SubmissaoRead(SubmissaoBase):
     class Config:
         from_attributes = True
 
+# Resultado de POST /submissoes/bulk
+class SubmissaoLoteErro(BaseModel):
+    linha: int
+    erro: str
+
+class SubmissaoLoteResultado(BaseModel):
+    inseridas: int
+    erros: list[SubmissaoLoteErro] = []
+
 # Schemas para Estatistica
 class EstatisticaBase(BaseModel):
     media_tempo: float
@@ -176,6 +209,8 @@ class EstatisticaBase(BaseModel):
 
 class EstatisticaRead(EstatisticaBase):
     id_estatistica: int
+    total_submissoes: int
+    total_aceitos: int
 
     class Config:
         from_attributes = True
@@ -207,3 +242,15 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# Estado do pool de conexões (GET /metricas/pool)
+class PoolMetricas(BaseModel):
+    tamanho: int
+    max_overflow: int
+    em_uso: int
+    livres: int
+    overflow: int
+    checkouts: int
+    espera_media_ms: float
+    espera_max_ms: float
+    timeouts: int
@@ -1,8 +1,19 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
 from passlib.context import CryptContext
 
+# Custo do bcrypt; ao mudar, hashes antigos são refeitos no próximo login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
 pwd_context = CryptContext(
     schemes=["bcrypt"],
-    deprecated="auto"
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
 )
 
 # Gera um hash seguro para uma senha em texto puro.
@@ -12,3 +23,68 @@ def hash_password(plain_password: str) -> str:
 # Verifica se a senha em texto bate com o hash armazenado.
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+# Verifica a senha e, se o hash usar outro custo, devolve o hash novo (senão None).
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+# Pool de processos para o bcrypt (usa CPU e segura o GIL)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 2))
+# Máximo de hashes em andamento ou na fila; acima disso a requisição é recusada (503)
+HASH_FILA_MAX = int(os.getenv("HASH_FILA_MAX", HASH_WORKERS * 8))
+# Quantas dessas vagas os hashes em lote (importação) podem ocupar juntos; o
+# resto fica para login e cadastro. O lote espera vaga em vez de receber 503
+HASH_LOTE_MAX = int(os.getenv("HASH_LOTE_MAX", max(1, HASH_FILA_MAX // 2)))
+
+_pool_hash = None
+_vagas_hash = threading.BoundedSemaphore(HASH_FILA_MAX)
+_vagas_lote = asyncio.Semaphore(HASH_LOTE_MAX)
+
+
+class FilaHashCheia(RuntimeError):
+    pass
+
+
+def _executor_hash() -> ProcessPoolExecutor:
+    global _pool_hash
+    if _pool_hash is None:
+        _pool_hash = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _pool_hash
+
+def _submeter(fn, *args) -> Future:
+    if not _vagas_hash.acquire(blocking=False):
+        raise FilaHashCheia()
+    try:
+        futuro = _executor_hash().submit(fn, *args)
+    except BaseException:
+        _vagas_hash.release()
+        raise
+    futuro.add_done_callback(lambda _: _vagas_hash.release())
+    return futuro
+
+# Versões limitadas pela fila; liberam o event loop enquanto o pool trabalha
+async def hash_password_async(plain_password: str) -> str:
+    return await asyncio.wrap_future(_submeter(hash_password, plain_password))
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return await asyncio.wrap_future(_submeter(verify_and_update, plain_password, hashed_password))
+
+# Gera os hashes de várias senhas em paralelo, na mesma ordem da entrada
+# (scripts fora da API: não passa pela fila).
+def hash_passwords(plain_passwords: list[str]) -> list[str]:
+    return list(_executor_hash().map(hash_password, plain_passwords, chunksize=16))
+
+async def _hash_em_lote(plain_password: str) -> str:
+    async with _vagas_lote:
+        while True:
+            try:
+                futuro = _submeter(hash_password, plain_password)
+                break
+            except FilaHashCheia:
+                # fila tomada por logins: espera uma vaga em vez de recusar
+                await asyncio.sleep(0.05)
+        return await asyncio.wrap_future(futuro)
+
+# Versão da API: cada senha ocupa uma vaga da fila, no máximo HASH_LOTE_MAX de todos os lotes por vez.
+async def hash_passwords_async(plain_passwords: list[str]) -> list[str]:
+    return list(await asyncio.gather(*(_hash_em_lote(p) for p in plain_passwords)))
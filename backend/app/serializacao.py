@@ -0,0 +1,144 @@
+# backend/app/serializacao.py
+# Caminho rápido para listagens grandes.
+#
+# O caminho normal carrega objetos do ORM e o FastAPI valida cada um no
+# response_model (from_attributes) antes de gerar o JSON. Aqui o schema *Read
+# vira uma lista de colunas (joins para os schemas aninhados, column_property
+# como expressão SQL), o select devolve tuplas, as tuplas viram dicts e o
+# orjson serializa. Sem identity map, sem validação por objeto: os dados vêm
+# do banco e os tipos já batem com o schema.
+#
+# Só serve para schemas cujos campos são todos colunas/expressões SQL (não
+# para propriedades Python, como Usuario.foto_url ou Estatistica.taxa_acerto).
+from decimal import Decimal
+from typing import Optional, get_args
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def _submodelo(anotacao) -> Optional[type]:
+    for tipo in (anotacao, *get_args(anotacao)):
+        if isinstance(tipo, type) and issubclass(tipo, BaseModel):
+            return tipo
+    return None
+
+
+class Projecao:
+    """Colunas de um schema *Read sobre um modelo do ORM e a montagem dos dicts."""
+
+    def __init__(self, schema: type, modelo):
+        self.schema = schema
+        self.modelo = modelo
+        self._colunas = None
+
+    def _compilar(self):
+        colunas, joins = [], []
+
+        def visitar(schema, modelo):
+            # primeiro as colunas deste nível, depois as de cada schema aninhado;
+            # cada montar recebe a linha inteira e lê as próprias posições
+            inicio, planos, aninhados = len(colunas), [], []
+            for nome, campo in schema.model_fields.items():
+                sub = _submodelo(campo.annotation)
+                if sub is not None:
+                    aninhados.append((nome, sub))
+                    continue
+                expr = getattr(modelo, nome, None)
+                if expr is None or not hasattr(expr, "expression"):
+                    raise TypeError(f"{schema.__name__}.{nome} não é coluna de {modelo.__name__}")
+                colunas.append(expr)
+                planos.append(nome)
+            fim = len(colunas)
+
+            partes = []
+            for nome, sub in aninhados:
+                rel = inspect(modelo).relationships[nome]
+                if any(c.nullable for c in rel.local_columns):
+                    raise TypeError(f"{schema.__name__}.{nome}: só relações obrigatórias (join interno)")
+                joins.append(getattr(modelo, nome))
+                partes.append((nome, visitar(sub, rel.mapper.class_)))
+
+            if not partes:
+                return lambda linha: dict(zip(planos, linha[inicio:fim]))
+
+            def montar(linha):
+                d = dict(zip(planos, linha[inicio:fim]))
+                for nome, montar_sub in partes:
+                    d[nome] = montar_sub(linha)
+                return d
+            return montar
+
+        self._montar = visitar(self.schema, self.modelo)
+        self._joins = joins
+        self._colunas = colunas
+
+    def select(self):
+        if self._colunas is None:
+            self._compilar()
+        stmt = select(*self._colunas).select_from(self.modelo)
+        for rel in self._joins:
+            stmt = stmt.join(rel)
+        return stmt
+
+    def montar(self, linhas) -> list:
+        return [self._montar(linha) for linha in linhas]
+
+
+def carregamento(schema: type, modelo) -> list:
+    """Opções de carga para todos os schemas aninhados de `schema`, em qualquer nível.
+
+    Para quando a resposta sai de objetos do ORM (detalhes, escritas, listagens
+    com propriedades Python). Relação para-um vem no mesmo SELECT (JOIN, interno
+    se a FK é obrigatória); coleção vem em um SELECT ... IN por nível, para a
+    página inteira. Em async nada pode ser carregado sob demanda depois.
+    """
+    opcoes = []
+    for nome, campo in schema.model_fields.items():
+        sub = _submodelo(campo.annotation)
+        if sub is None:
+            continue
+        rel = inspect(modelo).relationships[nome]
+        atributo = getattr(modelo, nome)
+        if rel.uselist:
+            opcao = selectinload(atributo)
+        else:
+            opcao = joinedload(atributo, innerjoin=not any(c.nullable for c in rel.local_columns))
+        aninhadas = carregamento(sub, rel.mapper.class_)
+        opcoes.append(opcao.options(*aninhadas) if aninhadas else opcao)
+    return opcoes
+
+
+def _padrao(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError(f"{type(valor).__name__} não serializável")
+
+
+def dumps(conteudo) -> bytes:
+    return orjson.dumps(conteudo, default=_padrao)
+
+
+_adaptadores: dict = {}
+
+
+def serializar(itens, modelo) -> bytes:
+    """JSON de uma listagem: dicts de uma Projecao vão direto ao orjson; objetos do ORM passam pelo schema."""
+    if isinstance(itens, list) and (not itens or isinstance(itens[0], dict)):
+        return dumps(itens)
+    if modelo not in _adaptadores:
+        _adaptadores[modelo] = TypeAdapter(modelo)
+    adaptador = _adaptadores[modelo]
+    return adaptador.dump_json(adaptador.validate_python(itens, from_attributes=True))
+
+
+class RespostaJSON(Response):
+    """JSONResponse com orjson, para conteúdo que já está no formato do schema."""
+
+    media_type = "application/json"
+
+    def render(self, conteudo) -> bytes:
+        return dumps(conteudo)
@@ -0,0 +1,117 @@
+# backend/benchmarks/cenarios.py
+# Um cenário por endpoint medido. Os caminhos e corpos são gerados a partir
+# de uma Amostra de ids lida do banco semeado, com um random.Random próprio
+# de cada worker para a sequência de requisições ser reproduzível.
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from .dados import SENHA_BENCH
+
+
+@dataclass
+class Amostra:
+    competicoes: list = field(default_factory=list)
+    competicoes_ativas: list = field(default_factory=list)
+    problemas: dict = field(default_factory=dict)      # id_problema -> id_competicao
+    inscritos: dict = field(default_factory=dict)      # id_competicao -> [id_usuario]
+    participantes: list = field(default_factory=list)
+    colaboradores: list = field(default_factory=list)
+    patrocinadores: list = field(default_factory=list)
+    equipes: list = field(default_factory=list)
+    inscricoes: list = field(default_factory=list)
+    submissoes: list = field(default_factory=list)
+    estatisticas: list = field(default_factory=list)
+    emails: list = field(default_factory=list)
+
+
+async def carregar_amostra(db: AsyncSession, limite: int = 2000) -> Amostra:
+    a = Amostra()
+    a.competicoes = list((await db.scalars(select(models.Competicao.id_competicao))).all())
+    a.competicoes_ativas = list((await db.scalars(
+        select(models.Competicao.id_competicao).where(models.Competicao.finalizada.is_(False))
+    )).all())
+    a.problemas = dict((await db.execute(select(models.Problema.id_problema, models.Problema.id_competicao))).all())
+    for u, c in (await db.execute(select(models.Inscricao.id_usuario, models.Inscricao.id_competicao))).all():
+        a.inscritos.setdefault(c, []).append(u)
+    a.participantes = list((await db.scalars(select(models.Participante.id_usuario).limit(limite))).all())
+    a.colaboradores = list((await db.scalars(select(models.Colaborador.id_usuario).limit(limite))).all())
+    a.patrocinadores = list((await db.scalars(select(models.Patrocinador.id_usuario).limit(limite))).all())
+    a.equipes = list((await db.scalars(select(models.EquipeColaboradores.id_equipe))).all())
+    a.inscricoes = list((await db.scalars(select(models.Inscricao.id_inscricao).limit(limite))).all())
+    a.submissoes = list((await db.scalars(select(models.Submissao.id_submissao).limit(limite))).all())
+    a.estatisticas = list((await db.scalars(select(models.Estatistica.id_estatistica))).all())
+    a.emails = list((await db.scalars(
+        select(models.Usuario.email).where(models.Usuario.email.like("%@bench.local")).limit(limite)
+    )).all())
+    return a
+
+
+@dataclass
+class Cenario:
+    nome: str
+    metodo: str
+    caminho: Callable[[Amostra, random.Random], str]
+    corpo: Optional[Callable[[Amostra, random.Random], object]] = None
+    escrita: bool = False
+
+
+_sequencia = count()
+
+
+def _submissao(a: Amostra, rng: random.Random) -> dict:
+    p = rng.choice([p for p, c in a.problemas.items() if a.inscritos.get(c)])
+    c = a.problemas[p]
+    return {"id_problema": p, "id_usuario": rng.choice(a.inscritos[c]),
+            "status": rng.choice(["aceito", "rejeitado", "pendente"]),
+            "timestamp": (datetime.now() - timedelta(seconds=rng.randint(0, 3600))).isoformat()}
+
+
+CENARIOS = [
+    # Leituras
+    Cenario("competicoes.listar", "GET", lambda a, r: "/competicoes/?limit=100"),
+    Cenario("competicoes.detalhe", "GET", lambda a, r: f"/competicoes/{r.choice(a.competicoes)}"),
+    Cenario("competicoes.placar", "GET", lambda a, r: f"/competicoes/{r.choice(a.competicoes_ativas or a.competicoes)}/placar"),
+    Cenario("usuarios.listar", "GET", lambda a, r: "/usuarios/?limit=100"),
+    Cenario("usuarios.detalhe", "GET", lambda a, r: f"/usuarios/{r.choice(a.participantes)}"),
+    Cenario("equipes.listar", "GET", lambda a, r: "/equipes/"),
+    Cenario("equipes.detalhe", "GET", lambda a, r: f"/equipes/{r.choice(a.equipes)}"),
+    Cenario("colaboradores.listar", "GET", lambda a, r: "/colaboradores/?limit=100"),
+    Cenario("colaboradores.detalhe", "GET", lambda a, r: f"/colaboradores/{r.choice(a.colaboradores)}"),
+    Cenario("participantes.listar", "GET", lambda a, r: "/participantes/?limit=100"),
+    Cenario("participantes.detalhe", "GET", lambda a, r: f"/participantes/{r.choice(a.participantes)}"),
+    Cenario("patrocinadores.listar", "GET", lambda a, r: "/patrocinadores/?limit=100"),
+    Cenario("patrocinadores.detalhe", "GET", lambda a, r: f"/patrocinadores/{r.choice(a.patrocinadores)}"),
+    Cenario("competicaopatrocinador.listar", "GET", lambda a, r: "/competicaopatrocinador/?limit=100"),
+    Cenario("competicaopatrocinador.por_competicao", "GET",
+            lambda a, r: f"/competicaopatrocinador/competicao/{r.choice(a.competicoes)}"),
+    Cenario("inscricoes.listar", "GET", lambda a, r: "/inscricoes/?limit=100"),
+    Cenario("inscricoes.por_competicao", "GET", lambda a, r: f"/inscricoes/competicao/{r.choice(a.competicoes)}"),
+    Cenario("inscricoes.detalhe", "GET", lambda a, r: f"/inscricoes/{r.choice(a.inscricoes)}"),
+    Cenario("problemas.listar", "GET", lambda a, r: "/problemas/?limit=100"),
+    Cenario("problemas.detalhe", "GET", lambda a, r: f"/problemas/{r.choice(list(a.problemas))}"),
+    Cenario("submissoes.listar", "GET", lambda a, r: "/submissoes/?limit=100"),
+    Cenario("submissoes.detalhe", "GET", lambda a, r: f"/submissoes/{r.choice(a.submissoes)}"),
+    Cenario("estatisticas.listar", "GET", lambda a, r: "/estatisticas/"),
+    Cenario("estatisticas.por_competicao", "GET", lambda a, r: f"/estatisticas/competicao/{r.choice(a.competicoes)}"),
+    Cenario("estatisticas.detalhe", "GET", lambda a, r: f"/estatisticas/{r.choice(a.estatisticas)}"),
+    Cenario("universidades.listar", "GET", lambda a, r: "/universidades/"),
+    Cenario("metricas.pool", "GET", lambda a, r: "/metricas/pool"),
+    # Escritas
+    Cenario("submissoes.criar", "POST", lambda a, r: "/submissoes/", _submissao, escrita=True),
+    Cenario("submissoes.bulk", "POST", lambda a, r: "/submissoes/bulk",
+            lambda a, r: [_submissao(a, r) for _ in range(100)], escrita=True),
+    Cenario("participantes.atualizar", "PUT", lambda a, r: f"/participantes/{r.choice(a.participantes)}",
+            lambda a, r: {"instituicao": f"Universidade {r.randint(0, 6)}"}, escrita=True),
+    Cenario("usuarios.criar", "POST", lambda a, r: "/usuarios/",
+            lambda a, r: {"nome": "Bench", "email": f"novo{next(_sequencia)}-{r.getrandbits(32)}@bench.local",
+                          "senha_hash": SENHA_BENCH, "tipo": "participante"}, escrita=True),
+    Cenario("auth.login", "POST", lambda a, r: "/auth/login",
+            lambda a, r: {"email": r.choice(a.emails), "password": SENHA_BENCH}, escrita=True),
+]
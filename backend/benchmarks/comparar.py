@@ -0,0 +1,31 @@
+# backend/benchmarks/comparar.py
+# Compara dois resultados do benchmark: python -m benchmarks.comparar antes.json depois.json
+import json
+import sys
+
+
+def _delta(antes, depois) -> str:
+    if not antes or depois is None:
+        return "     -"
+    return f"{(depois - antes) * 100 / antes:+6.1f}%"
+
+
+def comparar(antes: dict, depois: dict):
+    print(f"{antes['commit']} -> {depois['commit']}")
+    print(f"{'cenário':40} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'consultas':>10}")
+    for nome, d in depois["cenarios"].items():
+        a = antes["cenarios"].get(nome)
+        if a is None:
+            print(f"{nome:40} (novo)")
+            continue
+        la, ld = a["latencia_ms"], d["latencia_ms"]
+        print(f"{nome:40} {_delta(la['p50'], ld['p50'])} {_delta(la['p95'], ld['p95'])} "
+              f"{_delta(la['p99'], ld['p99'])} {_delta(a['vazao_rps'], d['vazao_rps'])} "
+              f"{a['consultas']['media']!s:>4} -> {d['consultas']['media']!s:<4}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("uso: python -m benchmarks.comparar antes.json depois.json")
+    with open(sys.argv[1], encoding="utf-8") as fa, open(sys.argv[2], encoding="utf-8") as fd:
+        comparar(json.load(fa), json.load(fd))
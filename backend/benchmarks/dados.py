@@ -0,0 +1,142 @@
+# backend/benchmarks/dados.py
+# Massa de dados determinística para os benchmarks: a mesma Escala e a mesma
+# semente geram sempre as mesmas linhas, então resultados de commits
+# diferentes são comparáveis.
+import random
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models
+from app.database import Base
+from app.security import hash_password
+
+# Senha de todos os usuários semeados (POST /auth/login usa esta)
+SENHA_BENCH = "bench123"
+LOTE = 5000
+
+
+@dataclass
+class Escala:
+    competicoes: int = 5
+    problemas: int = 10          # por competição
+    participantes: int = 1000
+    inscricoes: int = 3          # competições por participante (no máximo)
+    submissoes: int = 50_000
+    colaboradores: int = 30
+    equipes: int = 3
+    patrocinadores: int = 20
+
+    def como_dict(self) -> dict:
+        return asdict(self)
+
+
+async def _inserir(db: AsyncSession, modelo, linhas: list, retornar=None) -> list:
+    """INSERT multi-linha em lotes; devolve a coluna retornar na ordem de entrada."""
+    ids = []
+    for i in range(0, len(linhas), LOTE):
+        parte = linhas[i:i + LOTE]
+        if retornar is None:
+            await db.execute(insert(modelo), parte)
+        else:
+            res = await db.execute(insert(modelo).returning(retornar, sort_by_parameter_order=True), parte)
+            ids.extend(res.scalars().all())
+    return ids
+
+
+async def limpar(db: AsyncSession):
+    """Apaga todas as linhas das tabelas do app (o schema, procedures e views ficam)."""
+    tabelas = list(reversed(Base.metadata.sorted_tables))
+    if db.bind.dialect.name == "postgresql":
+        nomes = ", ".join(t.name for t in tabelas)
+        await db.execute(text(f"TRUNCATE {nomes} RESTART IDENTITY CASCADE"))
+    else:
+        for tabela in tabelas:
+            await db.execute(delete(tabela))
+    await db.commit()
+
+
+async def semear(db: AsyncSession, escala: Escala, semente: int = 42):
+    rng = random.Random(semente)
+    senha = hash_password(SENHA_BENCH)  # um hash só: bcrypt por usuário levaria minutos
+
+    def usuarios(prefixo: str, n: int, tipo: models.UsuarioTipo) -> list:
+        return [{"nome": f"{prefixo} {i}", "email": f"{prefixo}{i}@bench.local", "senha_hash": senha, "tipo": tipo}
+                for i in range(n)]
+
+    # Colaboradores e equipes
+    ids_colab = await _inserir(db, models.Usuario, usuarios("colab", escala.colaboradores, models.UsuarioTipo.colaborador),
+                               models.Usuario.id_usuario)
+    ids_equipe = await _inserir(db, models.EquipeColaboradores,
+                                [{"nome": f"Equipe {i}"} for i in range(escala.equipes)],
+                                models.EquipeColaboradores.id_equipe)
+    papeis = list(models.ColaboradorPapel)
+    await _inserir(db, models.Colaborador, [
+        {"id_usuario": u, "papel": rng.choice(papeis), "id_equipe": rng.choice(ids_equipe), "instituicao": "Bench"}
+        for u in ids_colab
+    ])
+
+    # Competições (metade em andamento, para o placar em memória ter trabalho)
+    hoje = date.today()
+    ids_comp = await _inserir(db, models.Competicao, [
+        {"nome": f"Maratona {i}", "local": "Online", "id_equipe": rng.choice(ids_equipe),
+         "data": hoje + timedelta(days=i) if i % 2 == 0 else hoje - timedelta(days=30 + i),
+         "horario": time(9, 0), "max_participantes": escala.participantes, "finalizada": i % 2 == 1}
+        for i in range(escala.competicoes)
+    ], models.Competicao.id_competicao)
+    await _inserir(db, models.Estatistica, [{"id_competicao": c} for c in ids_comp])
+
+    niveis = list(models.ProblemaNivel)
+    problemas = [(c, j) for c in ids_comp for j in range(escala.problemas)]
+    ids_prob = await _inserir(db, models.Problema, [
+        {"titulo": f"Problema {chr(65 + j % 26)}{c}", "nivel": rng.choice(niveis),
+         "link": f"https://bench.local/p/{c}/{j}", "id_competicao": c}
+        for c, j in problemas
+    ], models.Problema.id_problema)
+    comp_do_prob = {p: c for p, (c, _) in zip(ids_prob, problemas)}
+    await _inserir(db, models.EstatisticaProblema, [
+        {"id_problema": p, "id_competicao": c} for p, c in comp_do_prob.items()
+    ])
+
+    # Participantes e inscrições
+    ids_part = await _inserir(db, models.Usuario, usuarios("part", escala.participantes, models.UsuarioTipo.participante),
+                              models.Usuario.id_usuario)
+    await _inserir(db, models.Participante, [{"id_usuario": u, "instituicao": f"Universidade {u % 7}"} for u in ids_part])
+    inscritos = {c: [] for c in ids_comp}
+    linhas_insc = []
+    for u in ids_part:
+        for c in rng.sample(ids_comp, min(len(ids_comp), rng.randint(1, escala.inscricoes))):
+            inscritos[c].append(u)
+            linhas_insc.append({"id_usuario": u, "id_competicao": c, "categoria": "individual"})
+    await _inserir(db, models.Inscricao, linhas_insc)
+
+    # Submissões de inscritos, nas primeiras 5h de cada competição
+    status = [models.SubmissaoStatus.aceito, models.SubmissaoStatus.rejeitado, models.SubmissaoStatus.rejeitado,
+              models.SubmissaoStatus.pendente]
+    inicio = {c.id_competicao: datetime.combine(c.data, c.horario)
+              for c in (await db.scalars(select(models.Competicao))).all()}
+    linhas_sub = []
+    for _ in range(escala.submissoes):
+        p = rng.choice(ids_prob)
+        c = comp_do_prob[p]
+        if not inscritos[c]:
+            continue
+        linhas_sub.append({"id_problema": p, "id_usuario": rng.choice(inscritos[c]), "status": rng.choice(status),
+                           "timestamp": inicio[c] + timedelta(seconds=rng.randint(0, 5 * 3600))})
+    await _inserir(db, models.Submissao, linhas_sub)
+
+    # Patrocinadores
+    ids_patro = await _inserir(db, models.Usuario, usuarios("patro", escala.patrocinadores, models.UsuarioTipo.patrocinador),
+                               models.Usuario.id_usuario)
+    await _inserir(db, models.Patrocinador, [{"id_usuario": u} for u in ids_patro])
+    await _inserir(db, models.CompeticaoPatrocinador, [
+        {"id_competicao": c, "id_usuario_patro": u, "contribuicao": rng.randint(100, 10_000)}
+        for u in ids_patro for c in rng.sample(ids_comp, min(len(ids_comp), 2))
+    ])
+    await db.commit()
+
+    # Contadores de estatística a partir das submissões inseridas
+    for c in ids_comp:
+        await crud.recalcular_estatistica(db, c)
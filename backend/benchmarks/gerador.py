@@ -0,0 +1,286 @@
+# backend/benchmarks/gerador.py
+# Gerador de massa sintética em escala de produção (só Postgres).
+#
+# Os participantes são divididos em fatias; cada fatia roda num processo
+# próprio, com sua conexão asyncpg, e grava usuario -> participante ->
+# inscricao -> submissao via COPY (protocolo binário), então várias cargas
+# correm em paralelo. Os contadores de estatística são somados pelos próprios
+# workers enquanto geram as linhas, sem reler milhões de submissões no fim.
+#
+# Uso (dentro de backend/, num banco de testes: os dados atuais são apagados):
+#   python -m benchmarks.gerador --participantes 1000000 --competicoes 300 --processos 8
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time as hora, timedelta
+from decimal import Decimal
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.database import ASYNC_DATABASE_URL, Base, async_engine, sessao
+from app.models import ColaboradorPapel, ProblemaNivel, SubmissaoStatus, UsuarioTipo, epoch
+from app.security import hash_password
+from .dados import SENHA_BENCH, limpar
+
+# Chance de um inscrito tentar o problema e de cada tentativa ser aceita, por nível
+TENTA = {ProblemaNivel.fácil: 0.9, ProblemaNivel.médio: 0.6, ProblemaNivel.difícil: 0.3}
+ACEITA = {ProblemaNivel.fácil: 0.55, ProblemaNivel.médio: 0.3, ProblemaNivel.difícil: 0.12}
+DURACAO = timedelta(hours=5)
+# Fração das submissões concentradas na última hora (corrida do fim da prova)
+PICO_FINAL = 0.3
+PENDENTES = 0.01
+
+
+@dataclass
+class Plano:
+    """O que todas as fatias precisam saber da parte fixa (competições e problemas)."""
+    semente: int
+    senha_hash: str
+    competicoes: list          # ids
+    pesos: list                # popularidade de cada competição (inscrições)
+    inicio: dict               # id_competicao -> datetime de início
+    problemas: dict            # id_competicao -> [(id_problema, nivel)]
+    max_inscricoes: int
+    atividade: float           # fração dos inscritos que submete alguma coisa
+
+
+def _dsn() -> str:
+    # asyncpg quer a URL sem o "+asyncpg" do SQLAlchemy
+    return make_url(ASYNC_DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def _instante(rng: random.Random, inicio: datetime) -> datetime:
+    if rng.random() < PICO_FINAL:
+        segundos = rng.uniform(DURACAO.total_seconds() - 3600, DURACAO.total_seconds())
+    else:
+        segundos = rng.uniform(0, DURACAO.total_seconds())
+    return inicio + timedelta(seconds=segundos)
+
+
+def gerar_inscricoes(rng: random.Random, plano: Plano, ids_usuario) -> list:
+    """[(id_usuario, [id_competicao, ...])]: poucas competições por pessoa, as populares com mais gente."""
+    inscricoes = []
+    for u in ids_usuario:
+        k = 1
+        while k < plano.max_inscricoes and rng.random() < 0.45:
+            k += 1
+        inscricoes.append((u, sorted(set(rng.choices(plano.competicoes, plano.pesos, k=k)))))
+    return inscricoes
+
+
+def gerar_submissoes(rng: random.Random, plano: Plano, inscricoes: list, contadores: dict):
+    """Gera (timestamp, status, id_problema, id_usuario) e soma os contadores por problema/competição."""
+    aceito, rejeitado, pendente = (SubmissaoStatus.aceito.name, SubmissaoStatus.rejeitado.name,
+                                   SubmissaoStatus.pendente.name)
+    por_problema, soma_ts = contadores["problemas"], contadores["soma_timestamps"]
+    agora = datetime.now()
+    for u, comps in inscricoes:
+        for c in comps:
+            inicio = plano.inicio[c]
+            if inicio > agora or rng.random() >= plano.atividade:
+                continue
+            for p, nivel in plano.problemas[c]:
+                if rng.random() >= TENTA[nivel]:
+                    continue
+                # tentativas em ordem cronológica até o primeiro aceite (ou desistência)
+                instantes = sorted(_instante(rng, inicio) for _ in range(1 + int(rng.expovariate(0.7))))
+                for ts in instantes:
+                    if rng.random() < PENDENTES:
+                        status = pendente
+                    elif rng.random() < ACEITA[nivel]:
+                        status = aceito
+                    else:
+                        status = rejeitado
+                    total, aceitos = por_problema.get(p, (0, 0))
+                    por_problema[p] = (total + 1, aceitos + (status == aceito))
+                    soma_ts[c] += epoch(ts)
+                    yield ts, status, p, u
+                    if status == aceito:
+                        break
+
+
+async def _carregar_fatia(dsn: str, plano: Plano, inicio: int, fim: int) -> dict:
+    rng = random.Random(f"{plano.semente}:{inicio}")
+    contadores = {"problemas": {}, "soma_timestamps": Counter(), "linhas": Counter()}
+    conn = await asyncpg.connect(dsn)
+    try:
+        # cada COPY é uma transação; perder o fim de uma carga sintética num crash não importa
+        await conn.execute("SET synchronous_commit = off")
+        ids = range(inicio, fim)
+        participante = UsuarioTipo.participante.name
+        await conn.copy_records_to_table(
+            "usuario", columns=["id_usuario", "nome", "email", "senha_hash", "tipo"],
+            records=((u, f"Participante {u}", f"p{u}@gerado.local", plano.senha_hash, participante) for u in ids),
+        )
+        await conn.copy_records_to_table(
+            "participante", columns=["id_usuario", "instituicao"],
+            records=((u, f"Universidade {u % 97}") for u in ids),
+        )
+        inscricoes = gerar_inscricoes(rng, plano, ids)
+        await conn.copy_records_to_table(
+            "inscricao", columns=["id_usuario", "id_competicao", "categoria"],
+            records=((u, c, "individual") for u, comps in inscricoes for c in comps),
+        )
+        await conn.copy_records_to_table(
+            "submissao", columns=["timestamp", "status", "id_problema", "id_usuario"],
+            records=gerar_submissoes(rng, plano, inscricoes, contadores),
+        )
+    finally:
+        await conn.close()
+    contadores["linhas"].update(usuario=len(ids), inscricao=sum(len(c) for _, c in inscricoes),
+                                submissao=sum(t for t, _ in contadores["problemas"].values()))
+    return contadores
+
+
+def _rodar_fatia(dsn: str, plano: Plano, inicio: int, fim: int) -> dict:
+    # ponto de entrada no processo filho
+    return asyncio.run(_carregar_fatia(dsn, plano, inicio, fim))
+
+
+async def _carregar_base(conn, args, rng: random.Random) -> Plano:
+    """Equipes, colaboradores, patrocinadores, competições e problemas (ids explícitos)."""
+    senha = hash_password(SENHA_BENCH)
+    n_colab, n_patro = args.colaboradores, args.patrocinadores
+    equipes = range(1, args.equipes + 1)
+    await conn.copy_records_to_table("equipe_colaboradores", columns=["id_equipe", "nome"],
+                                     records=((e, f"Equipe {e}") for e in equipes))
+    await conn.copy_records_to_table(
+        "usuario", columns=["id_usuario", "nome", "email", "senha_hash", "tipo"],
+        records=[(u, f"Colaborador {u}", f"c{u}@gerado.local", senha, UsuarioTipo.colaborador.name)
+                 for u in range(1, n_colab + 1)]
+        + [(u, f"Patrocinador {u}", f"s{u}@gerado.local", senha, UsuarioTipo.patrocinador.name)
+           for u in range(n_colab + 1, n_colab + n_patro + 1)],
+    )
+    papeis = [p.name for p in ColaboradorPapel]
+    await conn.copy_records_to_table(
+        "colaborador", columns=["id_usuario", "papel", "id_equipe", "instituicao"],
+        records=[(u, rng.choice(papeis), rng.choice(equipes), f"Universidade {u % 97}") for u in range(1, n_colab + 1)],
+    )
+    patrocinadores = range(n_colab + 1, n_colab + n_patro + 1)
+    await conn.copy_records_to_table("patrocinador", columns=["id_usuario"], records=[(u,) for u in patrocinadores])
+
+    # Competições semanais nos últimos anos; as mais recentes ainda em andamento
+    hoje = date.today()
+    competicoes = range(1, args.competicoes + 1)
+    datas = {c: hoje - timedelta(weeks=args.competicoes - c - 2) for c in competicoes}
+    await conn.copy_records_to_table(
+        "competicao", columns=["id_competicao", "nome", "local", "data", "id_equipe", "horario",
+                               "max_participantes", "finalizada"],
+        records=[(c, f"Maratona {c}", "Online", datas[c], rng.choice(equipes), hora(13, 0), None, datas[c] < hoje)
+                 for c in competicoes],
+    )
+    niveis = list(ProblemaNivel)
+    problemas, linhas, proximo = {}, [], 1
+    for c in competicoes:
+        problemas[c] = []
+        for j in range(rng.randint(8, 13)):
+            nivel = rng.choices(niveis, (3, 4, 3))[0]
+            problemas[c].append((proximo, nivel))
+            linhas.append((proximo, f"Problema {chr(65 + j)}", nivel.name, f"https://gerado.local/{c}/{j}", c))
+            proximo += 1
+    await conn.copy_records_to_table("problema", columns=["id_problema", "titulo", "nivel", "link", "id_competicao"],
+                                     records=linhas)
+    await conn.copy_records_to_table(
+        "competicao_patrocinador", columns=["id_competicao", "id_usuario_patro", "contribuicao"],
+        records=[(c, u, Decimal(rng.randint(500, 50_000))) for u in patrocinadores
+                 for c in rng.sample(competicoes, min(3, len(competicoes)))],
+    )
+
+    # popularidade com cauda longa: poucas competições concentram as inscrições
+    pesos = [1 / (posicao + 1) ** 0.8 for posicao in range(len(competicoes))]
+    rng.shuffle(pesos)
+    return Plano(
+        semente=args.semente, senha_hash=senha, competicoes=list(competicoes), pesos=pesos,
+        inicio={c: datetime.combine(datas[c], hora(13, 0)) for c in competicoes},
+        problemas=problemas, max_inscricoes=args.max_inscricoes, atividade=args.atividade,
+    )
+
+
+async def _gravar_estatisticas(conn, plano: Plano, parciais: list):
+    por_problema, soma_ts = {}, Counter()
+    for parcial in parciais:
+        for p, (total, aceitos) in parcial["problemas"].items():
+            t, a = por_problema.get(p, (0, 0))
+            por_problema[p] = (t + total, a + aceitos)
+        soma_ts.update(parcial["soma_timestamps"])
+
+    linhas_ep, linhas_e = [], []
+    for c in plano.competicoes:
+        totais = [(p, *por_problema.get(p, (0, 0)), f"Problema {chr(65 + j)}")
+                  for j, (p, _) in enumerate(plano.problemas[c])]
+        linhas_ep.extend((p, c, t, a) for p, t, a, _ in totais)
+        # mesmo critério de crud._problema_mais_dificil: menos aceites entre os que tiveram submissões
+        com_submissao = [(a, p, titulo) for p, t, a, titulo in totais if t]
+        mais_dificil = min(com_submissao)[2] if com_submissao else None
+        linhas_e.append((c, mais_dificil, sum(t[1] for t in totais), sum(t[2] for t in totais), soma_ts[c]))
+    await conn.copy_records_to_table("estatistica_problema",
+                                     columns=["id_problema", "id_competicao", "total_submissoes", "total_aceitos"],
+                                     records=linhas_ep)
+    await conn.copy_records_to_table("estatistica",
+                                     columns=["id_competicao", "problema_mais_dificil", "total_submissoes",
+                                              "total_aceitos", "soma_timestamps"],
+                                     records=linhas_e)
+
+
+async def principal(args):
+    if async_engine.dialect.name != "postgresql":
+        raise SystemExit("O gerador usa COPY e só funciona com Postgres (DATABASE_URL postgresql://...)")
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessao("lote") as db:
+        await limpar(db)
+    await async_engine.dispose()   # os processos filhos abrem as próprias conexões
+
+    dsn, rng, inicio = _dsn(), random.Random(args.semente), time.perf_counter()
+    conn = await asyncpg.connect(dsn)
+    try:
+        plano = await _carregar_base(conn, args, rng)
+        primeiro = args.colaboradores + args.patrocinadores + 1
+        ultimo = primeiro + args.participantes
+        fatias = [(i, min(i + args.fatia, ultimo)) for i in range(primeiro, ultimo, args.fatia)]
+        print(f"{len(fatias)} fatias de até {args.fatia} participantes em {args.processos} processos")
+
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=args.processos) as executor:
+            tarefas = [loop.run_in_executor(executor, _rodar_fatia, dsn, plano, a, b) for a, b in fatias]
+            parciais, linhas = [], Counter()
+            for pronta in asyncio.as_completed(tarefas):
+                parcial = await pronta
+                parciais.append(parcial)
+                linhas.update(parcial["linhas"])
+                print(f"  {len(parciais)}/{len(fatias)} fatias  {dict(linhas)}  {time.perf_counter() - inicio:.0f}s")
+
+        await _gravar_estatisticas(conn, plano, parciais)
+        # ids explícitos no COPY não avançam as sequências
+        for tabela, coluna in (("usuario", "id_usuario"), ("equipe_colaboradores", "id_equipe"),
+                               ("competicao", "id_competicao"), ("problema", "id_problema")):
+            await conn.execute(f"SELECT setval(pg_get_serial_sequence('{tabela}', '{coluna}'), "
+                               f"(SELECT max({coluna}) FROM {tabela}))")
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+    print(f"Concluído em {time.perf_counter() - inicio:.0f}s: {dict(linhas)}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Gera massa sintética via COPY em paralelo (apaga os dados atuais)")
+    p.add_argument("--participantes", type=int, default=1_000_000)
+    p.add_argument("--competicoes", type=int, default=200)
+    p.add_argument("--colaboradores", type=int, default=500)
+    p.add_argument("--patrocinadores", type=int, default=100)
+    p.add_argument("--equipes", type=int, default=40)
+    p.add_argument("--max-inscricoes", type=int, default=6, help="competições por participante, no máximo")
+    p.add_argument("--atividade", type=float, default=0.6, help="fração dos inscritos que submete")
+    p.add_argument("--processos", type=int, default=4, help="cargas COPY simultâneas")
+    p.add_argument("--fatia", type=int, default=50_000, help="participantes por fatia")
+    p.add_argument("--semente", type=int, default=42)
+    asyncio.run(principal(p.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# backend/benchmarks/rodar.py
+# Benchmark dos endpoints: dispara os cenários contra o app dentro do próprio
+# processo (httpx + ASGITransport, sem rede nem uvicorn), com N requisições
+# simultâneas, e grava latências p50/p95/p99, vazão e consultas por
+# requisição (cabeçalho X-DB-Consultas) num JSON.
+#
+# Uso (dentro de backend/):
+#   python -m benchmarks.rodar --semear --participantes 5000 --submissoes 200000
+#   python -m benchmarks.rodar --concorrencia 32 --requisicoes 500 --filtro competicoes
+import argparse
+import asyncio
+import json
+import logging
+import random
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from app.database import Base, async_engine, sessao
+from app.main import app
+from app.observabilidade import CABECALHO_CONSULTAS
+from .cenarios import CENARIOS, Cenario, carregar_amostra
+from .dados import Escala, limpar, semear
+
+RESULTADOS = Path(__file__).parent / "resultados"
+
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil pelo método do posto mais próximo (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    posto = max(1, -(-len(valores) * p // 100))   # ceil(n * p / 100)
+    return valores[int(posto) - 1]
+
+
+async def medir(cliente: httpx.AsyncClient, cenario: Cenario, amostra, requisicoes: int,
+                concorrencia: int, semente: int) -> dict:
+    latencias, consultas, erros, status = [], [], 0, {}
+    restantes = iter(range(requisicoes))
+
+    async def worker(n: int):
+        nonlocal erros
+        rng = random.Random(f"{semente}:{cenario.nome}:{n}")
+        for _ in restantes:
+            caminho = cenario.caminho(amostra, rng)
+            corpo = cenario.corpo(amostra, rng) if cenario.corpo else None
+            inicio = time.perf_counter()
+            resp = await cliente.request(cenario.metodo, caminho, json=corpo)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            status[resp.status_code] = status.get(resp.status_code, 0) + 1
+            if resp.status_code >= 400:
+                erros += 1
+            if CABECALHO_CONSULTAS in resp.headers:
+                consultas.append(int(resp.headers[CABECALHO_CONSULTAS]))
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "metodo": cenario.metodo,
+        "requisicoes": len(latencias),
+        "erros": erros,
+        "status": {str(k): v for k, v in sorted(status.items())},
+        "vazao_rps": round(len(latencias) / duracao, 1) if duracao else 0.0,
+        "latencia_ms": {
+            "p50": round(percentil(latencias, 50), 2),
+            "p95": round(percentil(latencias, 95), 2),
+            "p99": round(percentil(latencias, 99), 2),
+            "max": round(latencias[-1], 2) if latencias else 0.0,
+        },
+        "consultas": {
+            "media": round(sum(consultas) / len(consultas), 2) if consultas else None,
+            "max": max(consultas) if consultas else None,
+        },
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+async def principal(args) -> Path:
+    escala = Escala(**{k: getattr(args, k) for k in Escala.__dataclass_fields__})
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    if args.semear:
+        async with sessao("lote") as db:
+            await limpar(db)
+            print(f"Semeando {escala.como_dict()} ...")
+            inicio = time.perf_counter()
+            await semear(db, escala, args.semente)
+            print(f"Semeado em {time.perf_counter() - inicio:.1f}s")
+
+    cenarios = [c for c in CENARIOS if not args.filtro or any(f in c.nome for f in args.filtro)]
+    if args.somente_leitura:
+        cenarios = [c for c in cenarios if not c.escrita]
+
+    resultado = {
+        "commit": _commit(),
+        "inicio": datetime.now().isoformat(timespec="seconds"),
+        "banco": async_engine.dialect.name,
+        "escala": escala.como_dict() if args.semear else None,
+        "concorrencia": args.concorrencia,
+        "requisicoes_por_cenario": args.requisicoes,
+        "semente": args.semente,
+        "cenarios": {},
+    }
+    # lifespan_context roda os eventos de startup (placar em memória) como no uvicorn
+    async with app.router.lifespan_context(app):
+        async with sessao("leitura") as db:
+            amostra = await carregar_amostra(db)
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=None) as cliente:
+            for cenario in cenarios:
+                await medir(cliente, cenario, amostra, args.aquecimento, args.concorrencia, args.semente)
+                r = await medir(cliente, cenario, amostra, args.requisicoes, args.concorrencia, args.semente)
+                resultado["cenarios"][cenario.nome] = r
+                lat = r["latencia_ms"]
+                print(f"{cenario.nome:40} {r['vazao_rps']:>8} rps  p50 {lat['p50']:>8} ms  "
+                      f"p95 {lat['p95']:>8} ms  p99 {lat['p99']:>8} ms  consultas {r['consultas']['media']}"
+                      + (f"  erros {r['erros']}" if r["erros"] else ""))
+
+    saida = Path(args.saida) if args.saida else RESULTADOS / f"{datetime.now():%Y%m%d-%H%M%S}-{resultado['commit']}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    await async_engine.dispose()
+    return saida
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark dos endpoints da API")
+    padrao = Escala()
+    for nome in Escala.__dataclass_fields__:
+        p.add_argument(f"--{nome}", type=int, default=getattr(padrao, nome))
+    p.add_argument("--semear", action="store_true", help="apaga os dados e semeia de novo na escala dada")
+    p.add_argument("--semente", type=int, default=42)
+    p.add_argument("--concorrencia", type=int, default=16)
+    p.add_argument("--requisicoes", type=int, default=200, help="requisições medidas por cenário")
+    p.add_argument("--aquecimento", type=int, default=20, help="requisições descartadas antes de medir")
+    p.add_argument("--filtro", nargs="*", help="só cenários cujo nome contém um destes trechos")
+    p.add_argument("--somente-leitura", action="store_true", help="pula os cenários que escrevem")
+    p.add_argument("--saida", help="arquivo JSON (padrão: benchmarks/resultados/<data>-<commit>.json)")
+    p.add_argument("--log-consultas", action="store_true", help="mantém os avisos de N+1 da observabilidade")
+    args = p.parse_args()
+    if not args.log_consultas:
+        # os avisos por requisição poluiriam a saída; consultas por cenário já vão para o JSON
+        logging.getLogger("app.observabilidade").setLevel(logging.ERROR)
+    print(f"Resultado em {asyncio.run(principal(args))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# backend/benchmarks/serializacao.py
+# Micro-benchmark do caminho rápido de serialização (app/serializacao.py):
+# mesma listagem de N linhas montada dos dois jeitos, sem HTTP no meio.
+#
+#   orm+validacao   objetos do ORM -> TypeAdapter.validate_python -> dump_json
+#                   (o que o FastAPI faz com response_model)
+#   projecao+orjson select das colunas do schema -> dicts -> orjson
+#
+# Uso (dentro de backend/, banco de testes):
+#   python -m benchmarks.serializacao --semear --linhas 10000
+import argparse
+import asyncio
+import time
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app import crud, models, schemas
+from app.database import Base, async_engine, sessao
+from app.serializacao import dumps
+from .dados import Escala, limpar, semear
+
+LISTAGENS = {
+    "inscricoes": (crud._select_inscricoes, crud.PROJ_INSCRICAO, schemas.InscricaoRead, models.Inscricao),
+    "submissoes": (lambda: select(models.Submissao), crud.PROJ_SUBMISSAO, schemas.SubmissaoRead,
+                   models.Submissao),
+}
+
+
+async def _cronometrar(funcao, repeticoes: int) -> tuple[float, bytes]:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        corpo = await funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return tempos[len(tempos) // 2], corpo
+
+
+async def principal(args):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    if args.semear:
+        # inscrições ~ participantes * 2; submissões = linhas
+        escala = Escala(participantes=args.linhas // 2, inscricoes=3, competicoes=5, submissoes=args.linhas)
+        async with sessao("lote") as db:
+            await limpar(db)
+            await semear(db, escala, 42)
+
+    for nome, (select_orm, projecao, schema, modelo) in LISTAGENS.items():
+        if args.filtro and nome not in args.filtro:
+            continue
+        adaptador = TypeAdapter(list[schema])
+        chave = modelo.__mapper__.primary_key
+
+        async def orm_validacao():
+            async with sessao("leitura") as db:
+                itens = (await db.scalars(select_orm().order_by(*chave).limit(args.linhas))).all()
+                return adaptador.dump_json(adaptador.validate_python(itens, from_attributes=True))
+
+        async def projecao_orjson():
+            async with sessao("leitura") as db:
+                linhas = await db.execute(projecao.select().order_by(*chave).limit(args.linhas))
+                return dumps(projecao.montar(linhas))
+
+        lento, corpo_lento = await _cronometrar(orm_validacao, args.repeticoes)
+        rapido, corpo_rapido = await _cronometrar(projecao_orjson, args.repeticoes)
+        iguais = orjson.loads(corpo_lento) == orjson.loads(corpo_rapido)
+        n = len(orjson.loads(corpo_rapido))
+        print(f"{nome:12} {n:>7} linhas  orm+validacao {lento:>9.1f} ms  projecao+orjson {rapido:>9.1f} ms  "
+              f"{lento / rapido:>5.1f}x  {'mesmo JSON' if iguais else 'JSON DIFERENTE'}")
+    await async_engine.dispose()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark da serialização de listagens grandes")
+    p.add_argument("--linhas", type=int, default=10_000)
+    p.add_argument("--repeticoes", type=int, default=5, help="mediana de N execuções")
+    p.add_argument("--semear", action="store_true", help="apaga os dados e semeia ~--linhas linhas")
+    p.add_argument("--filtro", nargs="*", choices=list(LISTAGENS))
+    asyncio.run(principal(p.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# backend/tests/conftest.py
+# Os testes sobem a API com TestClient sobre um SQLite descartável. Para rodar
+# contra outro banco (test_planos.py só roda em Postgres) defina
+# TEST_DATABASE_URL apontando para um banco DE TESTES: os testes gravam e
+# apagam dados nele.
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = (os.getenv("TEST_DATABASE_URL")
+                              or f"sqlite:///{tempfile.mkdtemp()}/testes.db")
+# rota que passar do orçamento de consultas falha o teste (ver observabilidade.py)
+os.environ.setdefault("DB_MODO_ESTRITO", "true")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal, sessao
+from app.main import app
+from benchmarks.dados import limpar
+
+
+@pytest.fixture(scope="session")
+def cliente():
+    # o startup cria as tabelas (Base.metadata.create_all)
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def rodar(cliente):
+    """Roda uma corrotina no event loop da API (o do pool de conexões assíncrono)."""
+    return lambda funcao, *args: cliente.portal.call(funcao, *args)
+
+
+async def _limpar_banco():
+    async with sessao("lote") as db:
+        await limpar(db)
+
+
+@pytest.fixture
+def db(rodar):
+    """Sessão síncrona para preparar dados, sobre um banco vazio."""
+    rodar(_limpar_banco)
+    sessao_sync = SessionLocal()
+    try:
+        yield sessao_sync
+    finally:
+        sessao_sync.close()
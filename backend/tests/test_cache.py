@@ -0,0 +1,30 @@
+from datetime import date
+
+from app import cache, models
+
+
+def _semear_competicao(db) -> int:
+    equipe = models.EquipeColaboradores(nome="equipe")
+    db.add(equipe)
+    db.flush()
+    comp = models.Competicao(nome="comp", data=date(2026, 1, 1), id_equipe=equipe.id_equipe)
+    db.add(comp)
+    db.commit()
+    return comp.id_competicao
+
+
+def test_etag_vale_em_qualquer_worker_ate_a_proxima_escrita(cliente, db):
+    comp_id = _semear_competicao(db)
+    etag = cliente.get("/problemas/").headers["ETag"]
+    assert cliente.get("/problemas/", headers={"If-None-Match": etag}).status_code == 304
+
+    # outro worker (ou este, reiniciado): gerações em memória do zero
+    cache.backend._geracoes.clear()
+    cache.backend._itens.clear()
+    assert cliente.get("/problemas/", headers={"If-None-Match": etag}).status_code == 304
+
+    novo = {"titulo": "A", "nivel": "fácil", "link": "l", "id_competicao": comp_id}
+    assert cliente.post("/problemas/", json=novo).status_code in (200, 201)
+    resposta = cliente.get("/problemas/", headers={"If-None-Match": etag})
+    assert resposta.status_code == 200
+    assert resposta.headers["ETag"] != etag
@@ -0,0 +1,34 @@
+from datetime import date
+
+from app import models
+from app.observabilidade import CABECALHO_CONSULTAS
+
+
+def _semear_colaboradores(db, n: int, inicio: int):
+    equipe = models.EquipeColaboradores(nome=f"equipe {inicio}")
+    db.add(equipe)
+    db.flush()
+    db.add(models.Competicao(nome=f"comp {inicio}", data=date(2026, 1, 1), id_equipe=equipe.id_equipe))
+    for i in range(inicio, inicio + n):
+        usuario = models.Usuario(nome=f"colab {i}", email=f"colab{i}@teste", senha_hash="x",
+                                 tipo=models.UsuarioTipo.colaborador)
+        db.add(usuario)
+        db.flush()
+        db.add(models.Colaborador(id_usuario=usuario.id_usuario, papel=models.ColaboradorPapel.setter,
+                                  id_equipe=equipe.id_equipe))
+    db.commit()
+
+
+def test_listar_colaboradores_numero_constante_de_consultas(cliente, db):
+    _semear_colaboradores(db, 3, 0)
+    poucos = cliente.get("/colaboradores/")
+    assert poucos.status_code == 200
+    assert len(poucos.json()) == 3
+
+    _semear_colaboradores(db, 27, 3)
+    muitos = cliente.get("/colaboradores/")
+    assert muitos.status_code == 200
+    assert len(muitos.json()) == 30
+    assert all(c["nome_equipe"] and c["usuario"]["nome"] for c in muitos.json())
+
+    assert muitos.headers[CABECALHO_CONSULTAS] == poucos.headers[CABECALHO_CONSULTAS]
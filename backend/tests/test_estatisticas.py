@@ -0,0 +1,35 @@
+from datetime import date, datetime
+
+from app import models
+
+
+def _semear_competicao(db) -> tuple:
+    equipe = models.EquipeColaboradores(nome="equipe")
+    db.add(equipe)
+    db.flush()
+    comp = models.Competicao(nome="comp", data=date(2026, 1, 1), id_equipe=equipe.id_equipe)
+    db.add(comp)
+    db.flush()
+    problema = models.Problema(titulo="A", nivel=models.ProblemaNivel.fácil, link="l",
+                               id_competicao=comp.id_competicao)
+    usuario = models.Usuario(nome="participante", email="participante@teste", senha_hash="x",
+                             tipo=models.UsuarioTipo.participante)
+    db.add_all([problema, usuario])
+    db.flush()
+    db.add(models.Participante(id_usuario=usuario.id_usuario, instituicao="x"))
+    db.add(models.Submissao(timestamp=datetime(2026, 1, 1, 10), status=models.SubmissaoStatus.rejeitado,
+                            id_problema=problema.id_problema, id_usuario=usuario.id_usuario))
+    db.commit()
+    return comp.id_competicao, problema.id_problema
+
+
+def test_renomear_problema_atualiza_problema_mais_dificil(cliente, db):
+    comp_id, prob_id = _semear_competicao(db)
+    assert cliente.post(f"/competicoes/{comp_id}/gerar-estatistica").status_code == 204
+    assert cliente.get(f"/estatisticas/competicao/{comp_id}").json()["problema_mais_dificil"] == "A"
+
+    problema = cliente.get(f"/problemas/{prob_id}").json()
+    resposta = cliente.put(f"/problemas/{prob_id}", json={**problema, "titulo": "A renomeado"})
+    assert resposta.status_code == 200
+
+    assert cliente.get(f"/estatisticas/competicao/{comp_id}").json()["problema_mais_dificil"] == "A renomeado"
@@ -0,0 +1,29 @@
+from datetime import date
+
+from app import models
+
+
+def _semear(db) -> int:
+    equipe = models.EquipeColaboradores(nome="equipe")
+    db.add(equipe)
+    db.flush()
+    comp = models.Competicao(nome="comp", data=date(2026, 1, 1), id_equipe=equipe.id_equipe)
+    usuario = models.Usuario(nome="Fulana", email="Fulana@Teste.com", senha_hash="x",
+                             tipo=models.UsuarioTipo.participante)
+    db.add_all([comp, usuario])
+    db.flush()
+    db.add(models.Participante(id_usuario=usuario.id_usuario, instituicao="x"))
+    db.commit()
+    return comp.id_competicao
+
+
+def test_importar_reconhece_email_cadastrado_com_outra_grafia(cliente, db):
+    comp_id = _semear(db)
+    csv = "nome,email,instituicao\nFulana,fulana@teste.com,x\nCiclano,Ciclano@Teste.com,y\n"
+    resposta = cliente.post(f"/inscricoes/competicao/{comp_id}/importar",
+                            files={"arquivo": ("inscritos.csv", csv, "text/csv")})
+    assert resposta.status_code == 200
+    assert resposta.json() == {"criados": 1, "inscritos": 2, "erros": []}
+
+    emails = sorted(db.scalars(models.Usuario.__table__.select().with_only_columns(models.Usuario.email)))
+    assert emails == ["Fulana@Teste.com", "ciclano@teste.com"]
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from app.models import SubmissaoStatus
+from app.placar import PENALIDADE_REJEICAO, PlacarCompeticao
+
+INICIO = datetime(2026, 1, 1, 9, 0)
+
+
+def _em(minutos: float) -> datetime:
+    return INICIO + timedelta(minutes=minutos)
+
+
+def test_submissao_aplicada_duas_vezes_conta_uma():
+    # ex.: a reconstrução leu a submissão do banco antes de registrar_submissao rodar
+    placar = PlacarCompeticao(INICIO)
+    placar.aplicar(1, 10, 100, _em(5), SubmissaoStatus.rejeitado)
+    placar.aplicar(2, 10, 100, _em(12), SubmissaoStatus.aceito)
+    placar.aplicar(1, 10, 100, _em(5), SubmissaoStatus.rejeitado)
+    placar.aplicar(2, 10, 100, _em(12), SubmissaoStatus.aceito)
+    assert placar.totais[10] == (1, 12 + PENALIDADE_REJEICAO)
+
+
+def test_rejeicao_fora_de_ordem_no_minuto_do_aceite():
+    placar = PlacarCompeticao(INICIO)
+    placar.aplicar(2, 10, 100, _em(12.5), SubmissaoStatus.aceito)
+    # chega depois, mas foi submetida antes do aceite, no mesmo minuto
+    placar.aplicar(1, 10, 100, _em(12.1), SubmissaoStatus.rejeitado)
+    placar.aplicar(3, 10, 100, _em(12.9), SubmissaoStatus.rejeitado)
+    assert placar.totais[10] == (1, 12 + PENALIDADE_REJEICAO)
+
+
+def test_redefinir_celula_marca_submissoes_do_historico():
+    placar = PlacarCompeticao(INICIO)
+    placar.redefinir_celula(10, 100, [(1, _em(3), SubmissaoStatus.rejeitado),
+                                      (2, _em(7), SubmissaoStatus.aceito),
+                                      (3, _em(9), SubmissaoStatus.pendente)])
+    assert placar.aplicar(2, 10, 100, _em(7), SubmissaoStatus.aceito)
+    # a pendente ainda não contou: o veredicto chega como submissão nova
+    assert placar.aplicar(3, 10, 100, _em(9), SubmissaoStatus.rejeitado)
+    assert placar.totais[10] == (1, 7 + PENALIDADE_REJEICAO)
@@ -0,0 +1,154 @@
+# backend/tests/test_planos.py
+# Regressão de planos: EXPLAIN nas consultas quentes (as mesmas que o crud, o
+# placar, a fila de julgamento e as rotas montam) contra um banco semeado;
+# falha se alguma varrer submissao, inscricao ou problema inteira.
+#
+# A sessão usa enable_seqscan = off: o planejador só cai em Seq Scan quando
+# nenhum índice serve, então o resultado não depende do tamanho da base nem
+# das estatísticas. Sem Seq Scan, a falta de índice aparece como um índice
+# lido inteiro, que também conta: Index Scan sem Index Cond e com Filter, ou
+# Index Cond que não restringe a primeira coluna do índice. Índice parcial
+# não conta (o WHERE do índice já restringe as linhas).
+# Só Postgres (TEST_DATABASE_URL); no SQLite é pulado.
+#
+#   TEST_DATABASE_URL=postgresql+psycopg2://.../testes python -m pytest tests/test_planos.py
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, paginacao, placar
+from app.database import async_engine, sessao
+from benchmarks.dados import Escala, limpar, semear
+
+pytestmark = pytest.mark.skipif(async_engine.dialect.name != "postgresql",
+                                reason="EXPLAIN (FORMAT JSON) só no Postgres: defina TEST_DATABASE_URL")
+
+# Tabelas grandes: nelas ler a tabela inteira é regressão
+MONITORADAS = {"submissao", "inscricao", "problema"}
+VARREDURAS = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+@dataclass
+class Amostra:
+    id_competicao: int
+    id_usuario: int
+    id_problema: int
+    timestamp: datetime
+    id_submissao: int
+
+
+def _cursor(a: Amostra) -> str:
+    return paginacao.codificar([a.timestamp, a.id_submissao])
+
+
+# nome -> consulta montada pelo mesmo código que a rota usa
+CONSULTAS = {
+    "submissoes.listar": lambda a: paginacao._pagina(
+        crud.PROJ_SUBMISSAO.select(), models.Submissao, 0, 100, ""),
+    "submissoes.listar (cursor)": lambda a: paginacao._pagina(
+        crud.PROJ_SUBMISSAO.select(), models.Submissao, 0, 100, _cursor(a)),
+    "submissoes.exportar": lambda a: crud.select_exportacao(a.id_competicao),
+    "placar.reconstruir": lambda a: placar.select_historico(a.id_competicao),
+    "placar.celula": lambda a: placar.select_celula(a.id_usuario, a.id_problema),
+    "estatisticas.recalcular": lambda a: crud.select_contadores(a.id_competicao),
+    "julgamento.reivindicar": lambda a: crud.select_pendentes(50).with_for_update(skip_locked=True),
+    "competicoes.listar": lambda a: paginacao._pagina(
+        crud.PROJ_COMPETICAO.select(), models.Competicao, 0, 100, None),
+    "problemas.listar (competicao)": lambda a: paginacao._pagina(
+        crud.PROJ_PROBLEMA.select().where(models.Problema.id_competicao == a.id_competicao),
+        models.Problema, 0, 100, None),
+    "inscricoes.por_competicao": lambda a: crud.PROJ_INSCRICAO.select()
+        .where(models.Inscricao.id_competicao == a.id_competicao),
+    "participantes.obter": lambda a: select(models.Participante)
+        .where(models.Participante.id_usuario == a.id_usuario),
+}
+
+
+def varre_tudo(no: dict, indices: dict) -> bool:
+    """O nó lê a tabela (ou o índice) inteira."""
+    if no["Node Type"] == "Seq Scan":
+        return True
+    primeira, parcial = indices[no["Index Name"]]
+    if parcial:
+        return False
+    cond = no.get("Index Cond")
+    if cond is None:
+        # sem filtro é percorrer o índice em ordem (paginação sob Limit)
+        return "Filter" in no
+    # Postgres escreve a coluna do índice à esquerda: (col = ...), ("timestamp" < ...), ROW(col, ...)
+    return not re.search(rf'\(("?){primeira}\1[ ,]', cond)
+
+
+def tabelas_varridas(plano: dict, indices: dict, tabela: str | None = None):
+    """'<tipo do nó> em <tabela>' de cada leitura inteira de tabela monitorada no plano JSON."""
+    # Bitmap Index Scan não traz Relation Name: vale a do Bitmap Heap Scan acima
+    tabela = plano.get("Relation Name", tabela)
+    if plano["Node Type"] in VARREDURAS and tabela in MONITORADAS and varre_tudo(plano, indices):
+        yield f"{plano['Node Type']} em {tabela}"
+    for filho in plano.get("Plans", []):
+        yield from tabelas_varridas(filho, indices, tabela)
+
+
+async def _semear_e_amostrar() -> Amostra:
+    async with sessao("lote") as db:
+        await limpar(db)
+        await semear(db, Escala(participantes=300, submissoes=5_000), 42)
+        await db.execute(text("ANALYZE"))
+        await db.commit()
+    async with sessao("leitura") as db:
+        # a competição com mais submissões e uma submissão dela
+        id_competicao = await db.scalar(
+            select(models.Problema.id_competicao)
+            .join(models.Submissao, models.Submissao.id_problema == models.Problema.id_problema)
+            .group_by(models.Problema.id_competicao)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        s = (await db.execute(
+            select(models.Submissao.id_usuario, models.Submissao.id_problema,
+                   models.Submissao.timestamp, models.Submissao.id_submissao)
+            .join(models.Problema, models.Problema.id_problema == models.Submissao.id_problema)
+            .where(models.Problema.id_competicao == id_competicao)
+            .limit(1)
+        )).one()
+    return Amostra(id_competicao, s.id_usuario, s.id_problema, s.timestamp, s.id_submissao)
+
+
+async def _indices() -> dict:
+    """nome do índice -> (primeira coluna, se é parcial), lido do catálogo."""
+    async with sessao("leitura") as db:
+        linhas = await db.execute(text(
+            "SELECT c.relname, a.attname, i.indpred IS NOT NULL FROM pg_index i"
+            " JOIN pg_class c ON c.oid = i.indexrelid"
+            " JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]"
+            " WHERE c.relnamespace = current_schema()::regnamespace"))
+        return {nome: (coluna, parcial) for nome, coluna, parcial in linhas}
+
+
+async def _explicar(stmt) -> dict:
+    async with sessao("leitura") as db:
+        await db.execute(text("SET LOCAL enable_seqscan = off"))
+        sql = stmt.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+        return (await db.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}")))[0]["Plan"]
+
+
+@pytest.fixture(scope="module")
+def amostra(rodar):
+    return rodar(_semear_e_amostrar)
+
+
+@pytest.fixture(scope="module")
+def indices(rodar):
+    return rodar(_indices)
+
+
+@pytest.mark.parametrize("nome", list(CONSULTAS))
+def test_consulta_usa_indices(nome, amostra, indices, rodar):
+    plano = rodar(_explicar, CONSULTAS[nome](amostra))
+    ruins = sorted(set(tabelas_varridas(plano, indices)))
+    assert not ruins, f"{', '.join(ruins)}:\n{json.dumps(plano, indent=2)}"
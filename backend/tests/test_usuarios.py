@@ -0,0 +1,31 @@
+from app import crud, models
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def _semear_usuario_com_foto(db) -> int:
+    usuario = models.Usuario(nome="Fulana", email="fulana@teste", senha_hash="x",
+                             tipo=models.UsuarioTipo.participante, foto=PNG)
+    db.add(usuario)
+    db.commit()
+    return usuario.id_usuario
+
+
+def test_foto_nao_modificada_sem_ler_os_bytes(cliente, db, monkeypatch):
+    user_id = _semear_usuario_com_foto(db)
+    resposta = cliente.get(f"/usuarios/{user_id}/foto")
+    assert resposta.status_code == 200
+    assert resposta.content == PNG
+    etag = resposta.headers["ETag"]
+
+    async def sem_bytes(*args, **kwargs):
+        raise AssertionError("o GET condicional não deve ler a foto")
+
+    monkeypatch.setattr(crud, "get_usuario_foto", sem_bytes)
+    assert cliente.get(f"/usuarios/{user_id}/foto", headers={"If-None-Match": etag}).status_code == 304
+    monkeypatch.undo()
+    # a miniatura tem ETag próprio
+    miniatura = cliente.get(f"/usuarios/{user_id}/foto", params={"tamanho": "miniatura"},
+                            headers={"If-None-Match": etag})
+    assert miniatura.status_code == 200
+    assert miniatura.headers["ETag"] != etag
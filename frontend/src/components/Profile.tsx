@@ -63,7 +63,7 @@ const Profile: React.FC = () => {
           email: u.email,
           university,
           role: u.tipo,
-          photo: u.foto ? `data:image/jpeg;base64,${u.foto}` : null,
+          photo: u.foto_url ? `${import.meta.env.VITE_API_URL}${u.foto_url}` : null,
           collaboratorRole: collaboratorRole,
         });
 
@@ -11,7 +11,7 @@ BEGIN
         CREATE TYPE nivel_problema AS ENUM ('facil', 'medio', 'dificil');
     END IF;
     IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'status_submissao') THEN
-        CREATE TYPE status_submissao AS ENUM ('aceita', 'rejeitada', 'pendente');
+        CREATE TYPE status_submissao AS ENUM ('aceita', 'rejeitada', 'pendente', 'erro');
     END IF;
 END$$;
 
@@ -27,6 +27,8 @@ CREATE TABLE public.usuario (
   senha_hash character varying NOT NULL,
   tipo tipo_usuario NOT NULL,
   foto bytea,
+  foto_miniatura bytea,
+  foto_versao character varying(64),
   CONSTRAINT usuario_pkey PRIMARY KEY (id_usuario)
 );
 
@@ -75,10 +77,11 @@ CREATE TABLE public.competicao (
 
 CREATE TABLE public.estatistica (
   id_estatistica integer NOT NULL DEFAULT nextval('estatistica_id_estatistica_seq'::regclass),
-  media_tempo numeric,
-  taxa_acerto numeric,
   problema_mais_dificil character varying,
   id_competicao integer UNIQUE,
+  total_submissoes integer NOT NULL DEFAULT 0,
+  total_aceitos integer NOT NULL DEFAULT 0,
+  soma_timestamps bigint NOT NULL DEFAULT 0,
   CONSTRAINT estatistica_pkey PRIMARY KEY (id_estatistica),
   CONSTRAINT estatistica_id_competicao_fkey FOREIGN KEY (id_competicao) REFERENCES public.competicao(id_competicao)
 );
@@ -93,6 +96,23 @@ CREATE TABLE public.problema (
   CONSTRAINT problema_id_competicao_fkey FOREIGN KEY (id_competicao) REFERENCES public.competicao(id_competicao)
 );
 
+CREATE TABLE public.estatistica_problema (
+  id_problema integer NOT NULL,
+  id_competicao integer NOT NULL,
+  total_submissoes integer NOT NULL DEFAULT 0,
+  total_aceitos integer NOT NULL DEFAULT 0,
+  CONSTRAINT estatistica_problema_pkey PRIMARY KEY (id_problema),
+  CONSTRAINT estatistica_problema_id_problema_fkey FOREIGN KEY (id_problema) REFERENCES public.problema(id_problema),
+  CONSTRAINT estatistica_problema_id_competicao_fkey FOREIGN KEY (id_competicao) REFERENCES public.competicao(id_competicao)
+);
+
+CREATE TABLE public.versao_tabela (
+  tabela character varying(64) NOT NULL,
+  geracao bigint NOT NULL DEFAULT 0,
+  alterada_em numeric(16,3) NOT NULL DEFAULT 0,
+  CONSTRAINT versao_tabela_pkey PRIMARY KEY (tabela)
+);
+
 CREATE TABLE public.inscricao (
   id_inscricao integer NOT NULL DEFAULT nextval('inscricao_id_inscricao_seq'::regclass),
   categoria character varying,
@@ -109,6 +129,8 @@ CREATE TABLE public.submissao (
   status status_submissao NOT NULL,
   id_problema integer,
   id_usuario integer,
+  tentativas integer NOT NULL DEFAULT 0,
+  reservada_ate timestamp without time zone,
   CONSTRAINT submissao_pkey PRIMARY KEY (id_submissao),
   CONSTRAINT submissao_id_problema_fkey FOREIGN KEY (id_problema) REFERENCES public.problema(id_problema),
   CONSTRAINT submissao_id_usuario_fkey FOREIGN KEY (id_usuario) REFERENCES public.participante(id_usuario)
@@ -122,4 +144,13 @@ CREATE TABLE public.competicao_patrocinador (
   CONSTRAINT competicao_patrocinador_pkey PRIMARY KEY (id_link),
   CONSTRAINT competicao_patrocinador_id_usuario_patro_fkey FOREIGN KEY (id_usuario_patro) REFERENCES public.patrocinador(id_usuario),
   CONSTRAINT competicao_patrocinador_id_competicao_fkey FOREIGN KEY (id_competicao) REFERENCES public.competicao(id_competicao)
-);
\ No newline at end of file
+);
+
+CREATE INDEX ix_usuario_email_lower ON public.usuario USING btree (lower((email)::text));
+CREATE INDEX ix_estatistica_problema_id_competicao ON public.estatistica_problema USING btree (id_competicao);
+CREATE INDEX ix_problema_id_competicao ON public.problema USING btree (id_competicao);
+CREATE INDEX ix_inscricao_id_competicao ON public.inscricao USING btree (id_competicao);
+CREATE INDEX ix_submissao_problema_timestamp ON public.submissao USING btree (id_problema, "timestamp", id_submissao);
+CREATE INDEX ix_submissao_usuario_problema ON public.submissao USING btree (id_usuario, id_problema, "timestamp");
+CREATE INDEX ix_submissao_timestamp ON public.submissao USING btree ("timestamp", id_submissao);
+CREATE INDEX ix_submissao_pendente ON public.submissao USING btree ("timestamp", id_submissao) WHERE status = 'pendente';
\ No newline at end of file